@@ -0,0 +1,32 @@
+"""add_content_hash_columns
+
+Revision ID: 9a4e2f1c7b3d
+Revises: 6c61c9cdb35d
+Create Date: 2026-10-19 09:12:44.301527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e2f1c7b3d'
+down_revision: Union[str, Sequence[str], None] = '6c61c9cdb35d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('characters', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('films', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('starships', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('starships', 'content_hash')
+    op.drop_column('films', 'content_hash')
+    op.drop_column('characters', 'content_hash')
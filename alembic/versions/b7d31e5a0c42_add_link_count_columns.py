@@ -0,0 +1,43 @@
+"""add_link_count_columns
+
+Revision ID: b7d31e5a0c42
+Revises: 9a4e2f1c7b3d
+Create Date: 2026-10-19 14:05:12.418903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d31e5a0c42'
+down_revision: Union[str, Sequence[str], None] = '9a4e2f1c7b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('characters', sa.Column('film_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('films', sa.Column('character_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill from the links already stored
+    op.execute(
+        "UPDATE characters SET film_count = "
+        "(SELECT count(*) FROM character_films WHERE character_films.character_id = characters.id)"
+    )
+    op.execute(
+        "UPDATE films SET character_count = "
+        "(SELECT count(*) FROM character_films WHERE character_films.film_id = films.id)"
+    )
+    op.create_index(op.f('ix_characters_film_count'), 'characters', ['film_count'], unique=False)
+    op.create_index(op.f('ix_films_character_count'), 'films', ['character_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_films_character_count'), table_name='films')
+    op.drop_index(op.f('ix_characters_film_count'), table_name='characters')
+    op.drop_column('films', 'character_count')
+    op.drop_column('characters', 'film_count')
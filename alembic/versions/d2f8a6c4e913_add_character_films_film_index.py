@@ -0,0 +1,28 @@
+"""add_character_films_film_index
+
+Revision ID: d2f8a6c4e913
+Revises: b7d31e5a0c42
+Create Date: 2026-10-19 15:21:37.052816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a6c4e913'
+down_revision: Union[str, Sequence[str], None] = 'b7d31e5a0c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_character_films_film_id_character_id', 'character_films', ['film_id', 'character_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_character_films_film_id_character_id', table_name='character_films')
@@ -1,9 +1,15 @@
 from .characters import router as characters_router
 from .films import router as films_router  
 from .starships import router as starships_router
+from .sync import router as sync_router
+from .stats import router as stats_router
+from .export import router as export_router
 
 __all__ = [
     "characters_router",
     "films_router", 
-    "starships_router"
+    "starships_router",
+    "sync_router",
+    "stats_router",
+    "export_router"
 ]
@@ -1,26 +1,37 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import TYPE_CHECKING, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import get_db, get_read_db, get_session_factory, mark_write
+from app.api.deps import get_swapi_service, get_sync_jobs
 from app.services.character_service import CharacterService
-from app.services.swapi_service import SWAPIService
-from app.schemas.character import Character, CharacterResponse, CharacterCreate, CharacterUpdate
-from app.schemas.common import PaginatedResponse, VoteResponse
+from app.schemas.character import Character, CharacterListItem, CharacterResponse, CharacterCreate, CharacterUpdate
+from app.schemas.common import KeysetPage, PaginatedResponse, VoteResponse
+from app.schemas.film import Film
+from app.schemas.sync import SyncJobResponse
 import math
 
+if TYPE_CHECKING:
+    from app.services.swapi_service import SWAPIService
+    from app.services.sync_jobs import SyncJobManager
+
 router = APIRouter(prefix="/characters", tags=["characters"])
 
 
-@router.get("/", response_model=PaginatedResponse[Character])
+@router.get("/", response_model=PaginatedResponse[CharacterListItem])
 async def get_characters(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    sort: Literal["votes", "name", "film_count"] = Query("votes", description="Order by votes, name or film_count"),
+    include: Optional[Literal["films"]] = Query(None, description="Embed each character's films, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get paginated list of characters"""
     skip = (page - 1) * size
     service = CharacterService(db)
-    characters, total = service.get_characters(skip=skip, limit=size)
+    characters, total = await service.get_characters(skip=skip, limit=size, sort=sort)
+    if include:
+        await service.include_films(characters)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -33,17 +44,21 @@ async def get_characters(
     )
 
 
-@router.get("/search", response_model=PaginatedResponse[Character])
+@router.get("/search", response_model=PaginatedResponse[CharacterListItem])
 async def search_characters(
     name: str = Query(..., description="Character name to search for"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    sort: Literal["votes", "name", "film_count"] = Query("votes", description="Order by votes, name or film_count"),
+    include: Optional[Literal["films"]] = Query(None, description="Embed each character's films, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Search characters by name"""
     skip = (page - 1) * size
     service = CharacterService(db)
-    characters, total = service.search_characters(name=name, skip=skip, limit=size)
+    characters, total = await service.search_characters(name=name, skip=skip, limit=size, sort=sort)
+    if include:
+        await service.include_films(characters)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -56,21 +71,84 @@ async def search_characters(
     )
 
 
+@router.get("/swapi/{swapi_id}", response_model=CharacterResponse)
+async def get_character_by_swapi_id(
+    swapi_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    swapi_service: "SWAPIService" = Depends(get_swapi_service)
+):
+    """Get character by SWAPI ID, fetching it from SWAPI if it isn't stored yet.
+
+    The lookup is a read. Only a fetched character is written, on the primary,
+    and only then are the client's next reads kept there.
+    """
+    service = CharacterService(db)
+    character = await service.get_character_by_swapi_id(swapi_id)
+    if not character and settings.SWAPI_HYDRATE_ON_MISS:
+        from app.services.swapi_resilience import SWAPIError
+        from app.services.sync_service import SyncService
+
+        async with session_factory() as primary:
+            try:
+                found = await SyncService(primary, swapi_service).hydrate("characters", swapi_id)
+            except SWAPIError as e:
+                raise HTTPException(status_code=502, detail=f"Could not fetch character from SWAPI: {e}")
+            if found:
+                mark_write(response)
+                character = await CharacterService(primary).get_character_by_swapi_id(swapi_id)
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return character
+
+
 @router.get("/{character_id}", response_model=CharacterResponse)
-async def get_character(character_id: int, db: Session = Depends(get_db)):
-    """Get character by ID"""
+async def get_character(
+    character_id: int,
+    films_limit: Optional[int] = Query(
+        None, ge=0, le=100, description="Embed only this many films, 0 for none, all if unset"
+    ),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get character by ID.
+
+    All its films are embedded unless films_limit is set; page through
+    them with /characters/{id}/films instead.
+    """
     service = CharacterService(db)
-    character = service.get_character(character_id)
+    character = await service.get_character(character_id, films_limit=films_limit)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     return character
 
 
+@router.get("/{character_id}/films", response_model=KeysetPage[Film])
+async def get_character_films(
+    character_id: int,
+    after: int = Query(0, ge=0, description="Return films with ids above this, the next_after of the previous page"),
+    size: int = Query(20, ge=1, le=100, description="Page size"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a character's films by id, a page at a time"""
+    service = CharacterService(db)
+    # One extra row tells whether there's another page
+    films = await service.get_character_films(character_id, after=after, limit=size + 1)
+    if films is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    
+    return KeysetPage(
+        items=films[:size],
+        size=size,
+        next_after=films[size - 1].id if len(films) > size else None
+    )
+
+
 @router.post("/{character_id}/vote", response_model=VoteResponse)
-async def vote_for_character(character_id: int, db: Session = Depends(get_db)):
+async def vote_for_character(character_id: int, db: AsyncSession = Depends(get_db)):
     """Vote for a character"""
     service = CharacterService(db)
-    character = service.vote_for_character(character_id)
+    character = await service.vote_for_character(character_id)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     
@@ -81,48 +159,29 @@ async def vote_for_character(character_id: int, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/sync", response_model=dict)
-async def sync_characters_from_swapi(db: Session = Depends(get_db)):
-    """Sync characters from SWAPI"""
-    try:
-        swapi_service = SWAPIService()
-        character_service = CharacterService(db)
-        
-        # Fetch all characters from SWAPI
-        swapi_characters = await swapi_service.fetch_all_characters()
-        
-        created_count = 0
-        updated_count = 0
-        
-        for char_data in swapi_characters:
-            try:
-                existing = character_service.get_character_by_swapi_id(char_data["swapi_id"])
-                if existing:
-                    character_service.create_or_update_from_swapi(char_data)
-                    updated_count += 1
-                else:
-                    character_service.create_or_update_from_swapi(char_data)
-                    created_count += 1
-            except Exception as e:
-                print(f"Error processing character {char_data.get('name', 'Unknown')}: {e}")
-                continue
-        
-        return {
-            "success": True,
-            "message": f"Synced characters from SWAPI",
-            "created": created_count,
-            "updated": updated_count,
-            "total": len(swapi_characters)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to sync characters: {str(e)}")
-
-
-@router.get("/top/voted", response_model=List[Character])
+@router.post("/sync", response_model=SyncJobResponse, status_code=202)
+async def sync_characters_from_swapi(
+    swapi_service: "SWAPIService" = Depends(get_swapi_service),
+    sync_jobs: "SyncJobManager" = Depends(get_sync_jobs),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Start a background sync of characters from SWAPI.
+
+    Returns the job to poll at /sync/jobs/{id}. If a characters sync is
+    already running, that job is returned instead of starting another.
+    """
+    return sync_jobs.start("characters", session_factory, swapi_service)
+
+
+@router.get("/top/voted", response_model=List[CharacterListItem])
 async def get_top_voted_characters(
     limit: int = Query(10, ge=1, le=50, description="Number of top characters to return"),
-    db: Session = Depends(get_db)
+    include: Optional[Literal["films"]] = Query(None, description="Embed each character's films, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get top voted characters"""
     service = CharacterService(db)
-    return service.get_top_characters(limit=limit)
+    characters = await service.get_top_characters(limit=limit)
+    if include:
+        await service.include_films(characters)
+    return characters
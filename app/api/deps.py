@@ -0,0 +1,17 @@
+from typing import TYPE_CHECKING
+from fastapi import Request
+
+# Only for annotations: the SWAPI client and sync machinery load on first use
+if TYPE_CHECKING:
+    from app.services.swapi_service import SWAPIService
+    from app.services.sync_jobs import SyncJobManager
+
+
+def get_swapi_service(request: Request) -> "SWAPIService":
+    """Dependency to get the SWAPI service sharing the app's HTTP client"""
+    return request.app.state.swapi_service
+
+
+def get_sync_jobs(request: Request) -> "SyncJobManager":
+    """Dependency to get the app's background sync job manager"""
+    return request.app.state.sync_jobs
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import get_read_session_factory
+from app.services.export import EXPORT_FORMATS, export_columns, export_rows
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{entity}", response_class=StreamingResponse)
+async def export_entity(
+    entity: Literal["characters", "films", "starships"],
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="NDJSON lines, or CSV with a header row"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export, all if unset"),
+    updated_since: Optional[datetime] = Query(None, description="Only rows updated at or after this time"),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory)
+):
+    """Stream every row of an entity, ordered by id.
+
+    Rows are read in batches from a server-side cursor and sent as they
+    come, so whole tables are pulled in one request, without OFFSET
+    paging or a count per page.
+    """
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        columns = export_columns(entity, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        export_rows(session_factory, entity, columns, export_format, updated_since),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{export_format}"'}
+    )
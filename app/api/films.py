@@ -1,26 +1,37 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import TYPE_CHECKING, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import get_db, get_read_db, get_session_factory, mark_write
+from app.api.deps import get_swapi_service, get_sync_jobs
 from app.services.film_service import FilmService
-from app.services.swapi_service import SWAPIService
-from app.schemas.film import Film, FilmResponse, FilmCreate, FilmUpdate
-from app.schemas.common import PaginatedResponse, VoteResponse
+from app.schemas.film import Film, FilmListItem, FilmResponse, FilmCreate, FilmUpdate
+from app.schemas.common import KeysetPage, PaginatedResponse, VoteResponse
+from app.schemas.character import Character
+from app.schemas.sync import SyncJobResponse
 import math
 
+if TYPE_CHECKING:
+    from app.services.swapi_service import SWAPIService
+    from app.services.sync_jobs import SyncJobManager
+
 router = APIRouter(prefix="/films", tags=["films"])
 
 
-@router.get("/", response_model=PaginatedResponse[Film])
+@router.get("/", response_model=PaginatedResponse[FilmListItem])
 async def get_films(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    sort: Literal["votes", "title", "character_count"] = Query("votes", description="Order by votes, title or character_count"),
+    include: Optional[Literal["characters"]] = Query(None, description="Embed each film's characters, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get paginated list of films"""
     skip = (page - 1) * size
     service = FilmService(db)
-    films, total = service.get_films(skip=skip, limit=size)
+    films, total = await service.get_films(skip=skip, limit=size, sort=sort)
+    if include:
+        await service.include_characters(films)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -33,17 +44,21 @@ async def get_films(
     )
 
 
-@router.get("/search", response_model=PaginatedResponse[Film])
+@router.get("/search", response_model=PaginatedResponse[FilmListItem])
 async def search_films(
     title: str = Query(..., description="Film title to search for"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    sort: Literal["votes", "title", "character_count"] = Query("votes", description="Order by votes, title or character_count"),
+    include: Optional[Literal["characters"]] = Query(None, description="Embed each film's characters, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Search films by title"""
     skip = (page - 1) * size
     service = FilmService(db)
-    films, total = service.search_films(title=title, skip=skip, limit=size)
+    films, total = await service.search_films(title=title, skip=skip, limit=size, sort=sort)
+    if include:
+        await service.include_characters(films)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -56,21 +71,84 @@ async def search_films(
     )
 
 
+@router.get("/swapi/{swapi_id}", response_model=FilmResponse)
+async def get_film_by_swapi_id(
+    swapi_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    swapi_service: "SWAPIService" = Depends(get_swapi_service)
+):
+    """Get film by SWAPI ID, fetching it from SWAPI if it isn't stored yet.
+
+    The lookup is a read. Only a fetched film is written, on the primary,
+    and only then are the client's next reads kept there.
+    """
+    service = FilmService(db)
+    film = await service.get_film_by_swapi_id(swapi_id)
+    if not film and settings.SWAPI_HYDRATE_ON_MISS:
+        from app.services.swapi_resilience import SWAPIError
+        from app.services.sync_service import SyncService
+
+        async with session_factory() as primary:
+            try:
+                found = await SyncService(primary, swapi_service).hydrate("films", swapi_id)
+            except SWAPIError as e:
+                raise HTTPException(status_code=502, detail=f"Could not fetch film from SWAPI: {e}")
+            if found:
+                mark_write(response)
+                film = await FilmService(primary).get_film_by_swapi_id(swapi_id)
+    if not film:
+        raise HTTPException(status_code=404, detail="Film not found")
+    return film
+
+
 @router.get("/{film_id}", response_model=FilmResponse)
-async def get_film(film_id: int, db: Session = Depends(get_db)):
-    """Get film by ID"""
+async def get_film(
+    film_id: int,
+    characters_limit: Optional[int] = Query(
+        None, ge=0, le=100, description="Embed only this many characters, 0 for none, all if unset"
+    ),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get film by ID.
+
+    All its characters are embedded unless characters_limit is set; page through
+    them with /films/{id}/characters instead.
+    """
     service = FilmService(db)
-    film = service.get_film(film_id)
+    film = await service.get_film(film_id, characters_limit=characters_limit)
     if not film:
         raise HTTPException(status_code=404, detail="Film not found")
     return film
 
 
+@router.get("/{film_id}/characters", response_model=KeysetPage[Character])
+async def get_film_characters(
+    film_id: int,
+    after: int = Query(0, ge=0, description="Return characters with ids above this, the next_after of the previous page"),
+    size: int = Query(20, ge=1, le=100, description="Page size"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a film's characters by id, a page at a time"""
+    service = FilmService(db)
+    # One extra row tells whether there's another page
+    characters = await service.get_film_characters(film_id, after=after, limit=size + 1)
+    if characters is None:
+        raise HTTPException(status_code=404, detail="Film not found")
+    
+    return KeysetPage(
+        items=characters[:size],
+        size=size,
+        next_after=characters[size - 1].id if len(characters) > size else None
+    )
+
+
 @router.post("/{film_id}/vote", response_model=VoteResponse)
-async def vote_for_film(film_id: int, db: Session = Depends(get_db)):
+async def vote_for_film(film_id: int, db: AsyncSession = Depends(get_db)):
     """Vote for a film"""
     service = FilmService(db)
-    film = service.vote_for_film(film_id)
+    film = await service.vote_for_film(film_id)
     if not film:
         raise HTTPException(status_code=404, detail="Film not found")
     
@@ -81,48 +159,29 @@ async def vote_for_film(film_id: int, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/sync", response_model=dict)
-async def sync_films_from_swapi(db: Session = Depends(get_db)):
-    """Sync films from SWAPI"""
-    try:
-        swapi_service = SWAPIService()
-        film_service = FilmService(db)
-        
-        # Fetch all films from SWAPI
-        swapi_films = await swapi_service.fetch_all_films()
-        
-        created_count = 0
-        updated_count = 0
-        
-        for film_data in swapi_films:
-            try:
-                existing = film_service.get_film_by_swapi_id(film_data["swapi_id"])
-                if existing:
-                    film_service.create_or_update_from_swapi(film_data)
-                    updated_count += 1
-                else:
-                    film_service.create_or_update_from_swapi(film_data)
-                    created_count += 1
-            except Exception as e:
-                print(f"Error processing film {film_data.get('title', 'Unknown')}: {e}")
-                continue
-        
-        return {
-            "success": True,
-            "message": f"Synced films from SWAPI",
-            "created": created_count,
-            "updated": updated_count,
-            "total": len(swapi_films)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to sync films: {str(e)}")
-
-
-@router.get("/top/voted", response_model=List[Film])
+@router.post("/sync", response_model=SyncJobResponse, status_code=202)
+async def sync_films_from_swapi(
+    swapi_service: "SWAPIService" = Depends(get_swapi_service),
+    sync_jobs: "SyncJobManager" = Depends(get_sync_jobs),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Start a background sync of films from SWAPI.
+
+    Returns the job to poll at /sync/jobs/{id}. If a films sync is
+    already running, that job is returned instead of starting another.
+    """
+    return sync_jobs.start("films", session_factory, swapi_service)
+
+
+@router.get("/top/voted", response_model=List[FilmListItem])
 async def get_top_voted_films(
     limit: int = Query(10, ge=1, le=50, description="Number of top films to return"),
-    db: Session = Depends(get_db)
+    include: Optional[Literal["characters"]] = Query(None, description="Embed each film's characters, loaded in one query"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get top voted films"""
     service = FilmService(db)
-    return service.get_top_films(limit=limit)
+    films = await service.get_top_films(limit=limit)
+    if include:
+        await service.include_characters(films)
+    return films
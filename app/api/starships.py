@@ -1,13 +1,19 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import TYPE_CHECKING, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import get_db, get_read_db, get_session_factory, mark_write
+from app.api.deps import get_swapi_service, get_sync_jobs
 from app.services.starship_service import StarshipService
-from app.services.swapi_service import SWAPIService
 from app.schemas.starship import Starship, StarshipResponse, StarshipCreate, StarshipUpdate
 from app.schemas.common import PaginatedResponse, VoteResponse
+from app.schemas.sync import SyncJobResponse
 import math
 
+if TYPE_CHECKING:
+    from app.services.swapi_service import SWAPIService
+    from app.services.sync_jobs import SyncJobManager
+
 router = APIRouter(prefix="/starships", tags=["starships"])
 
 
@@ -15,12 +21,12 @@ router = APIRouter(prefix="/starships", tags=["starships"])
 async def get_starships(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get paginated list of starships"""
     skip = (page - 1) * size
     service = StarshipService(db)
-    starships, total = service.get_starships(skip=skip, limit=size)
+    starships, total = await service.get_starships(skip=skip, limit=size)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -38,12 +44,12 @@ async def search_starships(
     name: str = Query(..., description="Starship name to search for"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Search starships by name"""
     skip = (page - 1) * size
     service = StarshipService(db)
-    starships, total = service.search_starships(name=name, skip=skip, limit=size)
+    starships, total = await service.search_starships(name=name, skip=skip, limit=size)
     
     pages = math.ceil(total / size) if total > 0 else 1
     
@@ -56,21 +62,53 @@ async def search_starships(
     )
 
 
+@router.get("/swapi/{swapi_id}", response_model=StarshipResponse)
+async def get_starship_by_swapi_id(
+    swapi_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    swapi_service: "SWAPIService" = Depends(get_swapi_service)
+):
+    """Get starship by SWAPI ID, fetching it from SWAPI if it isn't stored yet.
+
+    The lookup is a read. Only a fetched starship is written, on the primary,
+    and only then are the client's next reads kept there.
+    """
+    service = StarshipService(db)
+    starship = await service.get_starship_by_swapi_id(swapi_id)
+    if not starship and settings.SWAPI_HYDRATE_ON_MISS:
+        from app.services.swapi_resilience import SWAPIError
+        from app.services.sync_service import SyncService
+
+        async with session_factory() as primary:
+            try:
+                found = await SyncService(primary, swapi_service).hydrate("starships", swapi_id)
+            except SWAPIError as e:
+                raise HTTPException(status_code=502, detail=f"Could not fetch starship from SWAPI: {e}")
+            if found:
+                mark_write(response)
+                starship = await StarshipService(primary).get_starship_by_swapi_id(swapi_id)
+    if not starship:
+        raise HTTPException(status_code=404, detail="Starship not found")
+    return starship
+
+
 @router.get("/{starship_id}", response_model=StarshipResponse)
-async def get_starship(starship_id: int, db: Session = Depends(get_db)):
+async def get_starship(starship_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get starship by ID"""
     service = StarshipService(db)
-    starship = service.get_starship(starship_id)
+    starship = await service.get_starship(starship_id)
     if not starship:
         raise HTTPException(status_code=404, detail="Starship not found")
     return starship
 
 
 @router.post("/{starship_id}/vote", response_model=VoteResponse)
-async def vote_for_starship(starship_id: int, db: Session = Depends(get_db)):
+async def vote_for_starship(starship_id: int, db: AsyncSession = Depends(get_db)):
     """Vote for a starship"""
     service = StarshipService(db)
-    starship = service.vote_for_starship(starship_id)
+    starship = await service.vote_for_starship(starship_id)
     if not starship:
         raise HTTPException(status_code=404, detail="Starship not found")
     
@@ -81,48 +119,25 @@ async def vote_for_starship(starship_id: int, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/sync", response_model=dict)
-async def sync_starships_from_swapi(db: Session = Depends(get_db)):
-    """Sync starships from SWAPI"""
-    try:
-        swapi_service = SWAPIService()
-        starship_service = StarshipService(db)
-        
-        # Fetch all starships from SWAPI
-        swapi_starships = await swapi_service.fetch_all_starships()
-        
-        created_count = 0
-        updated_count = 0
-        
-        for starship_data in swapi_starships:
-            try:
-                existing = starship_service.get_starship_by_swapi_id(starship_data["swapi_id"])
-                if existing:
-                    starship_service.create_or_update_from_swapi(starship_data)
-                    updated_count += 1
-                else:
-                    starship_service.create_or_update_from_swapi(starship_data)
-                    created_count += 1
-            except Exception as e:
-                print(f"Error processing starship {starship_data.get('name', 'Unknown')}: {e}")
-                continue
-        
-        return {
-            "success": True,
-            "message": f"Synced starships from SWAPI",
-            "created": created_count,
-            "updated": updated_count,
-            "total": len(swapi_starships)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to sync starships: {str(e)}")
+@router.post("/sync", response_model=SyncJobResponse, status_code=202)
+async def sync_starships_from_swapi(
+    swapi_service: "SWAPIService" = Depends(get_swapi_service),
+    sync_jobs: "SyncJobManager" = Depends(get_sync_jobs),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Start a background sync of starships from SWAPI.
+
+    Returns the job to poll at /sync/jobs/{id}. If a starships sync is
+    already running, that job is returned instead of starting another.
+    """
+    return sync_jobs.start("starships", session_factory, swapi_service)
 
 
 @router.get("/top/voted", response_model=List[Starship])
 async def get_top_voted_starships(
     limit: int = Query(10, ge=1, le=50, description="Number of top starships to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get top voted starships"""
     service = StarshipService(db)
-    return service.get_top_starships(limit=limit)
+    return await service.get_top_starships(limit=limit)
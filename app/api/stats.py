@@ -0,0 +1,13 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from app.database import get_pool_metrics
+from app.pool_metrics import PoolMetrics
+from app.schemas.stats import PoolStatsResponse
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/db-pool", response_model=List[PoolStatsResponse])
+async def get_pool_stats(pool_metrics: List[PoolMetrics] = Depends(get_pool_metrics)):
+    """Get usage and checkout wait times of the database connection pools"""
+    return [metrics.snapshot()._asdict() for metrics in pool_metrics]
@@ -0,0 +1,18 @@
+from typing import TYPE_CHECKING
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.deps import get_sync_jobs
+from app.schemas.sync import SyncJobResponse
+
+if TYPE_CHECKING:
+    from app.services.sync_jobs import SyncJobManager
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(job_id: str, sync_jobs: "SyncJobManager" = Depends(get_sync_jobs)):
+    """Get status and progress of a background sync job"""
+    job = sync_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
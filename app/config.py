@@ -14,9 +14,62 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./starwars.db"
+    DB_CREATE_TABLES: bool = False  # Create missing tables at startup instead of running Alembic migrations
+    SYNC_BATCH_SIZE: int = 500  # Rows per bulk upsert statement
+    SYNC_QUEUE_SIZE: int = 4  # Fetched pages buffered ahead of the DB writer
+    SYNC_JOB_HISTORY: int = 100  # Finished sync jobs kept for polling
+    SNAPSHOT_BATCH_SIZE: int = 20000  # Snapshot rows loaded per transaction
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched and sent per chunk of an export
+    
+    # Connection pool, unset values use the dialect's defaults
+    DB_POOL_SIZE: Optional[int] = None  # Connections kept open
+    DB_MAX_OVERFLOW: Optional[int] = None  # Extra connections opened under load
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: Optional[int] = None  # Seconds before a connection is replaced, -1 never
+    DB_POOL_PRE_PING: Optional[bool] = None  # Test connections on checkout
+    
+    # Read replicas
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated, reads use the primary when empty
+    REPLICA_STICKY_SECONDS: float = 5.0  # Reads stay on the primary this long after a client writes
+    SQLITE_REPLICA_REFRESH_INTERVAL: float = 1.0  # Seconds between backups of a SQLite primary onto its replicas, 0 disables
+    
+    # SQLite tuning, applied to every new connection
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers don't block on writers, nor writers on readers
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL, only the last commits can be lost on power loss
+    SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds to wait for a lock before failing
+    SQLITE_CACHE_SIZE: int = -65536  # Page cache per connection, in KiB when negative
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of the database file memory-mapped
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_WAL_CHECKPOINT_INTERVAL: float = 300.0  # Seconds between WAL checkpoints, 0 disables
     
     # External APIs
     SWAPI_BASE_URL: str = "https://swapi.dev/api"
+    SWAPI_MAX_CONCURRENCY: int = 5  # Max pages fetched in parallel
+    SWAPI_TIMEOUT: float = 30.0
+    SWAPI_CONNECT_TIMEOUT: float = 10.0
+    SWAPI_MAX_CONNECTIONS: int = 20
+    SWAPI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    SWAPI_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
+    SWAPI_HTTP2: bool = False  # Requires the optional "h2" package
+    SWAPI_VERIFY_SSL: bool = False
+    SWAPI_NOT_FOUND_TTL: float = 60.0  # Seconds a 404 for an id is remembered, 0 disables
+    SWAPI_HYDRATE_ON_MISS: bool = True  # Fetch unknown swapi_ids from SWAPI on lookup
+    
+    # SWAPI fault handling
+    SWAPI_RETRY_ATTEMPTS: int = 3  # Tries per request, including the first
+    SWAPI_RETRY_BACKOFF_BASE: float = 0.5  # Seconds, doubled on each retry (with jitter)
+    SWAPI_RETRY_MAX_DELAY: float = 30.0  # Cap on any single wait, Retry-After included
+    SWAPI_SYNC_DEADLINE: float = 600.0  # Seconds a full fetch may take, 0 for no limit
+    SWAPI_BREAKER_THRESHOLD: int = 5  # Consecutive failures that open the circuit, 0 disables
+    SWAPI_BREAKER_RESET_TIMEOUT: float = 30.0  # Seconds the circuit stays open
+    
+    # SWAPI response cache
+    SWAPI_CACHE_ENABLED: bool = False
+    SWAPI_CACHE_PATH: str = "./swapi_cache.db"
+    SWAPI_CACHE_MAX_AGE: int = 86400  # Seconds a response is served without revalidation
+    SWAPI_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    SWAPI_CACHE_REVALIDATE_TIMEOUT: float = 3.0  # Wait this long before serving a stale copy
     
     # Security
     SECRET_KEY: str = "change-this-in-production"
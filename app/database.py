@@ -1,39 +1,322 @@
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import declarative_base, sessionmaker
-from databases import Database
+import asyncio
+import itertools
+import logging
+import math
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from app.config import settings
+from app.pool_metrics import PoolMetrics
 
-# SQLAlchemy setup
+logger = logging.getLogger(__name__)
+
+# Async drivers for the synchronous URLs used in settings and by Alembic
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a database URL to use its dialect's async driver"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None or parsed.drivername == driver:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+# Pool defaults per dialect, used where the DB_POOL_* settings are unset.
+# A SQLite file serializes writers, so extra connections only help readers;
+# a server closes idle connections, so those are checked and recycled.
+_POOL_DEFAULTS = {
+    "sqlite": {"pool_size": 5, "max_overflow": 10, "pool_recycle": -1, "pool_pre_ping": False},
+    "default": {"pool_size": 10, "max_overflow": 20, "pool_recycle": 1800, "pool_pre_ping": True},
+}
+
+
+def pool_options(url: str, metrics: Optional[PoolMetrics] = None) -> Dict[str, Any]:
+    """Pool arguments of an async engine for url, from settings and the dialect's defaults"""
+    if make_url(url).get_backend_name() == "sqlite" and not _is_sqlite_file(url):
+        # Every connection to an in-memory database is a new, empty one
+        poolclass = StaticPool
+        options: Dict[str, Any] = {}
+    else:
+        poolclass = AsyncAdaptedQueuePool
+        defaults = _POOL_DEFAULTS.get(make_url(url).get_backend_name(), _POOL_DEFAULTS["default"])
+        configured = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+        options = {name: defaults[name] if value is None else value for name, value in configured.items()}
+        options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    options["poolclass"] = metrics.pool_class(poolclass) if metrics else poolclass
+    return options
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """The per-connection SQLite pragmas configured in settings"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def configure_sqlite(engine, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """Set pragmas, sqlite_pragmas() by default, on every new connection of a SQLite engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Synchronous engine, for schema management
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async engine used by the application. aiosqlite opens a new connection
+# per session by default, which would drop its page cache and re-run the
+# pragmas every time, so SQLite files get a pool too.
+pool_metrics = PoolMetrics("primary")
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, pool_metrics)
+)
+pool_metrics.instrument(async_engine)
 
-Base = declarative_base()
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    # Loaded attributes stay readable after commit, instead of lazy-loading
+    expire_on_commit=False
+)
+
+if settings.SQLITE_TUNING_ENABLED:
+    configure_sqlite(engine)
+    configure_sqlite(async_engine)
+
+
+def replica_urls() -> List[str]:
+    """The read replica URLs configured in settings"""
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+def _create_replica_engine(url: str, metrics: PoolMetrics):
+    """Async engine of a read replica.
+
+    SQLite replicas are opened query_only, so a write routed to one fails
+    instead of being lost on the next refresh.
+    """
+    replica = create_async_engine(async_database_url(url), **pool_options(url, metrics))
+    metrics.instrument(replica)
+    configure_sqlite(replica, {**(sqlite_pragmas() if settings.SQLITE_TUNING_ENABLED else {}), "query_only": "ON"})
+    return replica
+
+
+# Read replicas, each with its own pool
+replica_pool_metrics = [PoolMetrics(f"replica-{index}") for index in range(1, len(replica_urls()) + 1)]
+replica_engines = [
+    _create_replica_engine(url, metrics) for url, metrics in zip(replica_urls(), replica_pool_metrics)
+]
+
+ReplicaSessionLocals = [
+    async_sessionmaker(replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for replica in replica_engines
+]
+
+# Cookie holding the time until which a client's reads go to the primary
+STICKY_COOKIE = "db_primary_until"
+
+
+class SessionRouter:
+    """Routes reads to the replicas in turn and writes to the primary.
+
+    A client that wrote is sent a cookie keeping its reads on the primary
+    for sticky_seconds, long enough for the replicas to catch up, so it
+    reads its own writes.
+    """
 
-# Async database setup
-database = Database(settings.DATABASE_URL)
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[async_sessionmaker] = (),
+        sticky_seconds: float = 0.0
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self._replica_cycle = itertools.cycle(self.replicas)
+
+    def for_read(self, request: Optional[Request] = None) -> async_sessionmaker:
+        """Session factory for a read: the next replica, or the primary for a client that just wrote"""
+        if not self.replicas or (request is not None and self.is_sticky(request)):
+            return self.primary
+        return next(self._replica_cycle)
+
+    def for_write(self, response: Optional[Response] = None) -> async_sessionmaker:
+        """Session factory for a write, keeping the client's next reads on the primary"""
+        if response is not None:
+            self.mark_write(response)
+        return self.primary
+
+    def mark_write(self, response: Response) -> None:
+        """Keep the client's reads on the primary after a write made outside for_write"""
+        if self.replicas and self.sticky_seconds > 0:
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=math.ceil(self.sticky_seconds),
+                httponly=True
+            )
+
+    @staticmethod
+    def is_sticky(request: Request) -> bool:
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+session_router = SessionRouter(AsyncSessionLocal, ReplicaSessionLocals, settings.REPLICA_STICKY_SECONDS)
+
+Base = declarative_base()
 
 metadata = MetaData()
 
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+async def get_db(response: Response):
+    """Dependency to get a database session on the primary, for requests that write"""
+    async with session_router.for_write(response)() as db:
+        yield db
+
+
+def mark_write(response: Response) -> None:
+    """Keep the client's next reads on the primary after a write made without get_db"""
+    session_router.mark_write(response)
+
+
+async def get_read_db(request: Request):
+    """Dependency to get a database session on a read replica, or the primary without replicas"""
+    async with session_router.for_read(request)() as db:
         yield db
+
+
+async def create_tables() -> None:
+    """Create missing tables on the primary, for setups not managed with Alembic"""
+    import app.models  # noqa: F401  Registers every table on Base.metadata
+
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+def get_session_factory():
+    """Dependency to get the session factory, for work that outlives a request"""
+    return AsyncSessionLocal
+
+
+def get_read_session_factory(request: Request) -> async_sessionmaker:
+    """Dependency to get the session factory reads go to, for reads that outlive the request"""
+    return session_router.for_read(request)
+
+
+def get_pool_metrics() -> List[PoolMetrics]:
+    """Dependency to get the metrics of every application connection pool"""
+    return [pool_metrics, *replica_pool_metrics]
+
+
+def refresh_sqlite_replica(primary_url: str, replica_url: str) -> None:
+    """Copy a SQLite primary onto a SQLite replica with the online backup API.
+
+    The copy is made in one step, so replica readers see either the old
+    or the new database, never a mix.
+    """
+    source = sqlite3.connect(make_url(primary_url).database)
+    try:
+        target = sqlite3.connect(make_url(replica_url).database, timeout=settings.SQLITE_BUSY_TIMEOUT / 1000)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
     finally:
-        db.close()
+        source.close()
+
+
+async def run_replica_refreshes(
+    interval: float,
+    primary_url: Optional[str] = None,
+    urls: Optional[List[str]] = None
+) -> None:
+    """Refresh SQLite replicas from the SQLite primary every interval seconds until cancelled"""
+    primary_url = primary_url or settings.DATABASE_URL
+    urls = [url for url in (replica_urls() if urls is None else urls) if _is_sqlite_file(url)]
+    while True:
+        for url in urls:
+            try:
+                await asyncio.to_thread(refresh_sqlite_replica, primary_url, url)
+            except Exception as e:
+                logger.warning(f"Refreshing replica {make_url(url).database} failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def checkpoint_wal(engine=None) -> Optional[Tuple[int, int, int]]:
+    """Copy committed pages from the WAL back into the SQLite database file.
 
+    Runs in PASSIVE mode, so it never waits on readers or writers and
+    pages still in use are left for the next run. Returns (busy, pages
+    in the WAL, pages checkpointed), or None if the database isn't SQLite.
+    """
+    engine = engine or async_engine
+    if engine.dialect.name != "sqlite":
+        return None
+    async with engine.connect() as connection:
+        result = await connection.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+        busy, log_pages, checkpointed = result.one()
+    return busy, log_pages, checkpointed
 
-async def connect_db():
-    """Connect to database"""
-    await database.connect()
 
+async def run_wal_checkpoints(interval: float, engine=None) -> None:
+    """Checkpoint the WAL every interval seconds until cancelled.
 
-async def disconnect_db():
-    """Disconnect from database"""
-    await database.disconnect()
+    SQLite checkpoints on commit once the WAL passes 1000 pages, but
+    steady readers can keep those from finishing and the WAL growing,
+    so idle periods are used to catch up.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await checkpoint_wal(engine)
+        except Exception as e:
+            logger.warning(f"WAL checkpoint failed: {e}")
+            continue
+        if result:
+            busy, log_pages, checkpointed = result
+            logger.debug(f"WAL checkpoint: {checkpointed}/{log_pages} pages{' (busy)' if busy else ''}")
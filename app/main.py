@@ -1,33 +1,59 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
-from app.database import Base, engine, connect_db, disconnect_db
+from app.database import async_engine, create_tables, replica_engines, run_replica_refreshes, run_wal_checkpoints
 from app.api.characters import router as characters_router
 from app.api.films import router as films_router
 from app.api.starships import router as starships_router
+from app.api.sync import router as sync_router
+from app.api.stats import router as stats_router
+from app.api.export import router as export_router
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup. The SWAPI client and sync machinery are imported here rather
+    # than at module level, so importing the app stays cheap.
+    from app.services.swapi_service import SWAPIService, create_http_client
+    from app.services.swapi_cache import create_response_cache
+    from app.services.sync_jobs import SyncJobManager
+
     logger.info("Starting up...")
-    await connect_db()
-    logger.info("Database connected")
+    if settings.DB_CREATE_TABLES:
+        await create_tables()
+    http_client = create_http_client()
+    response_cache = create_response_cache()
+    app.state.swapi_service = SWAPIService(client=http_client, cache=response_cache)
+    app.state.sync_jobs = SyncJobManager()
+    checkpoints = None
+    if settings.SQLITE_WAL_CHECKPOINT_INTERVAL > 0 and async_engine.dialect.name == "sqlite":
+        checkpoints = asyncio.create_task(run_wal_checkpoints(settings.SQLITE_WAL_CHECKPOINT_INTERVAL))
+    replica_refreshes = None
+    if settings.SQLITE_REPLICA_REFRESH_INTERVAL > 0 and replica_engines and async_engine.dialect.name == "sqlite":
+        replica_refreshes = asyncio.create_task(run_replica_refreshes(settings.SQLITE_REPLICA_REFRESH_INTERVAL))
     yield
     # Shutdown
     logger.info("Shutting down...")
-    await disconnect_db()
-    logger.info("Database disconnected")
+    await app.state.sync_jobs.shutdown()
+    for task in (checkpoints, replica_refreshes):
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    await http_client.aclose()
+    if response_cache:
+        response_cache.close()
+    await async_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+    logger.info("Database connections closed")
 
 
 app = FastAPI(
@@ -80,6 +106,9 @@ async def root():
 app.include_router(characters_router, prefix=settings.API_V1_STR)
 app.include_router(films_router, prefix=settings.API_V1_STR)
 app.include_router(starships_router, prefix=settings.API_V1_STR)
+app.include_router(sync_router, prefix=settings.API_V1_STR)
+app.include_router(stats_router, prefix=settings.API_V1_STR)
+app.include_router(export_router, prefix=settings.API_V1_STR)
 
 
 if __name__ == "__main__":
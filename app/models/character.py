@@ -19,7 +19,10 @@ class Character(Base):
     gender = Column(String(20))
     homeworld = Column(String(100))
     url = Column(String(255))
+    content_hash = Column(String(64))  # Hash of the SWAPI payload, to skip no-op syncs
     votes = Column(Integer, default=0)
+    # Films linked through character_films, kept up to date by sync_character_films
+    film_count = Column(Integer, default=0, server_default="0", nullable=False, index=True)
     rating = Column(Float, default=0.0)  # Average rating out of 5.0
     rating_count = Column(Integer, default=0)  # Number of ratings
     created_at = Column(DateTime, server_default=func.now())
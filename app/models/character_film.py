@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from app.database import Base
 
 # Association table for many-to-many relationship between characters and films
@@ -6,5 +6,7 @@ character_film_association = Table(
     'character_films',
     Base.metadata,
     Column('character_id', Integer, ForeignKey('characters.id'), primary_key=True),
-    Column('film_id', Integer, ForeignKey('films.id'), primary_key=True)
+    Column('film_id', Integer, ForeignKey('films.id'), primary_key=True),
+    # The primary key serves a character's films in film order, this a film's characters
+    Index('ix_character_films_film_id_character_id', 'film_id', 'character_id')
 )
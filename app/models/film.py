@@ -16,7 +16,10 @@ class Film(Base):
     producer = Column(String(200))
     release_date = Column(String(20))
     url = Column(String(255))
+    content_hash = Column(String(64))  # Hash of the SWAPI payload, to skip no-op syncs
     votes = Column(Integer, default=0)
+    # Characters linked through character_films, kept up to date by sync_character_films
+    character_count = Column(Integer, default=0, server_default="0", nullable=False, index=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -21,6 +21,7 @@ class Starship(Base):
     mglt = Column(String(50))
     starship_class = Column(String(100))
     url = Column(String(255))
+    content_hash = Column(String(64))  # Hash of the SWAPI payload, to skip no-op syncs
     votes = Column(Integer, default=0)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
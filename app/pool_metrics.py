@@ -0,0 +1,105 @@
+import time
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+
+class PoolStats(NamedTuple):
+    """Snapshot of one connection pool"""
+    name: str
+    pool_class: str
+    size: int  # Connections kept open, 0 for pools without a fixed size
+    in_use: int
+    overflow: int  # Connections open beyond size, negative while the pool fills
+    checkouts: int
+    timeouts: int
+    connects: int  # New DBAPI connections opened
+    invalidations: int
+    wait_avg_ms: float
+    wait_p95_ms: float  # Over the most recent checkouts
+    wait_max_ms: float
+
+
+class PoolMetrics:
+    """Checkout counts and wait times of an engine's connection pool"""
+
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=window)
+        self.engine = None
+
+    def pool_class(self, base: Type[Pool]) -> Type[Pool]:
+        """Subclass of base that times every checkout into these metrics"""
+        metrics = self
+
+        class InstrumentedPool(base):
+            def connect(self):
+                started = time.perf_counter()
+                try:
+                    connection = super().connect()
+                except exc.TimeoutError:
+                    metrics.timeouts += 1
+                    raise
+                metrics.record_wait(time.perf_counter() - started)
+                return connection
+
+        InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{base.__name__}"
+        # Pools log under their class's module, keep that among SQLAlchemy's quiet loggers
+        InstrumentedPool.__module__ = base.__module__
+        return InstrumentedPool
+
+    def instrument(self, engine) -> None:
+        """Count connections opened, checked out and invalidated on an engine's pool"""
+        self.engine = getattr(engine, "sync_engine", engine)
+
+        @event.listens_for(self.engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(self.engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.in_use += 1
+
+        @event.listens_for(self.engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            self.in_use -= 1
+
+        @event.listens_for(self.engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time one checkout took, connecting included"""
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.recent_waits.append(seconds)
+
+    def snapshot(self) -> PoolStats:
+        """Current counters, with the pool's size and overflow"""
+        pool: Optional[Pool] = self.engine.pool if self.engine is not None else None
+        waits = sorted(self.recent_waits)
+        p95 = waits[max(0, int(len(waits) * 0.95) - 1)] if waits else 0.0
+        return PoolStats(
+            name=self.name,
+            pool_class=type(pool).__name__ if pool is not None else "",
+            size=pool.size() if hasattr(pool, "size") else 0,
+            in_use=self.in_use,
+            overflow=pool.overflow() if hasattr(pool, "overflow") else 0,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            connects=self.connects,
+            invalidations=self.invalidations,
+            wait_avg_ms=self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            wait_p95_ms=p95 * 1000,
+            wait_max_ms=self.wait_max * 1000
+        )
@@ -1,11 +1,15 @@
 from .character import Character, CharacterCreate, CharacterUpdate, CharacterResponse
 from .film import Film, FilmCreate, FilmUpdate, FilmResponse
 from .starship import Starship, StarshipCreate, StarshipUpdate, StarshipResponse
-from .common import PaginatedResponse
+from .common import KeysetPage, PaginatedResponse, VoteResponse
+from .sync import SyncSummary, SyncJobResponse
+from .stats import PoolStatsResponse
 
 __all__ = [
     "Character", "CharacterCreate", "CharacterUpdate", "CharacterResponse",
     "Film", "FilmCreate", "FilmUpdate", "FilmResponse", 
     "Starship", "StarshipCreate", "StarshipUpdate", "StarshipResponse",
-    "PaginatedResponse"
+    "KeysetPage", "PaginatedResponse", "VoteResponse",
+    "SyncSummary", "SyncJobResponse",
+    "PoolStatsResponse"
 ]
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from app.schemas.common import LoadedOnly
 
 
 class CharacterBase(BaseModel):
@@ -41,12 +42,20 @@ class Character(CharacterBase):
     swapi_id: int
     url: Optional[str] = None
     votes: int = 0
+    film_count: int = 0
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class CharacterListItem(Character, LoadedOnly):
+    """Character in a list, with its films only if they were included"""
+    films: Optional[List["FilmBase"]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class CharacterResponse(Character):
     """Extended character response with films"""
     films: List["FilmBase"] = []
@@ -67,4 +76,5 @@ class FilmBase(BaseModel):
 
 
 # Update forward references
+CharacterListItem.model_rebuild()
 CharacterResponse.model_rebuild()
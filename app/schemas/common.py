@@ -1,5 +1,7 @@
-from typing import Generic, TypeVar, List
-from pydantic import BaseModel, ConfigDict
+from typing import Any, Generic, TypeVar, List, Optional
+from pydantic import BaseModel, ConfigDict, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstanceState
 
 T = TypeVar('T')
 
@@ -15,6 +17,36 @@ class PaginatedResponse(BaseModel, Generic[T]):
     model_config = ConfigDict(from_attributes=True)
 
 
+class LoadedOnly(BaseModel):
+    """Reads only the loaded attributes of an ORM object.
+
+    Relationships left unloaded come out as their defaults instead of
+    being lazy-loaded, which an async session can't do.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _skip_unloaded(cls, data: Any) -> Any:
+        state = inspect(data, raiseerr=False)
+        if not isinstance(state, InstanceState):
+            return data
+        unloaded = state.unloaded
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in unloaded and hasattr(data, name)
+        }
+
+
+class KeysetPage(BaseModel, Generic[T]):
+    """Page of a list ordered by id, continued from the last id seen rather than a page number"""
+    items: List[T]
+    size: int
+    next_after: Optional[int] = None  # Pass as after for the next page, None on the last one
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class VoteResponse(BaseModel):
     """Response for voting operations"""
     success: bool
@@ -22,3 +54,4 @@ class VoteResponse(BaseModel):
     votes: int
 
     model_config = ConfigDict(from_attributes=True)
+
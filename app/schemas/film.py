@@ -1,6 +1,7 @@
 from typing import Optional, List
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from app.schemas.common import LoadedOnly
 
 
 class FilmBase(BaseModel):
@@ -35,12 +36,20 @@ class Film(FilmBase):
     swapi_id: int
     url: Optional[str] = None
     votes: int = 0
+    character_count: int = 0
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class FilmListItem(Film, LoadedOnly):
+    """Film in a list, with its characters only if they were included"""
+    characters: Optional[List["CharacterBase"]] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class FilmResponse(Film):
     """Extended film response with characters"""
     characters: List["CharacterBase"] = []
@@ -61,4 +70,5 @@ class CharacterBase(BaseModel):
 
 
 # Update forward references
+FilmListItem.model_rebuild()
 FilmResponse.model_rebuild()
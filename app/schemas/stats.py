@@ -0,0 +1,19 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class PoolStatsResponse(BaseModel):
+    """Connection pool usage and checkout wait times"""
+    name: str
+    pool_class: str
+    size: int
+    in_use: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    connects: int
+    invalidations: int
+    wait_avg_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+
+    model_config = ConfigDict(from_attributes=True)
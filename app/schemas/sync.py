@@ -0,0 +1,35 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+
+class SyncSummary(BaseModel):
+    """Row counts of a finished sync"""
+    total: int
+    created: int
+    updated: int
+    unchanged: int
+    links_added: int = 0
+    links_removed: int = 0
+    status: str  # "complete" or "partial"
+    failed_pages: List[int] = []
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SyncJobResponse(BaseModel):
+    """Status and progress of a background sync job"""
+    id: str
+    entity: str
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    pages_fetched: int = 0
+    pages_total: Optional[int] = None
+    rows_written: int = 0
+    rate: float = 0.0  # Pages fetched per second
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[SyncSummary] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,34 @@
-from .swapi_service import SWAPIService
-from .character_service import CharacterService
-from .film_service import FilmService
-from .starship_service import StarshipService
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .swapi_service import SWAPIService
+    from .character_service import CharacterService
+    from .film_service import FilmService
+    from .starship_service import StarshipService
+    from .sync_service import SyncService
+
+# Services are imported on first use, so importing one doesn't pull in
+# the others (and httpx with the SWAPI client)
+_SERVICE_MODULES = {
+    "SWAPIService": ".swapi_service",
+    "CharacterService": ".character_service",
+    "FilmService": ".film_service",
+    "StarshipService": ".starship_service",
+    "SyncService": ".sync_service",
+}
+
+
+def __getattr__(name: str):
+    if name not in _SERVICE_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_SERVICE_MODULES[name], __name__), name)
+
 
 __all__ = [
     "SWAPIService",
     "CharacterService", 
     "FilmService",
-    "StarshipService"
+    "StarshipService",
+    "SyncService"
 ]
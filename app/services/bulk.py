@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.config import settings
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT ... DO UPDATE
+_UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+# Columns that an upsert never overwrites on an existing row
+_PRESERVED_COLUMNS = {"swapi_id", "created_at"}
+
+
+class UpsertResult(NamedTuple):
+    """Row counts of a bulk upsert"""
+    created: int
+    updated: int
+    unchanged: int
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Stable hash of a row's SWAPI-sourced columns.
+
+    Services clear the stored hash when a row is edited outside a sync, as
+    the row no longer matches SWAPI and the next sync must rewrite it.
+    """
+    payload = json.dumps(row, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_upsert_statement(dialect_name: str, model, rows: List[Dict[str, Any]], returning=None):
+    """Build an INSERT ... ON CONFLICT(swapi_id) DO UPDATE for a batch of rows, returning created_at by default"""
+    try:
+        insert = _UPSERT_INSERTS[dialect_name]
+    except KeyError:
+        raise NotImplementedError(f"Bulk upsert is not supported for {dialect_name}")
+
+    stmt = insert(model).values(rows)
+    update_columns = {
+        column: stmt.excluded[column]
+        for column in rows[0]
+        if column not in _PRESERVED_COLUMNS
+    }
+    update_columns["updated_at"] = func.now()
+    return stmt.on_conflict_do_update(
+        index_elements=[model.swapi_id],
+        set_=update_columns
+    ).returning(model.created_at if returning is None else returning)
+
+
+def build_insert_ignore_statement(dialect_name: str, table):
+    """Build an INSERT ... ON CONFLICT DO NOTHING, skipping rows already present"""
+    try:
+        insert = _UPSERT_INSERTS[dialect_name]
+    except KeyError:
+        raise NotImplementedError(f"Bulk upsert is not supported for {dialect_name}")
+    return insert(table).on_conflict_do_nothing()
+
+
+def bulk_upsert(db: Session, model, rows: List[Dict[str, Any]]) -> UpsertResult:
+    """Insert or update rows keyed by swapi_id in the caller's transaction, left for it to commit.
+
+    Each row is hashed and compared against the stored hashes of the same
+    ids, loaded in bulk, so only new or changed rows are written. New rows are
+    stamped with a created_at unique to this call, which lets the
+    created/updated split come straight from the RETURNING clause.
+
+    The statements bypass the session's identity map, so callers expire
+    the objects they loaded before, which are now stale.
+    """
+    # A statement may only touch each row once, keep the last payload per id
+    unique_rows = list({row["swapi_id"]: row for row in rows}.values())
+    if not unique_rows:
+        return UpsertResult(0, 0, 0)
+
+    batch_size = settings.SYNC_BATCH_SIZE
+    swapi_ids = [row["swapi_id"] for row in unique_rows]
+    stored_hashes = {}
+    for start in range(0, len(swapi_ids), batch_size):
+        stored_hashes.update(db.execute(
+            select(model.swapi_id, model.content_hash)
+            .where(model.swapi_id.in_(swapi_ids[start:start + batch_size]))
+        ).all())
+    changed_rows = []
+    for row in unique_rows:
+        row_hash = content_hash(row)
+        if stored_hashes.get(row["swapi_id"]) != row_hash:
+            changed_rows.append(dict(row, content_hash=row_hash))
+    unchanged = len(unique_rows) - len(changed_rows)
+
+    dialect_name = db.get_bind().dialect.name
+    created_at = datetime.utcnow()
+    created = 0
+
+    for start in range(0, len(changed_rows), batch_size):
+        batch = [
+            dict(row, created_at=created_at)
+            for row in changed_rows[start:start + batch_size]
+        ]
+        result = db.execute(build_upsert_statement(dialect_name, model, batch))
+        created += sum(1 for (row_created_at,) in result if row_created_at == created_at)
+
+    updated = len(changed_rows) - created
+    logger.info(
+        f"Upserted {model.__tablename__}: {created} created, "
+        f"{updated} updated, {unchanged} unchanged"
+    )
+    return UpsertResult(created, updated, unchanged)
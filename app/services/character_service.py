@@ -1,114 +1,225 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import or_, func
+from sqlalchemy import bindparam, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.character import Character
 from app.models.film import Film
+from app.models.character_film import character_film_association
 from app.schemas.character import CharacterCreate, CharacterUpdate
+from app.services.bulk import UpsertResult, build_upsert_statement, bulk_upsert, content_hash
+from app.services.loaders import include_related
+from app.services.relations import update_link_counts
 import logging
 
 logger = logging.getLogger(__name__)
 
+_SELECT_BY_ID = (
+    select(Character).options(selectinload(Character.films)).where(Character.id == bindparam("character_id"))
+)
+_SELECT_ROW_BY_ID = select(Character).where(Character.id == bindparam("character_id"))
+_SELECT_BY_SWAPI_ID = (
+    select(Character).options(selectinload(Character.films)).where(Character.swapi_id == bindparam("swapi_id"))
+)
+# List pages show film_count instead of the films, so they don't load any links
+_ORDERINGS = {
+    "votes": (Character.votes.desc(), Character.name),
+    "name": (Character.name,),
+    "film_count": (Character.film_count.desc(), Character.name),
+}
+_SELECT_PAGES = {
+    sort: select(Character).order_by(*ordering).offset(bindparam("skip")).limit(bindparam("limit"))
+    for sort, ordering in _ORDERINGS.items()
+}
+# A page of a character's films after a given film id, read off the
+# character_films index that leads with character_id
+_SELECT_FILMS_PAGE = (
+    select(Film)
+    .join(character_film_association, character_film_association.c.film_id == Film.id)
+    .where(
+        character_film_association.c.character_id == bindparam("character_id"),
+        character_film_association.c.film_id > bindparam("after")
+    )
+    .order_by(character_film_association.c.film_id)
+    .limit(bindparam("limit"))
+)
+_COUNT = select(func.count()).select_from(Character)
+_SEARCH_CONDITION = Character.name.ilike(bindparam("pattern"))
+_SELECT_SEARCH_PAGES = {sort: page.where(_SEARCH_CONDITION) for sort, page in _SELECT_PAGES.items()}
+_COUNT_SEARCH = _COUNT.where(_SEARCH_CONDITION)
+_SELECT_TOP = select(Character).order_by(Character.votes.desc()).limit(bindparam("limit"))
+_VOTE = (
+    select(Character)
+    .from_statement(
+        update(Character).where(Character.id == bindparam("character_id")).values(votes=Character.votes + 1).returning(Character)
+    )
+    .execution_options(populate_existing=True)
+)
+
 
 class CharacterService:
     """Service for character operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_character(self, character_id: int) -> Optional[Character]:
-        """Get character by ID"""
-        return self.db.query(Character).options(
-            selectinload(Character.films)
-        ).filter(Character.id == character_id).first()
+    async def get_character(
+        self, character_id: int, reload: bool = False, films_limit: Optional[int] = None
+    ) -> Optional[Character]:
+        """Get character by ID, re-reading a character already in the session if reload is set.
+
+        With films_limit, films holds only the first films_limit films
+        by id, none for 0, and character.film_count still counts them all.
+        """
+        if films_limit is None:
+            result = await self.db.execute(
+                _SELECT_BY_ID, {"character_id": character_id}, execution_options={"populate_existing": reload}
+            )
+            return result.scalar_one_or_none()
+
+        result = await self.db.execute(
+            _SELECT_ROW_BY_ID, {"character_id": character_id}, execution_options={"populate_existing": reload}
+        )
+        db_character = result.scalar_one_or_none()
+        if db_character is not None:
+            films = await self.get_character_films(character_id, limit=films_limit) if films_limit else []
+            set_committed_value(db_character, "films", films)
+        return db_character
     
-    def get_character_by_swapi_id(self, swapi_id: int) -> Optional[Character]:
-        """Get character by SWAPI ID"""
-        return self.db.query(Character).filter(Character.swapi_id == swapi_id).first()
-    
-    def get_characters(self, skip: int = 0, limit: int = 20) -> tuple[List[Character], int]:
-        """Get paginated list of characters"""
-        query = self.db.query(Character).options(selectinload(Character.films))
-        total = query.count()
-        characters = query.order_by(Character.votes.desc(), Character.name).offset(skip).limit(limit).all()
-        return characters, total
-    
-    def search_characters(self, name: str, skip: int = 0, limit: int = 20) -> tuple[List[Character], int]:
-        """Search characters by name"""
-        query = self.db.query(Character).options(selectinload(Character.films)).filter(
-            Character.name.ilike(f"%{name}%")
+    async def get_character_films(self, character_id: int, after: int = 0, limit: int = 20) -> Optional[List[Film]]:
+        """Get up to limit of a character's films with ids above after, by id, or None if there's no such character"""
+        result = await self.db.execute(
+            _SELECT_FILMS_PAGE, {"character_id": character_id, "after": after, "limit": limit}
         )
-        total = query.count()
-        characters = query.order_by(Character.votes.desc(), Character.name).offset(skip).limit(limit).all()
-        return characters, total
+        films = list(result.scalars())
+        if not films and await self.db.get(Character, character_id) is None:
+            return None
+        return films
+    
+    async def get_character_by_swapi_id(self, swapi_id: int) -> Optional[Character]:
+        """Get character by SWAPI ID"""
+        result = await self.db.execute(_SELECT_BY_SWAPI_ID, {"swapi_id": swapi_id})
+        return result.scalar_one_or_none()
+    
+    async def get_characters(self, skip: int = 0, limit: int = 20, sort: str = "votes") -> tuple[List[Character], int]:
+        """Get paginated list of characters, ordered by sort"""
+        page = self._page_statement(_SELECT_PAGES, sort)
+        total = await self.db.scalar(_COUNT)
+        result = await self.db.execute(page, {"skip": skip, "limit": limit})
+        return list(result.scalars()), total
+    
+    async def search_characters(
+        self, name: str, skip: int = 0, limit: int = 20, sort: str = "votes"
+    ) -> tuple[List[Character], int]:
+        """Search characters by name, ordered by sort"""
+        page = self._page_statement(_SELECT_SEARCH_PAGES, sort)
+        pattern = f"%{name}%"
+        total = await self.db.scalar(_COUNT_SEARCH, {"pattern": pattern})
+        result = await self.db.execute(page, {"pattern": pattern, "skip": skip, "limit": limit})
+        return list(result.scalars()), total
+    
+    async def include_films(self, characters: List[Character]) -> None:
+        """Load the films of all the given characters with one query, de-duplicating shared ones"""
+        await include_related(self.db, characters, Character, "films")
     
-    def create_character(self, character_data: CharacterCreate) -> Character:
+    async def create_character(self, character_data: CharacterCreate) -> Character:
         """Create a new character"""
-        db_character = Character(**character_data.model_dump())
+        # A new character has no films yet, so the collection starts loaded
+        db_character = Character(**character_data.model_dump(), films=[])
         self.db.add(db_character)
-        self.db.commit()
-        self.db.refresh(db_character)
+        # Server defaults come back through the INSERT's RETURNING clause
+        await self.db.commit()
         logger.info(f"Created character: {db_character.name}")
         return db_character
     
-    def update_character(self, character_id: int, character_data: CharacterUpdate) -> Optional[Character]:
-        """Update an existing character"""
-        db_character = self.get_character(character_id)
+    async def update_character(self, character_id: int, character_data: CharacterUpdate) -> Optional[Character]:
+        """Update an existing character with one UPDATE ... RETURNING, its films are not loaded"""
+        values = character_data.model_dump(exclude_unset=True)
+        values["content_hash"] = None
+        result = await self.db.execute(
+            select(Character)
+            .from_statement(update(Character).where(Character.id == character_id).values(**values).returning(Character))
+            .execution_options(populate_existing=True)
+        )
+        db_character = result.scalar_one_or_none()
         if not db_character:
             return None
         
-        update_data = character_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_character, field, value)
-        
-        self.db.commit()
-        self.db.refresh(db_character)
+        await self.db.commit()
         logger.info(f"Updated character: {db_character.name}")
         return db_character
     
-    def delete_character(self, character_id: int) -> bool:
+    async def delete_character(self, character_id: int) -> bool:
         """Delete a character"""
-        db_character = self.get_character(character_id)
+        db_character = await self.get_character(character_id)
         if not db_character:
             return False
         
-        self.db.delete(db_character)
-        self.db.commit()
+        film_ids = [film.id for film in db_character.films]
+        await self.db.delete(db_character)
+        # Its links go with it, so its films lose one from their counts
+        await self.db.flush()
+        await self.db.run_sync(update_link_counts, film_ids=film_ids)
+        await self.db.commit()
         logger.info(f"Deleted character: {db_character.name}")
         return True
     
-    def vote_for_character(self, character_id: int) -> Optional[Character]:
-        """Vote for a character (increment vote count)"""
-        db_character = self.get_character(character_id)
+    async def vote_for_character(self, character_id: int) -> Optional[Character]:
+        """Vote for a character (increment vote count) with one UPDATE ... RETURNING, its films are not loaded"""
+        result = await self.db.execute(_VOTE, {"character_id": character_id})
+        db_character = result.scalar_one_or_none()
         if not db_character:
             return None
         
-        # Use SQL update to increment votes
-        self.db.query(Character).filter(Character.id == character_id).update(
-            {Character.votes: Character.votes + 1}
-        )
-        self.db.commit()
-        
-        # Get fresh object with updated votes
-        updated_character = self.get_character(character_id)
-        if updated_character:
-            logger.info(f"Voted for character: {updated_character.name} (votes: {updated_character.votes})")
-        return updated_character
+        await self.db.commit()
+        logger.info(f"Voted for character: {db_character.name} (votes: {db_character.votes})")
+        return db_character
     
-    def get_top_characters(self, limit: int = 10) -> List[Character]:
+    async def get_top_characters(self, limit: int = 10) -> List[Character]:
         """Get top voted characters"""
-        return self.db.query(Character).order_by(
-            Character.votes.desc()
-        ).limit(limit).all()
+        result = await self.db.execute(_SELECT_TOP, {"limit": limit})
+        return list(result.scalars())
     
-    def create_or_update_from_swapi(self, swapi_data: dict) -> Character:
-        """Create or update character from SWAPI data"""
+    async def create_or_update_from_swapi(self, swapi_data: dict) -> Character:
+        """Create or update character from SWAPI data with one upsert, its films are not loaded"""
+        character_data = self._row_from_swapi(swapi_data)
+        character_data["content_hash"] = content_hash(character_data)
+        upsert = build_upsert_statement(self.db.get_bind().dialect.name, Character, [character_data], returning=Character)
+        result = await self.db.execute(
+            select(Character).from_statement(upsert).execution_options(populate_existing=True)
+        )
+        db_character = result.scalar_one()
+        await self.db.commit()
+        return db_character
+    
+    async def bulk_upsert_from_swapi(self, swapi_items: List[dict], commit: bool = True) -> UpsertResult:
+        """Create or update a batch of characters from SWAPI data in one transaction, left open unless commit"""
+        rows = [self._row_from_swapi(item) for item in swapi_items]
+        try:
+            result = await self.db.run_sync(bulk_upsert, Character, rows)
+            if commit:
+                await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self.db.expire_all()
+        return result
+    
+    @staticmethod
+    def _page_statement(statements: dict, sort: str):
+        try:
+            return statements[sort]
+        except KeyError:
+            raise ValueError(f"Unknown sort: {sort}")
+    
+    @staticmethod
+    def _row_from_swapi(swapi_data: dict) -> dict:
+        """Map a SWAPI character payload onto character columns"""
         swapi_id = swapi_data.get("swapi_id")
         if swapi_id is None:
             raise ValueError("SWAPI ID is required")
-            
-        existing = self.get_character_by_swapi_id(swapi_id)
         
-        character_data = {
+        return {
             "swapi_id": swapi_id,
             "name": swapi_data.get("name", ""),
             "height": swapi_data.get("height"),
@@ -121,19 +232,3 @@ class CharacterService:
             "homeworld": swapi_data.get("homeworld"),
             "url": swapi_data.get("url")
         }
-        
-        if existing:
-            # Update existing character
-            for field, value in character_data.items():
-                if field != "swapi_id":  # Don't update the ID
-                    setattr(existing, field, value)
-            self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        else:
-            # Create new character
-            db_character = Character(**character_data)
-            self.db.add(db_character)
-            self.db.commit()
-            self.db.refresh(db_character)
-            return db_character
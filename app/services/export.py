@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.models.character import Character
+from app.models.film import Film
+from app.models.starship import Starship
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ENTITIES = {
+    "characters": Character,
+    "films": Film,
+    "starships": Starship,
+}
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Bookkeeping columns that aren't part of an entity's data
+_INTERNAL_COLUMNS = {"content_hash"}
+
+
+def export_columns(entity: str, fields: Optional[Sequence[str]] = None) -> List[str]:
+    """The columns of entity to export: fields in the given order, or all of them"""
+    if entity not in EXPORT_ENTITIES:
+        raise ValueError(f"Unknown export entity: {entity}")
+    available = [
+        column.name for column in EXPORT_ENTITIES[entity].__table__.columns
+        if column.name not in _INTERNAL_COLUMNS
+    ]
+    if not fields:
+        return available
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown {entity} fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+async def export_rows(
+    session_factory: async_sessionmaker,
+    entity: str,
+    columns: Sequence[str],
+    export_format: str = "ndjson",
+    updated_since: Optional[datetime] = None
+) -> AsyncIterator[str]:
+    """Stream the rows of entity as NDJSON lines or CSV with a header, by id.
+
+    Rows are read with a server-side cursor, EXPORT_BATCH_SIZE at a time,
+    as plain column tuples rather than ORM objects, and each batch is
+    yielded as one chunk, so memory stays flat however large the table
+    is. The session is opened here rather than by the request, since the
+    response is sent after the endpoint returns.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    model = EXPORT_ENTITIES[entity]
+    statement = select(*(getattr(model, name) for name in columns)).order_by(model.id)
+    if updated_since is not None:
+        if updated_since.tzinfo is not None:
+            # Timestamps are stored as naive UTC
+            updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+        statement = statement.where(model.updated_at >= updated_since)
+
+    if export_format == "csv":
+        yield _csv_lines([columns])
+
+    count = 0
+    async with session_factory() as db:
+        rows = await db.stream(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for batch in rows.partitions():
+            if export_format == "csv":
+                yield _csv_lines(batch)
+            else:
+                yield "".join(_ndjson_line(columns, row) for row in batch)
+            count += len(batch)
+    logger.info(f"Exported {count} {entity} as {export_format}")
+
+
+def _ndjson_line(columns: Sequence[str], row: Sequence[Any]) -> str:
+    return json.dumps(dict(zip(columns, row)), separators=(",", ":"), default=str) + "\n"
+
+
+def _csv_lines(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
@@ -1,114 +1,225 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import or_, func
+from sqlalchemy import bindparam, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.film import Film
 from app.models.character import Character
+from app.models.character_film import character_film_association
 from app.schemas.film import FilmCreate, FilmUpdate
+from app.services.bulk import UpsertResult, build_upsert_statement, bulk_upsert, content_hash
+from app.services.loaders import include_related
+from app.services.relations import update_link_counts
 import logging
 
 logger = logging.getLogger(__name__)
 
+_SELECT_BY_ID = (
+    select(Film).options(selectinload(Film.characters)).where(Film.id == bindparam("film_id"))
+)
+_SELECT_ROW_BY_ID = select(Film).where(Film.id == bindparam("film_id"))
+_SELECT_BY_SWAPI_ID = (
+    select(Film).options(selectinload(Film.characters)).where(Film.swapi_id == bindparam("swapi_id"))
+)
+# List pages show character_count instead of the characters, so they don't load any links
+_ORDERINGS = {
+    "votes": (Film.votes.desc(), Film.title),
+    "title": (Film.title,),
+    "character_count": (Film.character_count.desc(), Film.title),
+}
+_SELECT_PAGES = {
+    sort: select(Film).order_by(*ordering).offset(bindparam("skip")).limit(bindparam("limit"))
+    for sort, ordering in _ORDERINGS.items()
+}
+# A page of a film's characters after a given character id, read off the
+# character_films index that leads with film_id
+_SELECT_CHARACTERS_PAGE = (
+    select(Character)
+    .join(character_film_association, character_film_association.c.character_id == Character.id)
+    .where(
+        character_film_association.c.film_id == bindparam("film_id"),
+        character_film_association.c.character_id > bindparam("after")
+    )
+    .order_by(character_film_association.c.character_id)
+    .limit(bindparam("limit"))
+)
+_COUNT = select(func.count()).select_from(Film)
+_SEARCH_CONDITION = Film.title.ilike(bindparam("pattern"))
+_SELECT_SEARCH_PAGES = {sort: page.where(_SEARCH_CONDITION) for sort, page in _SELECT_PAGES.items()}
+_COUNT_SEARCH = _COUNT.where(_SEARCH_CONDITION)
+_SELECT_TOP = select(Film).order_by(Film.votes.desc()).limit(bindparam("limit"))
+_VOTE = (
+    select(Film)
+    .from_statement(
+        update(Film).where(Film.id == bindparam("film_id")).values(votes=Film.votes + 1).returning(Film)
+    )
+    .execution_options(populate_existing=True)
+)
+
 
 class FilmService:
     """Service for film operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_film(self, film_id: int) -> Optional[Film]:
-        """Get film by ID"""
-        return self.db.query(Film).options(
-            selectinload(Film.characters)
-        ).filter(Film.id == film_id).first()
+    async def get_film(
+        self, film_id: int, reload: bool = False, characters_limit: Optional[int] = None
+    ) -> Optional[Film]:
+        """Get film by ID, re-reading a film already in the session if reload is set.
+
+        With characters_limit, characters holds only the first characters_limit characters
+        by id, none for 0, and film.character_count still counts them all.
+        """
+        if characters_limit is None:
+            result = await self.db.execute(
+                _SELECT_BY_ID, {"film_id": film_id}, execution_options={"populate_existing": reload}
+            )
+            return result.scalar_one_or_none()
+
+        result = await self.db.execute(
+            _SELECT_ROW_BY_ID, {"film_id": film_id}, execution_options={"populate_existing": reload}
+        )
+        db_film = result.scalar_one_or_none()
+        if db_film is not None:
+            characters = await self.get_film_characters(film_id, limit=characters_limit) if characters_limit else []
+            set_committed_value(db_film, "characters", characters)
+        return db_film
     
-    def get_film_by_swapi_id(self, swapi_id: int) -> Optional[Film]:
-        """Get film by SWAPI ID"""
-        return self.db.query(Film).filter(Film.swapi_id == swapi_id).first()
-    
-    def get_films(self, skip: int = 0, limit: int = 20) -> tuple[List[Film], int]:
-        """Get paginated list of films"""
-        query = self.db.query(Film).options(selectinload(Film.characters))
-        total = query.count()
-        films = query.order_by(Film.votes.desc(), Film.title).offset(skip).limit(limit).all()
-        return films, total
-    
-    def search_films(self, title: str, skip: int = 0, limit: int = 20) -> tuple[List[Film], int]:
-        """Search films by title"""
-        query = self.db.query(Film).options(selectinload(Film.characters)).filter(
-            Film.title.ilike(f"%{title}%")
+    async def get_film_characters(self, film_id: int, after: int = 0, limit: int = 20) -> Optional[List[Character]]:
+        """Get up to limit of a film's characters with ids above after, by id, or None if there's no such film"""
+        result = await self.db.execute(
+            _SELECT_CHARACTERS_PAGE, {"film_id": film_id, "after": after, "limit": limit}
         )
-        total = query.count()
-        films = query.order_by(Film.votes.desc(), Film.title).offset(skip).limit(limit).all()
-        return films, total
+        characters = list(result.scalars())
+        if not characters and await self.db.get(Film, film_id) is None:
+            return None
+        return characters
+    
+    async def get_film_by_swapi_id(self, swapi_id: int) -> Optional[Film]:
+        """Get film by SWAPI ID"""
+        result = await self.db.execute(_SELECT_BY_SWAPI_ID, {"swapi_id": swapi_id})
+        return result.scalar_one_or_none()
+    
+    async def get_films(self, skip: int = 0, limit: int = 20, sort: str = "votes") -> tuple[List[Film], int]:
+        """Get paginated list of films, ordered by sort"""
+        page = self._page_statement(_SELECT_PAGES, sort)
+        total = await self.db.scalar(_COUNT)
+        result = await self.db.execute(page, {"skip": skip, "limit": limit})
+        return list(result.scalars()), total
+    
+    async def search_films(
+        self, title: str, skip: int = 0, limit: int = 20, sort: str = "votes"
+    ) -> tuple[List[Film], int]:
+        """Search films by title, ordered by sort"""
+        page = self._page_statement(_SELECT_SEARCH_PAGES, sort)
+        pattern = f"%{title}%"
+        total = await self.db.scalar(_COUNT_SEARCH, {"pattern": pattern})
+        result = await self.db.execute(page, {"pattern": pattern, "skip": skip, "limit": limit})
+        return list(result.scalars()), total
+    
+    async def include_characters(self, films: List[Film]) -> None:
+        """Load the characters of all the given films with one query, de-duplicating shared ones"""
+        await include_related(self.db, films, Film, "characters")
     
-    def create_film(self, film_data: FilmCreate) -> Film:
+    async def create_film(self, film_data: FilmCreate) -> Film:
         """Create a new film"""
-        db_film = Film(**film_data.model_dump())
+        # A new film has no characters yet, so the collection starts loaded
+        db_film = Film(**film_data.model_dump(), characters=[])
         self.db.add(db_film)
-        self.db.commit()
-        self.db.refresh(db_film)
+        # Server defaults come back through the INSERT's RETURNING clause
+        await self.db.commit()
         logger.info(f"Created film: {db_film.title}")
         return db_film
     
-    def update_film(self, film_id: int, film_data: FilmUpdate) -> Optional[Film]:
-        """Update an existing film"""
-        db_film = self.get_film(film_id)
+    async def update_film(self, film_id: int, film_data: FilmUpdate) -> Optional[Film]:
+        """Update an existing film with one UPDATE ... RETURNING, its characters are not loaded"""
+        values = film_data.model_dump(exclude_unset=True)
+        values["content_hash"] = None
+        result = await self.db.execute(
+            select(Film)
+            .from_statement(update(Film).where(Film.id == film_id).values(**values).returning(Film))
+            .execution_options(populate_existing=True)
+        )
+        db_film = result.scalar_one_or_none()
         if not db_film:
             return None
         
-        update_data = film_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_film, field, value)
-        
-        self.db.commit()
-        self.db.refresh(db_film)
+        await self.db.commit()
         logger.info(f"Updated film: {db_film.title}")
         return db_film
     
-    def delete_film(self, film_id: int) -> bool:
+    async def delete_film(self, film_id: int) -> bool:
         """Delete a film"""
-        db_film = self.get_film(film_id)
+        db_film = await self.get_film(film_id)
         if not db_film:
             return False
         
-        self.db.delete(db_film)
-        self.db.commit()
+        character_ids = [character.id for character in db_film.characters]
+        await self.db.delete(db_film)
+        # Its links go with it, so its characters lose one from their counts
+        await self.db.flush()
+        await self.db.run_sync(update_link_counts, character_ids=character_ids)
+        await self.db.commit()
         logger.info(f"Deleted film: {db_film.title}")
         return True
     
-    def vote_for_film(self, film_id: int) -> Optional[Film]:
-        """Vote for a film (increment vote count)"""
-        db_film = self.get_film(film_id)
+    async def vote_for_film(self, film_id: int) -> Optional[Film]:
+        """Vote for a film (increment vote count) with one UPDATE ... RETURNING, its characters are not loaded"""
+        result = await self.db.execute(_VOTE, {"film_id": film_id})
+        db_film = result.scalar_one_or_none()
         if not db_film:
             return None
         
-        # Use SQL update to increment votes
-        self.db.query(Film).filter(Film.id == film_id).update(
-            {Film.votes: Film.votes + 1}
-        )
-        self.db.commit()
-        
-        # Get fresh object with updated votes
-        updated_film = self.get_film(film_id)
-        if updated_film:
-            logger.info(f"Voted for film: {updated_film.title} (votes: {updated_film.votes})")
-        return updated_film
+        await self.db.commit()
+        logger.info(f"Voted for film: {db_film.title} (votes: {db_film.votes})")
+        return db_film
     
-    def get_top_films(self, limit: int = 10) -> List[Film]:
+    async def get_top_films(self, limit: int = 10) -> List[Film]:
         """Get top voted films"""
-        return self.db.query(Film).order_by(
-            Film.votes.desc()
-        ).limit(limit).all()
+        result = await self.db.execute(_SELECT_TOP, {"limit": limit})
+        return list(result.scalars())
     
-    def create_or_update_from_swapi(self, swapi_data: dict) -> Film:
-        """Create or update film from SWAPI data"""
+    async def create_or_update_from_swapi(self, swapi_data: dict) -> Film:
+        """Create or update film from SWAPI data with one upsert, its characters are not loaded"""
+        film_data = self._row_from_swapi(swapi_data)
+        film_data["content_hash"] = content_hash(film_data)
+        upsert = build_upsert_statement(self.db.get_bind().dialect.name, Film, [film_data], returning=Film)
+        result = await self.db.execute(
+            select(Film).from_statement(upsert).execution_options(populate_existing=True)
+        )
+        db_film = result.scalar_one()
+        await self.db.commit()
+        return db_film
+    
+    async def bulk_upsert_from_swapi(self, swapi_items: List[dict], commit: bool = True) -> UpsertResult:
+        """Create or update a batch of films from SWAPI data in one transaction, left open unless commit"""
+        rows = [self._row_from_swapi(item) for item in swapi_items]
+        try:
+            result = await self.db.run_sync(bulk_upsert, Film, rows)
+            if commit:
+                await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self.db.expire_all()
+        return result
+    
+    @staticmethod
+    def _page_statement(statements: dict, sort: str):
+        try:
+            return statements[sort]
+        except KeyError:
+            raise ValueError(f"Unknown sort: {sort}")
+    
+    @staticmethod
+    def _row_from_swapi(swapi_data: dict) -> dict:
+        """Map a SWAPI film payload onto film columns"""
         swapi_id = swapi_data.get("swapi_id")
         if swapi_id is None:
             raise ValueError("SWAPI ID is required")
-            
-        existing = self.get_film_by_swapi_id(swapi_id)
         
-        film_data = {
+        return {
             "swapi_id": swapi_id,
             "title": swapi_data.get("title", ""),
             "episode_id": swapi_data.get("episode_id"),
@@ -118,19 +229,3 @@ class FilmService:
             "release_date": swapi_data.get("release_date"),
             "url": swapi_data.get("url")
         }
-        
-        if existing:
-            # Update existing film
-            for field, value in film_data.items():
-                if field != "swapi_id":  # Don't update the ID
-                    setattr(existing, field, value)
-            self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        else:
-            # Create new film
-            db_film = Film(**film_data)
-            self.db.add(db_film)
-            self.db.commit()
-            self.db.refresh(db_film)
-            return db_film
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Sequence
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.character import Character
+from app.models.character_film import character_film_association
+from app.models.film import Film
+
+
+class Relation(NamedTuple):
+    """One side of character_films, as seen from its parent model"""
+    parent: type
+    child: type
+    parent_column: object
+    child_column: object
+
+
+_links = character_film_association
+
+# Relationships that can be included, by parent model and name
+RELATIONS: Dict[tuple, Relation] = {
+    (Character, "films"): Relation(Character, Film, _links.c.character_id, _links.c.film_id),
+    (Film, "characters"): Relation(Film, Character, _links.c.film_id, _links.c.character_id),
+}
+
+# Every parent's children in one query, ordered by child id within a parent
+_SELECT_CHILDREN = {
+    key: (
+        select(relation.parent_column, relation.child)
+        .join(relation.child, relation.child.id == relation.child_column)
+        .where(relation.parent_column.in_(bindparam("parent_ids", expanding=True)))
+        .order_by(relation.parent_column, relation.child_column)
+    )
+    for key, relation in RELATIONS.items()
+}
+
+
+class RelationLoader:
+    """DataLoader-style batch loader for a relationship over character_films.
+
+    Parents are collected with add(), typically everything in one
+    response, then load() fetches the children of all of them with one
+    query and fills in each parent's relationship, as selectinload would.
+    A child shared by several parents is loaded once and the same object
+    is put in each of their lists.
+    """
+
+    def __init__(self, db: AsyncSession, model: type, name: str):
+        if (model, name) not in RELATIONS:
+            raise ValueError(f"Unknown relationship: {model.__name__}.{name}")
+        self.db = db
+        self.name = name
+        self.statement = _SELECT_CHILDREN[(model, name)]
+        self.parents: Dict[int, object] = {}
+
+    def add(self, parents: Sequence[object]) -> None:
+        """Queue parents to load the relationship of"""
+        self.parents.update((parent.id, parent) for parent in parents)
+
+    async def load(self) -> Dict[int, List[object]]:
+        """Load the children of every queued parent, returned by parent id"""
+        children: Dict[int, List[object]] = defaultdict(list)
+        if self.parents:
+            # Children come from the identity map, so a shared one is one object
+            result = await self.db.execute(self.statement, {"parent_ids": list(self.parents)})
+            for parent_id, child in result:
+                children[parent_id].append(child)
+        loaded = {}
+        for parent_id, parent in self.parents.items():
+            loaded[parent_id] = children[parent_id]
+            set_committed_value(parent, self.name, loaded[parent_id])
+        self.parents = {}
+        return loaded
+
+
+async def include_related(db: AsyncSession, parents: Sequence[object], model: type, name: str) -> None:
+    """Load the relationship name of every parent with one query"""
+    loader = RelationLoader(db, model, name)
+    loader.add(parents)
+    await loader.load()
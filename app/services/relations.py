@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.character import Character
+from app.models.character_film import character_film_association
+from app.models.film import Film
+from app.services.bulk import build_insert_ignore_statement
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LinkResult(NamedTuple):
+    """Association rows written by a relation sync"""
+    added: int
+    removed: int
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a SWAPI URL so trailing slashes don't affect lookups"""
+    return url.rstrip("/")
+
+
+def load_url_map(db: Session, model, urls: Optional[List[str]] = None) -> Dict[str, int]:
+    """Load a {swapi_url: id} map for a model, or for just the given URLs"""
+    if urls is None:
+        rows = db.execute(select(model.url, model.id).where(model.url.is_not(None)))
+        return {normalize_url(url): id_ for url, id_ in rows}
+
+    url_map = {}
+    batch_size = settings.SYNC_BATCH_SIZE
+    for start in range(0, len(urls), batch_size):
+        rows = db.execute(
+            select(model.url, model.id).where(model.url.in_(urls[start:start + batch_size]))
+        )
+        url_map.update((normalize_url(url), id_) for url, id_ in rows)
+    return url_map
+
+
+def resolve_links(
+    items: Iterable[dict],
+    field: str,
+    owner_map: Dict[str, int],
+    target_map: Dict[str, int]
+) -> Dict[int, Set[int]]:
+    """Resolve each item's list of related SWAPI URLs to local ids.
+
+    Items without the field are skipped, so their existing links are left
+    alone. URLs that don't resolve (the related row isn't synced yet) are
+    ignored.
+    """
+    links = {}
+    for item in items:
+        if field not in item or not item.get("url"):
+            continue
+        owner_id = owner_map.get(normalize_url(item["url"]))
+        if owner_id is None:
+            continue
+        links[owner_id] = {
+            target_map[normalize_url(url)]
+            for url in item[field] or []
+            if normalize_url(url) in target_map
+        }
+    return links
+
+
+def sync_character_films(
+    db: Session,
+    owner: str,
+    links: Dict[int, Set[int]],
+    listed_urls: Optional[Dict[int, Set[str]]] = None
+) -> LinkResult:
+    """Make the character_films rows of the given owners match links.
+
+    owner is "character" or "film" and says which side the keys of links
+    are. Existing pairs are loaded in bulk, then new pairs are written
+    with one INSERT and stale pairs removed with one DELETE. Pairs a
+    concurrent sync of the other side inserted meanwhile are skipped.
+    Runs in the caller's transaction, which it leaves for the caller to
+    commit together with the rows the links point at.
+
+    listed_urls maps owners to the normalized URLs their payload lists.
+    A pair that looks stale but whose target has one of those URLs is
+    kept: the target was written after links were resolved, e.g. by a
+    concurrent sync of the other side, and that sync linked it.
+    """
+    table = character_film_association
+    owner_column = table.c.character_id if owner == "character" else table.c.film_id
+
+    desired: Set[Tuple[int, int]] = set()
+    for owner_id, target_ids in links.items():
+        for target_id in target_ids:
+            desired.add((owner_id, target_id) if owner == "character" else (target_id, owner_id))
+
+    existing: Set[Tuple[int, int]] = set()
+    owner_ids: List[int] = list(links)
+    batch_size = settings.SYNC_BATCH_SIZE
+    for start in range(0, len(owner_ids), batch_size):
+        rows = db.execute(
+            select(table.c.character_id, table.c.film_id)
+            .where(owner_column.in_(owner_ids[start:start + batch_size]))
+        )
+        existing.update(tuple(row) for row in rows)
+
+    to_add = sorted(desired - existing)
+    to_remove = existing - desired
+    if to_remove and listed_urls:
+        to_remove -= _listed_pairs(db, owner, to_remove, listed_urls)
+    to_remove = sorted(to_remove)
+
+    added = removed = 0
+    if to_add:
+        # Only the pairs actually inserted come back
+        added = len(db.execute(
+            build_insert_ignore_statement(db.get_bind().dialect.name, table).returning(table.c.film_id),
+            [{"character_id": character_id, "film_id": film_id} for character_id, film_id in to_add]
+        ).all())
+    if to_remove:
+        removed = db.execute(
+            delete(table).where(tuple_(table.c.character_id, table.c.film_id).in_(to_remove))
+        ).rowcount
+    changed = to_add + to_remove
+    if changed:
+        update_link_counts(
+            db,
+            character_ids=sorted({character_id for character_id, _ in changed}),
+            film_ids=sorted({film_id for _, film_id in changed})
+        )
+
+    if added or removed:
+        logger.info(f"Synced character_films: {added} added, {removed} removed")
+    return LinkResult(added, removed)
+
+
+def update_link_counts(db: Session, character_ids: Iterable[int] = (), film_ids: Iterable[int] = ()) -> None:
+    """Recount film_count of the given characters and character_count of the given films.
+
+    The counts are recomputed from character_films rather than adjusted by
+    the rows just written, so syncs of both sides running at once can't
+    leave them off. Runs in the caller's transaction.
+    """
+    table = character_film_association
+    batch_size = settings.SYNC_BATCH_SIZE
+    for model, column, ids, link_column in (
+        (Character, Character.film_count, list(character_ids), table.c.character_id),
+        (Film, Film.character_count, list(film_ids), table.c.film_id),
+    ):
+        count = select(func.count()).select_from(table).where(link_column == model.id).scalar_subquery()
+        for start in range(0, len(ids), batch_size):
+            db.execute(
+                update(model)
+                .where(model.id.in_(ids[start:start + batch_size]))
+                .values({column: count})
+                .execution_options(synchronize_session=False)
+            )
+
+
+def _listed_pairs(
+    db: Session,
+    owner: str,
+    pairs: Set[Tuple[int, int]],
+    listed_urls: Dict[int, Set[str]]
+) -> Set[Tuple[int, int]]:
+    """The pairs whose target's URL is listed by their owner"""
+    target_model = Film if owner == "character" else Character
+    target_ids = list({film_id if owner == "character" else character_id for character_id, film_id in pairs})
+    target_urls = {}
+    batch_size = settings.SYNC_BATCH_SIZE
+    for start in range(0, len(target_ids), batch_size):
+        rows = db.execute(
+            select(target_model.id, target_model.url)
+            .where(target_model.id.in_(target_ids[start:start + batch_size]))
+        )
+        target_urls.update((id_, normalize_url(url)) for id_, url in rows if url)
+
+    listed = set()
+    for character_id, film_id in pairs:
+        owner_id, target_id = (character_id, film_id) if owner == "character" else (film_id, character_id)
+        if target_urls.get(target_id) in listed_urls.get(owner_id, ()):
+            listed.add((character_id, film_id))
+    return listed
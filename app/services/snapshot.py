@@ -0,0 +1,221 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.character import Character
+from app.models.character_film import character_film_association
+from app.models.film import Film
+from app.models.starship import Starship
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.starship_service import StarshipService
+from app.services.bulk import bulk_upsert
+from app.services.relations import sync_character_films
+import gzip
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "swapi-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Entity sections in the order they are written and loaded
+_ENTITIES = {
+    "characters": (Character, CharacterService),
+    "films": (Film, FilmService),
+    "starships": (Starship, StarshipService),
+}
+LINKS_SECTION = "character_films"
+
+
+def _snapshot_columns(service_class) -> List[str]:
+    """The SWAPI-sourced columns of an entity, as the sync writes them"""
+    return list(service_class._row_from_swapi({"swapi_id": 0}))
+
+
+async def export_snapshot(db: AsyncSession, path: str) -> Dict[str, int]:
+    """Dump all SWAPI data to a gzipped NDJSON snapshot at path.
+
+    The first line is a header, then one line per row of each entity
+    table, then one line per character listing its films. Rows are
+    keyed by swapi_id so the snapshot loads into any database. Local
+    state such as votes and ratings is not exported. Returns the number
+    of lines written per section.
+    """
+    counts = {}
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        _write_line(f, {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.utcnow().isoformat()
+        })
+
+        for section, (model, service_class) in _ENTITIES.items():
+            columns = [getattr(model, name) for name in _snapshot_columns(service_class)]
+            rows = await db.stream(
+                select(*columns)
+                .order_by(model.swapi_id)
+                .execution_options(yield_per=settings.SNAPSHOT_BATCH_SIZE)
+            )
+            counts[section] = 0
+            async for row in rows:
+                _write_line(f, {"type": section, **row._asdict()})
+                counts[section] += 1
+
+        counts[LINKS_SECTION] = 0
+        async for character_swapi_id, films in _iter_character_films(db):
+            _write_line(f, {"type": LINKS_SECTION, "character": character_swapi_id, "films": films})
+            counts[LINKS_SECTION] += 1
+    os.replace(tmp_path, path)
+
+    logger.info(f"Exported snapshot to {path}: {counts}")
+    return counts
+
+
+async def import_snapshot(db: AsyncSession, path: str) -> Dict[str, int]:
+    """Load a snapshot written by export_snapshot.
+
+    Lines are streamed from disk in chunks of SNAPSHOT_BATCH_SIZE, each
+    written through the sync's bulk upsert in one transaction, so memory
+    stays flat however large the snapshot is. When the tables start out
+    empty, their secondary indexes are dropped for the load and rebuilt
+    once at the end. Returns the number of lines loaded per section.
+    """
+    counts = dict.fromkeys([*_ENTITIES, LINKS_SECTION], 0)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "null")
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a SWAPI snapshot")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+
+        async with _deferred_indexes(db):
+            for section, records in _read_chunks(f, settings.SNAPSHOT_BATCH_SIZE):
+                await db.run_sync(_load_chunk, section, records)
+                counts[section] += len(records)
+
+    logger.info(f"Imported snapshot from {path}: {counts}")
+    return counts
+
+
+def _write_line(f, record: Dict[str, Any]) -> None:
+    f.write(json.dumps(record, separators=(",", ":"), default=str))
+    f.write("\n")
+
+
+async def _iter_character_films(db: AsyncSession) -> AsyncIterator:
+    """Stream (character swapi_id, film swapi_ids) pairs ordered by character"""
+    table = character_film_association
+    pairs = await db.stream(
+        select(Character.swapi_id, Film.swapi_id)
+        .select_from(table)
+        .join(Character, Character.id == table.c.character_id)
+        .join(Film, Film.id == table.c.film_id)
+        .order_by(Character.swapi_id, Film.swapi_id)
+        .execution_options(yield_per=settings.SNAPSHOT_BATCH_SIZE)
+    )
+    character_swapi_id, films = None, []
+    async for character, film in pairs:
+        if films and character != character_swapi_id:
+            yield character_swapi_id, films
+            films = []
+        character_swapi_id = character
+        films.append(film)
+    if films:
+        yield character_swapi_id, films
+
+
+def _read_chunks(lines: Iterable[str], chunk_size: int) -> Iterator:
+    """Group snapshot lines into (section, records) chunks of one section each"""
+    section = None
+    records: List[Dict[str, Any]] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        record_section = record.pop("type", None)
+        if record_section not in _ENTITIES and record_section != LINKS_SECTION:
+            raise ValueError(f"Unknown snapshot section: {record_section}")
+        if records and (record_section != section or len(records) >= chunk_size):
+            yield section, records
+            records = []
+        section = record_section
+        records.append(record)
+    if records:
+        yield section, records
+
+
+def _load_chunk(db: Session, section: str, records: List[Dict[str, Any]]) -> None:
+    """Write one chunk of a section in a single transaction"""
+    try:
+        _write_chunk(db, section, records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _write_chunk(db: Session, section: str, records: List[Dict[str, Any]]) -> None:
+    if section in _ENTITIES:
+        model, service_class = _ENTITIES[section]
+        bulk_upsert(db, model, [service_class._row_from_swapi(record) for record in records])
+        return
+
+    character_ids = _id_map(db, Character, [record["character"] for record in records])
+    film_ids = _id_map(db, Film, list({film for record in records for film in record["films"]}))
+    links = {
+        character_ids[record["character"]]: {
+            film_ids[film] for film in record["films"] if film in film_ids
+        }
+        for record in records
+        if record["character"] in character_ids
+    }
+    sync_character_films(db, "character", links)
+
+
+def _id_map(db: Session, model, swapi_ids: List[int]) -> Dict[int, int]:
+    """Map swapi_ids to local ids, in batches"""
+    id_map = {}
+    batch_size = settings.SYNC_BATCH_SIZE
+    for start in range(0, len(swapi_ids), batch_size):
+        id_map.update(db.execute(
+            select(model.swapi_id, model.id)
+            .where(model.swapi_id.in_(swapi_ids[start:start + batch_size]))
+        ).all())
+    return id_map
+
+
+@asynccontextmanager
+async def _deferred_indexes(db: AsyncSession) -> AsyncIterator[None]:
+    """Drop secondary indexes of empty entity tables while loading into them.
+
+    Unique indexes stay, since the upsert's ON CONFLICT needs them. The
+    dropped indexes are rebuilt even if the load fails.
+    """
+    indexes = []
+    for model, _ in _ENTITIES.values():
+        if (await db.execute(select(model.id).limit(1))).first() is None:
+            indexes.extend(index for index in model.__table__.indexes if not index.unique)
+
+    connection = await db.connection()
+    for index in indexes:
+        await connection.run_sync(index.drop, checkfirst=True)
+    await db.commit()
+    if indexes:
+        logger.info(f"Deferred {len(indexes)} index builds until the import finishes")
+
+    try:
+        yield
+    finally:
+        await db.rollback()
+        connection = await db.connection()
+        for index in indexes:
+            await connection.run_sync(index.create, checkfirst=True)
+        await db.commit()
@@ -1,111 +1,152 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import bindparam, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.starship import Starship
 from app.schemas.starship import StarshipCreate, StarshipUpdate
+from app.services.bulk import UpsertResult, build_upsert_statement, bulk_upsert, content_hash
 import logging
 
 logger = logging.getLogger(__name__)
 
+_SELECT_BY_ID = select(Starship).where(Starship.id == bindparam("starship_id"))
+_SELECT_BY_SWAPI_ID = select(Starship).where(Starship.swapi_id == bindparam("swapi_id"))
+_SELECT_PAGE = (
+    select(Starship)
+    .order_by(Starship.votes.desc(), Starship.name)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+_COUNT = select(func.count()).select_from(Starship)
+_SEARCH_CONDITION = Starship.name.ilike(bindparam("pattern"))
+_SELECT_SEARCH_PAGE = _SELECT_PAGE.where(_SEARCH_CONDITION)
+_COUNT_SEARCH = _COUNT.where(_SEARCH_CONDITION)
+_SELECT_TOP = select(Starship).order_by(Starship.votes.desc()).limit(bindparam("limit"))
+_VOTE = (
+    select(Starship)
+    .from_statement(
+        update(Starship).where(Starship.id == bindparam("starship_id")).values(votes=Starship.votes + 1).returning(Starship)
+    )
+    .execution_options(populate_existing=True)
+)
+
 
 class StarshipService:
     """Service for starship operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_starship(self, starship_id: int) -> Optional[Starship]:
-        """Get starship by ID"""
-        return self.db.query(Starship).filter(Starship.id == starship_id).first()
+    async def get_starship(self, starship_id: int, reload: bool = False) -> Optional[Starship]:
+        """Get starship by ID, re-reading a starship already in the session if reload is set"""
+        result = await self.db.execute(
+            _SELECT_BY_ID, {"starship_id": starship_id}, execution_options={"populate_existing": reload}
+        )
+        return result.scalar_one_or_none()
     
-    def get_starship_by_swapi_id(self, swapi_id: int) -> Optional[Starship]:
+    async def get_starship_by_swapi_id(self, swapi_id: int) -> Optional[Starship]:
         """Get starship by SWAPI ID"""
-        return self.db.query(Starship).filter(Starship.swapi_id == swapi_id).first()
+        result = await self.db.execute(_SELECT_BY_SWAPI_ID, {"swapi_id": swapi_id})
+        return result.scalar_one_or_none()
     
-    def get_starships(self, skip: int = 0, limit: int = 20) -> tuple[List[Starship], int]:
+    async def get_starships(self, skip: int = 0, limit: int = 20) -> tuple[List[Starship], int]:
         """Get paginated list of starships"""
-        query = self.db.query(Starship)
-        total = query.count()
-        starships = query.order_by(Starship.votes.desc(), Starship.name).offset(skip).limit(limit).all()
-        return starships, total
+        total = await self.db.scalar(_COUNT)
+        result = await self.db.execute(_SELECT_PAGE, {"skip": skip, "limit": limit})
+        return list(result.scalars()), total
     
-    def search_starships(self, name: str, skip: int = 0, limit: int = 20) -> tuple[List[Starship], int]:
+    async def search_starships(self, name: str, skip: int = 0, limit: int = 20) -> tuple[List[Starship], int]:
         """Search starships by name"""
-        query = self.db.query(Starship).filter(
-            Starship.name.ilike(f"%{name}%")
-        )
-        total = query.count()
-        starships = query.order_by(Starship.votes.desc(), Starship.name).offset(skip).limit(limit).all()
-        return starships, total
+        pattern = f"%{name}%"
+        total = await self.db.scalar(_COUNT_SEARCH, {"pattern": pattern})
+        result = await self.db.execute(_SELECT_SEARCH_PAGE, {"pattern": pattern, "skip": skip, "limit": limit})
+        return list(result.scalars()), total
     
-    def create_starship(self, starship_data: StarshipCreate) -> Starship:
+    async def create_starship(self, starship_data: StarshipCreate) -> Starship:
         """Create a new starship"""
         db_starship = Starship(**starship_data.model_dump())
         self.db.add(db_starship)
-        self.db.commit()
-        self.db.refresh(db_starship)
+        # Server defaults come back through the INSERT's RETURNING clause
+        await self.db.commit()
         logger.info(f"Created starship: {db_starship.name}")
         return db_starship
     
-    def update_starship(self, starship_id: int, starship_data: StarshipUpdate) -> Optional[Starship]:
-        """Update an existing starship"""
-        db_starship = self.get_starship(starship_id)
+    async def update_starship(self, starship_id: int, starship_data: StarshipUpdate) -> Optional[Starship]:
+        """Update an existing starship with one UPDATE ... RETURNING"""
+        values = starship_data.model_dump(exclude_unset=True)
+        values["content_hash"] = None
+        result = await self.db.execute(
+            select(Starship)
+            .from_statement(update(Starship).where(Starship.id == starship_id).values(**values).returning(Starship))
+            .execution_options(populate_existing=True)
+        )
+        db_starship = result.scalar_one_or_none()
         if not db_starship:
             return None
         
-        update_data = starship_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_starship, field, value)
-        
-        self.db.commit()
-        self.db.refresh(db_starship)
+        await self.db.commit()
         logger.info(f"Updated starship: {db_starship.name}")
         return db_starship
     
-    def delete_starship(self, starship_id: int) -> bool:
+    async def delete_starship(self, starship_id: int) -> bool:
         """Delete a starship"""
-        db_starship = self.get_starship(starship_id)
+        db_starship = await self.get_starship(starship_id)
         if not db_starship:
             return False
         
-        self.db.delete(db_starship)
-        self.db.commit()
+        await self.db.delete(db_starship)
+        await self.db.commit()
         logger.info(f"Deleted starship: {db_starship.name}")
         return True
     
-    def vote_for_starship(self, starship_id: int) -> Optional[Starship]:
-        """Vote for a starship (increment vote count)"""
-        db_starship = self.get_starship(starship_id)
+    async def vote_for_starship(self, starship_id: int) -> Optional[Starship]:
+        """Vote for a starship (increment vote count) with one UPDATE ... RETURNING"""
+        result = await self.db.execute(_VOTE, {"starship_id": starship_id})
+        db_starship = result.scalar_one_or_none()
         if not db_starship:
             return None
         
-        # Use SQL update to increment votes
-        self.db.query(Starship).filter(Starship.id == starship_id).update(
-            {Starship.votes: Starship.votes + 1}
-        )
-        self.db.commit()
-        
-        # Get fresh object with updated votes
-        updated_starship = self.get_starship(starship_id)
-        if updated_starship:
-            logger.info(f"Voted for starship: {updated_starship.name} (votes: {updated_starship.votes})")
-        return updated_starship
+        await self.db.commit()
+        logger.info(f"Voted for starship: {db_starship.name} (votes: {db_starship.votes})")
+        return db_starship
     
-    def get_top_starships(self, limit: int = 10) -> List[Starship]:
+    async def get_top_starships(self, limit: int = 10) -> List[Starship]:
         """Get top voted starships"""
-        return self.db.query(Starship).order_by(
-            Starship.votes.desc()
-        ).limit(limit).all()
+        result = await self.db.execute(_SELECT_TOP, {"limit": limit})
+        return list(result.scalars())
+    
+    async def create_or_update_from_swapi(self, swapi_data: dict) -> Starship:
+        """Create or update starship from SWAPI data with one upsert"""
+        starship_data = self._row_from_swapi(swapi_data)
+        starship_data["content_hash"] = content_hash(starship_data)
+        upsert = build_upsert_statement(self.db.get_bind().dialect.name, Starship, [starship_data], returning=Starship)
+        result = await self.db.execute(
+            select(Starship).from_statement(upsert).execution_options(populate_existing=True)
+        )
+        db_starship = result.scalar_one()
+        await self.db.commit()
+        return db_starship
+    
+    async def bulk_upsert_from_swapi(self, swapi_items: List[dict], commit: bool = True) -> UpsertResult:
+        """Create or update a batch of starships from SWAPI data in one transaction, left open unless commit"""
+        rows = [self._row_from_swapi(item) for item in swapi_items]
+        try:
+            result = await self.db.run_sync(bulk_upsert, Starship, rows)
+            if commit:
+                await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self.db.expire_all()
+        return result
     
-    def create_or_update_from_swapi(self, swapi_data: dict) -> Starship:
-        """Create or update starship from SWAPI data"""
+    @staticmethod
+    def _row_from_swapi(swapi_data: dict) -> dict:
+        """Map a SWAPI starship payload onto starship columns"""
         swapi_id = swapi_data.get("swapi_id")
         if swapi_id is None:
             raise ValueError("SWAPI ID is required")
-            
-        existing = self.get_starship_by_swapi_id(swapi_id)
         
-        starship_data = {
+        return {
             "swapi_id": swapi_id,
             "name": swapi_data.get("name", ""),
             "model": swapi_data.get("model"),
@@ -122,19 +163,3 @@ class StarshipService:
             "starship_class": swapi_data.get("starship_class"),
             "url": swapi_data.get("url")
         }
-        
-        if existing:
-            # Update existing starship
-            for field, value in starship_data.items():
-                if field != "swapi_id":  # Don't update the ID
-                    setattr(existing, field, value)
-            self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        else:
-            # Create new starship
-            db_starship = Starship(**starship_data)
-            self.db.add(db_starship)
-            self.db.commit()
-            self.db.refresh(db_starship)
-            return db_starship
@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """A SWAPI response body stored in the cache with its validators"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class SWAPIResponseCache:
+    """Disk-backed cache of SWAPI responses, stored in a SQLite file"""
+
+    def __init__(self, path: str, max_age: float, max_bytes: int):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, "
+            "body BLOB NOT NULL, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "stored_at REAL NOT NULL, "
+            "size INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_stored_at ON responses (stored_at)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the cached bodies"""
+        return self._total_bytes
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Get the cached response for a URL, fresh or not"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        """Whether a cached response can be served without revalidation"""
+        return time.time() - cached.stored_at < self.max_age
+
+    def set(self, url: str, body: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store a response body and its validators"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, etag, last_modified, stored_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time(), len(body))
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def touch(self, url: str) -> None:
+        """Mark a cached response as fresh after a successful revalidation"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection"""
+        self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop the oldest responses until the cache fits in max_bytes"""
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY stored_at"
+        ).fetchall()
+        evicted = []
+        for url, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((url,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} responses from the SWAPI cache")
+
+
+def create_response_cache() -> Optional[SWAPIResponseCache]:
+    """Create the SWAPI response cache configured in settings, if enabled"""
+    if not settings.SWAPI_CACHE_ENABLED:
+        return None
+    return SWAPIResponseCache(
+        settings.SWAPI_CACHE_PATH,
+        max_age=settings.SWAPI_CACHE_MAX_AGE,
+        max_bytes=settings.SWAPI_CACHE_MAX_BYTES
+    )
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import httpx
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class SWAPIError(Exception):
+    """SWAPI could not be reached, or kept failing after retries"""
+
+
+class CircuitOpenError(SWAPIError):
+    """Raised without a request while the circuit breaker is open"""
+
+
+class DeadlineExceededError(SWAPIError):
+    """Raised when a fetch runs out of its time budget"""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given 0-based retry attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class Deadline:
+    """Time budget shared by every request of one fetch"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        # No budget (None or 0) never expires
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a budget"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self) -> None:
+        """Raise DeadlineExceededError once the budget is spent"""
+        if self.remaining() == 0:
+            raise DeadlineExceededError("SWAPI fetch deadline exceeded")
+
+
+class CircuitBreaker:
+    """Fails SWAPI requests fast after repeated upstream failures.
+
+    After failure_threshold consecutive failures the circuit opens and
+    requests are refused for reset_timeout seconds. One trial request is
+    then let through, closing the circuit on success or reopening it on
+    failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now"""
+        if self.state == self.CLOSED:
+            return
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            raise CircuitOpenError("SWAPI circuit breaker is open")
+        # Let one trial through, and another if it never reported back
+        self.state = self.HALF_OPEN
+        self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("SWAPI circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.failure_threshold and self.failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                logger.warning(f"SWAPI circuit breaker opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
@@ -1,66 +1,453 @@
+import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from functools import partial
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, List, Dict, Any, Iterable, NamedTuple, Optional, Set, Tuple
 from app.config import settings
+from app.services.swapi_cache import SWAPIResponseCache
+from app.services.swapi_resilience import (
+    RETRYABLE_STATUS_CODES, CircuitBreaker, Deadline, DeadlineExceededError, SWAPIError,
+    backoff_delay, retry_after_seconds
+)
+import json
 import logging
+import math
 import ssl
+import time
 
 logger = logging.getLogger(__name__)
 
+# Called with (pages fetched so far, total pages if known)
+PageCallback = Callable[[int, Optional[int]], None]
+
+# Bound on remembered 404s, oldest forgotten first
+_NOT_FOUND_MAX_ENTRIES = 10000
+
+
+def http_client_options() -> Dict[str, Any]:
+    """Build the httpx client options for talking to SWAPI from settings"""
+    if settings.SWAPI_VERIFY_SSL:
+        verify: Any = True
+    else:
+        # Create SSL context that doesn't verify certificates (for development)
+        verify = ssl.create_default_context()
+        verify.check_hostname = False
+        verify.verify_mode = ssl.CERT_NONE
+    
+    http2 = settings.SWAPI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("SWAPI_HTTP2 is enabled but h2 is not installed, falling back to HTTP/1.1")
+            http2 = False
+    
+    return {
+        "timeout": httpx.Timeout(settings.SWAPI_TIMEOUT, connect=settings.SWAPI_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=settings.SWAPI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SWAPI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SWAPI_KEEPALIVE_EXPIRY
+        ),
+        "http2": http2,
+        "verify": verify
+    }
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled, keep-alive HTTP client to be shared across requests"""
+    return httpx.AsyncClient(**http_client_options())
+
+
+class Page(NamedTuple):
+    """One page of items from a paginated endpoint"""
+    number: int
+    items: List[Dict[str, Any]]
+
+
+class FetchStatus:
+    """Progress and failures of a paginated fetch, filled in as pages arrive"""
+    
+    def __init__(self):
+        self.failed_pages: List[int] = []
+        self.expected_count: Optional[int] = None
+        self.pages_fetched = 0
+        self.pages_total: Optional[int] = None
+        # Seconds spent in requests, summed over concurrent ones
+        self.http_seconds = 0.0
+    
+    @property
+    def complete(self) -> bool:
+        """Whether every page was fetched successfully"""
+        return not self.failed_pages
+
+
+class FetchResult(list, FetchStatus):
+    """List of items fetched from a paginated endpoint, with the fetch's status"""
+    
+    def __init__(self, items: Optional[List[Dict[str, Any]]] = None):
+        list.__init__(self, items or [])
+        FetchStatus.__init__(self)
+
 
 class SWAPIService:
     """Service for interacting with the Star Wars API"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[SWAPIResponseCache] = None
+    ):
         self.base_url = settings.SWAPI_BASE_URL
-        self.timeout = 30.0
-        # Create SSL context that doesn't verify certificates (for development)
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.max_concurrency = max(1, settings.SWAPI_MAX_CONCURRENCY)
+        # Shared client owned by the caller (e.g. the app lifespan)
+        self.client = client
+        # Optional on-disk response cache
+        self.cache = cache
+        # Fetch-by-id requests in flight, and recent 404s with their expiry
+        self._in_flight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._not_found: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        # Shared by every call so an unhealthy upstream fails fast for all
+        self.breaker = CircuitBreaker(
+            settings.SWAPI_BREAKER_THRESHOLD,
+            settings.SWAPI_BREAKER_RESET_TIMEOUT
+        )
     
-    async def fetch_all_characters(self) -> List[Dict[str, Any]]:
+    @asynccontextmanager
+    async def _client_session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the shared client, or a short-lived one if none was injected"""
+        if self.client is not None:
+            yield self.client
+        else:
+            async with httpx.AsyncClient(**http_client_options()) as client:
+                yield client
+    
+    async def fetch_all_characters(self, on_page: Optional[PageCallback] = None) -> FetchResult:
         """Fetch all characters from SWAPI"""
-        return await self._fetch_all_pages("people")
+        return await self._fetch_all_pages("people", on_page=on_page)
     
-    async def fetch_all_films(self) -> List[Dict[str, Any]]:
+    async def fetch_all_films(self, on_page: Optional[PageCallback] = None) -> FetchResult:
         """Fetch all films from SWAPI"""
-        return await self._fetch_all_pages("films")
+        return await self._fetch_all_pages("films", on_page=on_page)
     
-    async def fetch_all_starships(self) -> List[Dict[str, Any]]:
+    async def fetch_all_starships(self, on_page: Optional[PageCallback] = None) -> FetchResult:
         """Fetch all starships from SWAPI"""
-        return await self._fetch_all_pages("starships")
+        return await self._fetch_all_pages("starships", on_page=on_page)
+    
+    def iter_characters(
+        self,
+        status: Optional[FetchStatus] = None,
+        on_page: Optional[PageCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Page]:
+        """Stream pages of characters from SWAPI"""
+        return self.iter_pages("people", status=status, on_page=on_page, deadline=deadline)
     
-    async def _fetch_all_pages(self, endpoint: str) -> List[Dict[str, Any]]:
-        """Fetch all pages for a given endpoint"""
-        all_items = []
+    def iter_films(
+        self,
+        status: Optional[FetchStatus] = None,
+        on_page: Optional[PageCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Page]:
+        """Stream pages of films from SWAPI"""
+        return self.iter_pages("films", status=status, on_page=on_page, deadline=deadline)
+    
+    def iter_starships(
+        self,
+        status: Optional[FetchStatus] = None,
+        on_page: Optional[PageCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Page]:
+        """Stream pages of starships from SWAPI"""
+        return self.iter_pages("starships", status=status, on_page=on_page, deadline=deadline)
+    
+    async def _fetch_all_pages(self, endpoint: str, on_page: Optional[PageCallback] = None) -> FetchResult:
+        """Fetch all pages for a given endpoint into one list, in page order"""
+        result = FetchResult()
+        pages = [page async for page in self.iter_pages(endpoint, status=result, on_page=on_page)]
+        for page in sorted(pages, key=lambda page: page.number):
+            result.extend(page.items)
+        return result
+    
+    async def iter_pages(
+        self,
+        endpoint: str,
+        status: Optional[FetchStatus] = None,
+        on_page: Optional[PageCallback] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Page]:
+        """Stream the pages of an endpoint as they arrive.
+
+        The first page gives the total count, the remaining pages are then
+        fetched concurrently and yielded in completion order. At most
+        max_concurrency pages are in flight, and no new request starts
+        while the consumer holds a page, so memory stays bounded however
+        large the dataset. Pages that still fail after retries, or that
+        the deadline (SWAPI_SYNC_DEADLINE by default) leaves no time for,
+        are recorded in the status rather than raised, and
+        on_page(pages_fetched, pages_total) is called as pages arrive.
+        """
+        status = FetchStatus() if status is None else status
+        deadline = deadline or Deadline(settings.SWAPI_SYNC_DEADLINE)
         url = f"{self.base_url}/{endpoint}/"
         
-        async with httpx.AsyncClient(timeout=self.timeout, verify=False) as client:
-            while url:
-                try:
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    # Add items with SWAPI ID extracted from URL
-                    for item in data.get("results", []):
-                        # Extract ID from URL (e.g., "https://swapi.dev/api/people/1/" -> 1)
-                        swapi_id = self._extract_id_from_url(item.get("url", ""))
-                        if swapi_id:
-                            item["swapi_id"] = swapi_id
-                            all_items.append(item)
-                    
-                    url = data.get("next")  # Get next page URL
-                    
-                except httpx.HTTPError as e:
-                    logger.error(f"HTTP error fetching {endpoint}: {e}")
-                    break
-                except Exception as e:
-                    logger.error(f"Unexpected error fetching {endpoint}: {e}")
+        async with self._client_session() as client:
+            try:
+                first_page = await self._get_json(client, url, deadline, status)
+            except (httpx.HTTPError, SWAPIError) as e:
+                logger.error(f"HTTP error fetching {endpoint}: {e}")
+                status.failed_pages.append(1)
+                return
+            except Exception as e:
+                logger.error(f"Unexpected error fetching {endpoint}: {e}")
+                status.failed_pages.append(1)
+                return
+            
+            status.expected_count = first_page.get("count")
+            page_urls = self._remaining_page_urls(url, first_page)
+            status.pages_total = None if page_urls is None else len(page_urls) + 1
+            self._page_done(status, on_page)
+            yield Page(1, self._extract_items(first_page))
+            
+            if page_urls is None:
+                # No usable count, fall back to following "next" links
+                pages = self._follow_next_links(client, endpoint, first_page, status, deadline, on_page)
+            else:
+                pages = self._fetch_pages_concurrently(client, endpoint, page_urls, status, deadline, on_page)
+            async for page in pages:
+                yield page
+        
+        status.failed_pages.sort()
+        if status.failed_pages:
+            logger.warning(
+                f"Fetched {status.pages_fetched} {endpoint} pages from SWAPI, "
+                f"failed pages: {status.failed_pages}"
+            )
+        else:
+            logger.info(f"Fetched {status.pages_fetched} {endpoint} pages from SWAPI")
+    
+    async def _fetch_pages_concurrently(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        page_urls: List[str],
+        status: FetchStatus,
+        deadline: Deadline,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[Page]:
+        """Fetch pages 2..N through a sliding window of max_concurrency requests"""
+        
+        async def fetch(page_number: int, page_url: str):
+            try:
+                return page_number, await self._get_json(client, page_url, deadline, status), None
+            except Exception as e:
+                return page_number, None, e
+        
+        pending: Set[asyncio.Task] = set()
+        queued = iter(enumerate(page_urls, start=2))
+        try:
+            while True:
+                for page_number, page_url in queued:
+                    pending.add(asyncio.create_task(fetch(page_number, page_url)))
+                    if len(pending) >= self.max_concurrency:
+                        break
+                if not pending:
                     break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page_number, page, error = task.result()
+                    if error is not None:
+                        logger.error(f"Error fetching {endpoint} page {page_number}: {error}")
+                        status.failed_pages.append(page_number)
+                        continue
+                    self._page_done(status, on_page)
+                    yield Page(page_number, self._extract_items(page))
+        finally:
+            # The consumer stopped early, don't leave requests running
+            for task in pending:
+                task.cancel()
+    
+    def _page_done(self, status: FetchStatus, on_page: Optional[PageCallback]) -> None:
+        status.pages_fetched += 1
+        if on_page:
+            on_page(status.pages_fetched, status.pages_total)
+    
+    async def _get_json(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        deadline: Optional[Deadline] = None,
+        status: Optional[FetchStatus] = None
+    ) -> Dict[str, Any]:
+        """GET a URL and return its decoded JSON body, going through the cache.
+
+        Fresh cached bodies are returned without a request. Stale ones are
+        revalidated with a conditional request, and served as-is when
+        upstream is slow, unreachable or failing. The time taken, retries
+        included, is added to status.http_seconds.
+        """
+        started = time.perf_counter()
+        try:
+            return await self._get_json_cached(client, url, deadline)
+        finally:
+            if status is not None:
+                status.http_seconds += time.perf_counter() - started
+    
+    async def _get_json_cached(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        cached = self.cache.get(url) if self.cache else None
+        if cached is None:
+            response = await self._send(client, url, deadline=deadline)
+            response.raise_for_status()
+            if self.cache:
+                self._store(url, response)
+            return response.json()
+        
+        if self.cache.is_fresh(cached):
+            return json.loads(cached.body)
+        
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        
+        try:
+            response = await asyncio.wait_for(
+                self._send(client, url, headers=headers, deadline=deadline),
+                timeout=settings.SWAPI_CACHE_REVALIDATE_TIMEOUT
+            )
+            if response.status_code == 304:
+                self.cache.touch(url)
+                return json.loads(cached.body)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500 and e.response.status_code != 429:
+                raise
+            logger.warning(f"Serving stale cached response for {url}: {e}")
+            return json.loads(cached.body)
+        except (httpx.HTTPError, SWAPIError, asyncio.TimeoutError) as e:
+            logger.warning(f"Serving stale cached response for {url}: {e!r}")
+            return json.loads(cached.body)
         
-        logger.info(f"Fetched {len(all_items)} {endpoint} from SWAPI")
-        return all_items
+        self._store(url, response)
+        return response.json()
+    
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> httpx.Response:
+        """GET a URL, retrying transient failures.
+
+        Transport errors, 429 and 5xx responses are retried up to
+        SWAPI_RETRY_ATTEMPTS times with jittered exponential backoff, or
+        after the server's Retry-After. Every attempt passes the circuit
+        breaker first, and neither attempts nor waits may outlast the
+        deadline. The last retryable response is returned as-is once
+        attempts run out.
+        """
+        attempts = max(1, settings.SWAPI_RETRY_ATTEMPTS)
+        for attempt in range(attempts):
+            if deadline:
+                deadline.check()
+            self.breaker.before_request()
+            
+            retry_after = None
+            try:
+                request = client.get(url, headers=headers)
+                remaining = deadline.remaining() if deadline else None
+                response = await (request if remaining is None else asyncio.wait_for(request, remaining))
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError(f"Deadline exceeded fetching {url}")
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                logger.warning(f"Retrying {url} after {e!r}")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                # Rate limiting says nothing about upstream health
+                if response.status_code != 429:
+                    self.breaker.record_failure()
+                if attempt == attempts - 1:
+                    return response
+                retry_after = retry_after_seconds(response)
+                logger.warning(f"Retrying {url} after HTTP {response.status_code}")
+            
+            if retry_after is None:
+                delay = backoff_delay(attempt, settings.SWAPI_RETRY_BACKOFF_BASE, settings.SWAPI_RETRY_MAX_DELAY)
+            else:
+                delay = min(retry_after, settings.SWAPI_RETRY_MAX_DELAY)
+            remaining = deadline.remaining() if deadline else None
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceededError(f"Deadline exceeded waiting to retry {url}")
+            await asyncio.sleep(delay)
+    
+    def _store(self, url: str, response: httpx.Response) -> None:
+        """Store a successful response in the cache with its validators"""
+        self.cache.set(
+            url,
+            response.content,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified")
+        )
+    
+    async def _follow_next_links(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        first_page: Dict[str, Any],
+        status: FetchStatus,
+        deadline: Deadline,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[Page]:
+        """Sequentially follow "next" links when the page count is unknown"""
+        url = first_page.get("next")
+        page_number = 1
+        while url:
+            page_number += 1
+            try:
+                page = await self._get_json(client, url, deadline, status)
+            except Exception as e:
+                logger.error(f"Error fetching {endpoint} page {page_number}: {e}")
+                status.failed_pages.append(page_number)
+                break
+            self._page_done(status, on_page)
+            yield Page(page_number, self._extract_items(page))
+            url = page.get("next")
+    
+    def _remaining_page_urls(self, url: str, first_page: Dict[str, Any]) -> Optional[List[str]]:
+        """Compute the URLs of pages 2..N from the first page's count"""
+        count = first_page.get("count")
+        page_size = len(first_page.get("results", []))
+        if not isinstance(count, int) or page_size == 0:
+            return None
+        if not first_page.get("next"):
+            return []
+        
+        total_pages = math.ceil(count / page_size)
+        return [f"{url}?page={page}" for page in range(2, total_pages + 1)]
+    
+    def _extract_items(self, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the items of a page with their SWAPI ID extracted from URL"""
+        items = []
+        for item in page.get("results", []):
+            # Extract ID from URL (e.g., "https://swapi.dev/api/people/1/" -> 1)
+            swapi_id = self._extract_id_from_url(item.get("url", ""))
+            if swapi_id:
+                item["swapi_id"] = swapi_id
+                items.append(item)
+        return items
     
     def _extract_id_from_url(self, url: str) -> Optional[int]:
         """Extract ID from SWAPI URL"""
@@ -83,22 +470,93 @@ class SWAPIService:
         """Fetch a specific starship by SWAPI ID"""
         return await self._fetch_by_id("starships", swapi_id)
     
+    async def fetch_many_by_ids(
+        self,
+        endpoint: str,
+        swapi_ids: Iterable[int]
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Fetch several items of an endpoint, at most max_concurrency at a time.
+
+        Returns {swapi_id: item}, with None for items SWAPI doesn't have.
+        Items that could not be fetched are logged and left out.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        unique_ids = list(dict.fromkeys(swapi_ids))
+        
+        async def fetch_limited(swapi_id: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._fetch_by_id(endpoint, swapi_id)
+        
+        responses = await asyncio.gather(
+            *(fetch_limited(swapi_id) for swapi_id in unique_ids),
+            return_exceptions=True
+        )
+        items = {}
+        for swapi_id, response in zip(unique_ids, responses):
+            if isinstance(response, BaseException) and not isinstance(response, Exception):
+                raise response
+            if isinstance(response, Exception):
+                logger.error(f"Error fetching {endpoint}/{swapi_id}: {response}")
+                continue
+            items[swapi_id] = response
+        return items
+    
     async def _fetch_by_id(self, endpoint: str, swapi_id: int) -> Optional[Dict[str, Any]]:
-        """Fetch a specific item by ID"""
+        """Fetch a specific item by ID.
+
+        Returns None if SWAPI has no such item, and raises SWAPIError if it
+        could not be fetched, so an outage isn't mistaken for a missing item.
+        Concurrent calls for the same item share one upstream request, and
+        a 404 is remembered for SWAPI_NOT_FOUND_TTL seconds.
+        """
+        key = (endpoint, swapi_id)
+        expires_at = self._not_found.get(key)
+        if expires_at is not None:
+            if time.monotonic() < expires_at:
+                return None
+            del self._not_found[key]
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_by_id_uncoalesced(endpoint, swapi_id))
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._fetch_by_id_done, key))
+        
+        # Shielded, so one caller giving up doesn't cancel it for the others
+        data = await asyncio.shield(task)
+        if data is None:
+            self._remember_not_found(key)
+            return None
+        return dict(data)
+    
+    def _fetch_by_id_done(self, key: Tuple[str, int], task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # Mark a failure as retrieved, in case every caller gave up waiting
+        if not task.cancelled():
+            task.exception()
+    
+    def _remember_not_found(self, key: Tuple[str, int]) -> None:
+        ttl = settings.SWAPI_NOT_FOUND_TTL
+        if ttl <= 0:
+            return
+        self._not_found[key] = time.monotonic() + ttl
+        self._not_found.move_to_end(key)
+        while len(self._not_found) > _NOT_FOUND_MAX_ENTRIES:
+            self._not_found.popitem(last=False)
+    
+    async def _fetch_by_id_uncoalesced(self, endpoint: str, swapi_id: int) -> Optional[Dict[str, Any]]:
         url = f"{self.base_url}/{endpoint}/{swapi_id}/"
         
-        async with httpx.AsyncClient(timeout=self.timeout, verify=False) as client:
+        async with self._client_session() as client:
             try:
-                response = await client.get(url)
-                if response.status_code == 404:
+                data = await self._get_json(client, url)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
                     return None
-                response.raise_for_status()
-                data = response.json()
-                data["swapi_id"] = swapi_id
-                return data
+                logger.error(f"HTTP error fetching {endpoint}/{swapi_id}: {e}")
+                raise SWAPIError(f"SWAPI returned {e.response.status_code} for {endpoint}/{swapi_id}") from e
             except httpx.HTTPError as e:
                 logger.error(f"HTTP error fetching {endpoint}/{swapi_id}: {e}")
-                return None
-            except Exception as e:
-                logger.error(f"Unexpected error fetching {endpoint}/{swapi_id}: {e}")
-                return None
+                raise SWAPIError(f"Could not fetch {endpoint}/{swapi_id}: {e}") from e
+        data["swapi_id"] = swapi_id
+        return data
@@ -0,0 +1,128 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.services.swapi_service import SWAPIService
+from app.services.sync_service import SyncProgress, SyncResult, SyncService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJob:
+    """A sync of one SWAPI resource running in the background"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    PARTIAL = "partial"  # Finished, but some pages could not be fetched
+    FAILED = "failed"
+
+    def __init__(self, entity: str):
+        self.id = uuid.uuid4().hex
+        self.entity = entity
+        self.status = self.PENDING
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.progress = SyncProgress()
+        self.result: Optional[SyncResult] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (self.PENDING, self.RUNNING)
+
+    # Progress, flattened for the API response
+    @property
+    def pages_fetched(self) -> int:
+        return self.progress.pages_fetched
+
+    @property
+    def pages_total(self) -> Optional[int]:
+        return self.progress.pages_total
+
+    @property
+    def rows_written(self) -> int:
+        return self.progress.rows_written
+
+    @property
+    def rate(self) -> float:
+        return self.progress.rate
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        return self.progress.eta_seconds if self.active else None
+
+
+class SyncJobManager:
+    """Runs sync jobs in the background, one at a time per resource"""
+
+    def __init__(self, history_size: Optional[int] = None):
+        self.history_size = history_size or settings.SYNC_JOB_HISTORY
+        self._jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._active: Dict[str, SyncJob] = {}
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        """Get a job by ID"""
+        return self._jobs.get(job_id)
+
+    def start(
+        self,
+        entity: str,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        swapi_service: SWAPIService
+    ) -> SyncJob:
+        """Start a sync job, or return the one already running for entity"""
+        running = self._active.get(entity)
+        if running and running.active:
+            logger.info(f"Attaching to running {entity} sync job {running.id}")
+            return running
+
+        job = SyncJob(entity)
+        self._jobs[job.id] = job
+        self._active[entity] = job
+        self._prune()
+        job.task = asyncio.create_task(self._run(job, session_factory, swapi_service))
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel jobs that are still running"""
+        tasks = [job.task for job in self._active.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(
+        self,
+        job: SyncJob,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        swapi_service: SWAPIService
+    ) -> None:
+        job.status = SyncJob.RUNNING
+        try:
+            async with session_factory() as db:
+                job.result = await SyncService(db, swapi_service).sync(job.entity, job.progress)
+            job.status = SyncJob.COMPLETED if job.result.complete else SyncJob.PARTIAL
+            logger.info(f"Sync job {job.id} for {job.entity} {job.status}")
+        except Exception as e:
+            job.status = SyncJob.FAILED
+            job.error = str(e)
+            logger.error(f"Sync job {job.id} for {job.entity} failed: {e}")
+        except asyncio.CancelledError:
+            job.status = SyncJob.FAILED
+            job.error = "Cancelled"
+            raise
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond history_size"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history_size:
+                break
+            if not self._jobs[job_id].active:
+                del self._jobs[job_id]
@@ -0,0 +1,303 @@
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.character import Character
+from app.models.film import Film
+from app.services.bulk import UpsertResult
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.starship_service import StarshipService
+from app.services.relations import (
+    LinkResult, load_url_map, normalize_url, resolve_links, sync_character_films
+)
+from app.services.swapi_resilience import Deadline
+from app.services.swapi_service import FetchStatus, Page, SWAPIService
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Resources that can be synced, as named in the API
+SYNC_ENTITIES = ("characters", "films", "starships")
+
+COMPLETE = "complete"
+PARTIAL = "partial"
+
+
+class SyncResult(NamedTuple):
+    """Outcome of syncing one SWAPI resource into the database.
+
+    status is "complete" when every page was written, or "partial" when
+    pages failed after retries or were cut off by the deadline.
+    """
+    total: int
+    created: int
+    updated: int
+    unchanged: int
+    links_added: int
+    links_removed: int
+    status: str
+    failed_pages: List[int]
+
+    @property
+    def complete(self) -> bool:
+        """Whether every page was written"""
+        return self.status == COMPLETE
+
+
+class SyncProgress:
+    """Live progress counters of a running sync"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.pages_fetched = 0
+        self.pages_total: Optional[int] = None
+        self.rows_written = 0
+        # Seconds spent in SWAPI requests (summed over concurrent ones),
+        # the writer spent waiting for fetched pages, and writing
+        self.http_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+        self.db_seconds = 0.0
+
+    def on_page(self, pages_fetched: int, pages_total: Optional[int]) -> None:
+        """Record a fetched page, used as the SWAPI page callback"""
+        self.pages_fetched = pages_fetched
+        self.pages_total = pages_total
+
+    def add_rows(self, count: int) -> None:
+        """Record rows written to the database"""
+        self.rows_written += count
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Pages fetched per second so far"""
+        elapsed = self.elapsed
+        return self.pages_fetched / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until every page is fetched, if known"""
+        if not self.pages_total or not self.pages_fetched:
+            return None
+        remaining = self.pages_total - self.pages_fetched
+        return remaining / self.rate if self.rate else None
+
+
+class SyncService:
+    """Service for syncing SWAPI resources into the database"""
+
+    def __init__(self, db: AsyncSession, swapi_service: SWAPIService):
+        self.db = db
+        self.swapi_service = swapi_service
+
+    async def sync_characters(self, progress: Optional[SyncProgress] = None) -> SyncResult:
+        """Sync characters and their film links from SWAPI"""
+        return await self._sync(
+            self.swapi_service.iter_characters,
+            partial(CharacterService(self.db).bulk_upsert_from_swapi, commit=False),
+            progress,
+            links=("character", "films")
+        )
+
+    async def sync_films(self, progress: Optional[SyncProgress] = None) -> SyncResult:
+        """Sync films and their character links from SWAPI"""
+        return await self._sync(
+            self.swapi_service.iter_films,
+            partial(FilmService(self.db).bulk_upsert_from_swapi, commit=False),
+            progress,
+            links=("film", "characters")
+        )
+
+    async def sync_starships(self, progress: Optional[SyncProgress] = None) -> SyncResult:
+        """Sync starships from SWAPI"""
+        return await self._sync(
+            self.swapi_service.iter_starships,
+            partial(StarshipService(self.db).bulk_upsert_from_swapi, commit=False),
+            progress
+        )
+
+    async def sync(self, entity: str, progress: Optional[SyncProgress] = None) -> SyncResult:
+        """Sync one of SYNC_ENTITIES by name"""
+        if entity not in SYNC_ENTITIES:
+            raise ValueError(f"Unknown sync entity: {entity}")
+        return await getattr(self, f"sync_{entity}")(progress)
+
+    async def hydrate(self, entity: str, swapi_id: int) -> bool:
+        """Fetch one item of SYNC_ENTITIES from SWAPI and write it with its links.
+
+        Fills in a single row on a local miss without a full sync.
+        Concurrent misses for the same item share one request, and recent
+        404s are answered without one. Returns False if SWAPI has no such
+        item, and raises SWAPIError if it could not be fetched.
+        """
+        if entity not in SYNC_ENTITIES:
+            raise ValueError(f"Unknown sync entity: {entity}")
+        fetch, upsert_page, links = {
+            "characters": (
+                self.swapi_service.fetch_character_by_id,
+                partial(CharacterService(self.db).bulk_upsert_from_swapi, commit=False),
+                ("character", "films")
+            ),
+            "films": (
+                self.swapi_service.fetch_film_by_id,
+                partial(FilmService(self.db).bulk_upsert_from_swapi, commit=False),
+                ("film", "characters")
+            ),
+            "starships": (
+                self.swapi_service.fetch_starship_by_id,
+                partial(StarshipService(self.db).bulk_upsert_from_swapi, commit=False),
+                None
+            ),
+        }[entity]
+
+        item = await fetch(swapi_id)
+        if item is None:
+            return False
+        await self._write_page([item], upsert_page, links, {})
+        logger.info(f"Hydrated {entity} {swapi_id} from SWAPI")
+        return True
+
+    async def _sync(
+        self,
+        pages: Callable[..., AsyncIterator[Page]],
+        upsert_page: Callable[[List[Dict[str, Any]]], Awaitable[UpsertResult]],
+        progress: Optional[SyncProgress] = None,
+        links: Optional[Tuple[str, str]] = None
+    ) -> SyncResult:
+        """Stream pages from SWAPI into the database.
+
+        A producer task feeds fetched pages into a bounded queue while this
+        coroutine drains it, writing each page in its own transaction.
+        Fetching and writing overlap, at most
+        SYNC_QUEUE_SIZE pages wait in memory, and pages already committed
+        are kept if the sync fails part way. Cancellation takes effect
+        between pages, once the page being written is committed.
+        """
+        progress = progress or SyncProgress()
+        status = FetchStatus()
+        deadline = Deadline(settings.SWAPI_SYNC_DEADLINE)
+        queue: "asyncio.Queue[Optional[Page]]" = asyncio.Queue(maxsize=max(1, settings.SYNC_QUEUE_SIZE))
+
+        async def produce() -> None:
+            try:
+                async for page in pages(status=status, on_page=progress.on_page, deadline=deadline):
+                    await queue.put(page)
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        # Related rows resolved so far, filled in as pages reference them
+        target_map: Dict[str, int] = {}
+
+        total = created = updated = unchanged = links_added = links_removed = 0
+        producer = asyncio.create_task(produce())
+        try:
+            waited_at = time.perf_counter()
+            while (page := await queue.get()) is not None:
+                written_at = time.perf_counter()
+                progress.queue_wait_seconds += written_at - waited_at
+                progress.http_seconds = status.http_seconds
+                write = asyncio.ensure_future(
+                    self._write_page(page.items, upsert_page, links, target_map)
+                )
+                try:
+                    upsert, link_result = await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # Let the page finish its transaction before the caller
+                    # closes the session under it
+                    await asyncio.gather(write, return_exceptions=True)
+                    raise
+                waited_at = time.perf_counter()
+                progress.db_seconds += waited_at - written_at
+                total += len(page.items)
+                created += upsert.created
+                updated += upsert.updated
+                unchanged += upsert.unchanged
+                links_added += link_result.added
+                links_removed += link_result.removed
+                progress.add_rows(upsert.created + upsert.updated)
+            # Surface a failure of the fetcher itself
+            await producer
+            progress.http_seconds = status.http_seconds
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        if not status.complete:
+            logger.warning(f"Partial sync, {total} items written, failed pages: {status.failed_pages}")
+
+        return SyncResult(
+            total=total,
+            created=created,
+            updated=updated,
+            unchanged=unchanged,
+            links_added=links_added,
+            links_removed=links_removed,
+            status=COMPLETE if status.complete else PARTIAL,
+            failed_pages=list(status.failed_pages)
+        )
+
+    async def _write_page(
+        self,
+        items: List[Dict[str, Any]],
+        upsert_page: Callable[[List[Dict[str, Any]]], Awaitable[UpsertResult]],
+        links: Optional[Tuple[str, str]],
+        target_map: Dict[str, int]
+    ) -> Tuple[UpsertResult, LinkResult]:
+        """Upsert one page and its character_films rows, committed together"""
+        try:
+            upsert = await upsert_page(items)
+            link_result = LinkResult(0, 0)
+            if links is not None:
+                owner, field = links
+                link_result = await self.db.run_sync(self._sync_links, items, owner, field, target_map)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return upsert, link_result
+
+    @staticmethod
+    def _sync_links(
+        session: Session,
+        items: List[Dict[str, Any]],
+        owner: str,
+        field: str,
+        target_map: Dict[str, int]
+    ) -> LinkResult:
+        """Write the character_films rows described by the items' URL lists.
+
+        target_map caches related rows across pages. URLs it doesn't know
+        yet are looked up on every page, so rows written meanwhile, e.g.
+        by a sync of the other side running concurrently, get linked, and
+        links that sync wrote to rows this one missed are not removed.
+        """
+        if not any(field in item for item in items):
+            return LinkResult(0, 0)
+
+        owner_model, target_model = (Character, Film) if owner == "character" else (Film, Character)
+        owner_map = load_url_map(
+            session, owner_model, urls=[item["url"] for item in items if item.get("url")]
+        )
+        unresolved = list({
+            url for item in items for url in item.get(field) or []
+            if normalize_url(url) not in target_map
+        })
+        if unresolved:
+            target_map.update(load_url_map(session, target_model, urls=unresolved))
+        links = resolve_links(items, field, owner_map=owner_map, target_map=target_map)
+        listed_urls = {
+            owner_map[normalize_url(item["url"])]: {normalize_url(url) for url in item.get(field) or []}
+            for item in items
+            if field in item and item.get("url") and normalize_url(item["url"]) in owner_map
+        }
+        return sync_character_films(session, owner, links, listed_urls=listed_urls)
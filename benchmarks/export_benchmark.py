@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the streaming export against paging through the list endpoint
+
+Seeds a throwaway SQLite database with --rows characters, then streams
+the whole table through the export the /export/characters endpoint
+serves, reporting rows per second, the time to the first chunk and,
+with --trace-memory, the peak memory allocated while exporting. With
+--paging-rows it also reads that many rows the way clients did before,
+a COUNT and an OFFSET page of 100 per request, for comparison.
+
+Usage:
+    python benchmarks/export_benchmark.py --rows 1000000 --format csv
+    python benchmarks/export_benchmark.py --rows 100000 --paging-rows 20000 --trace-memory
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  Registers every table on Base.metadata
+from app.config import settings
+from app.database import Base
+from app.models.character import Character
+from app.services.character_service import CharacterService
+from app.services.export import export_columns, export_rows
+
+SEED_CHUNK = 50000
+
+
+def seed_characters(url: str, rows: int) -> None:
+    """Create the tables and insert rows characters, a chunk at a time"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for start in range(1, rows + 1, SEED_CHUNK):
+            connection.execute(insert(Character), [
+                {"swapi_id": i, "name": f"Person {i}", "height": "172", "mass": "77", "votes": i % 50}
+                for i in range(start, min(start + SEED_CHUNK, rows + 1))
+            ])
+    engine.dispose()
+
+
+async def run_export(session_factory, export_format: str, fields: Optional[str], trace_memory: bool) -> Dict[str, Any]:
+    """Stream the characters table through the export and time it"""
+    columns = export_columns("characters", fields.split(",") if fields else None)
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    first_chunk = None
+    size = lines = 0
+    async for chunk in export_rows(session_factory, "characters", columns, export_format):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        size += len(chunk)
+        lines += chunk.count("\n")
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    rows = lines - 1 if export_format == "csv" else lines
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "first_chunk_ms": (first_chunk or 0.0) * 1000,
+        "megabytes": size / 1_000_000,
+        "peak_memory_mb": peak / 1_000_000 if peak is not None else None,
+    }
+
+
+async def run_paging(session_factory, rows: int, size: int = 100) -> Dict[str, Any]:
+    """Read the first rows characters a page at a time, the way the list endpoint serves them"""
+    started = time.perf_counter()
+    read = 0
+    async with session_factory() as db:
+        service = CharacterService(db)
+        while read < rows:
+            characters, _ = await service.get_characters(skip=read, limit=min(size, rows - read))
+            if not characters:
+                break
+            read += len(characters)
+            db.expunge_all()
+    elapsed = time.perf_counter() - started
+    return {"rows": read, "seconds": elapsed, "rows_per_sec": read / elapsed if elapsed else 0.0}
+
+
+async def run_benchmark(
+    rows: int = 100000,
+    export_format: str = "ndjson",
+    fields: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    paging_rows: int = 0,
+    trace_memory: bool = False
+) -> Dict[str, Any]:
+    """Seed rows characters, export them and optionally page through some, returning the metrics"""
+    previous_batch_size = settings.EXPORT_BATCH_SIZE
+    if batch_size:
+        settings.EXPORT_BATCH_SIZE = batch_size
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.db")
+            seed_characters(f"sqlite:///{path}", rows)
+            engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+            metrics = {
+                "format": export_format,
+                "batch_size": settings.EXPORT_BATCH_SIZE,
+                "export": await run_export(session_factory, export_format, fields, trace_memory),
+                "paging": await run_paging(session_factory, paging_rows) if paging_rows else None,
+            }
+            await engine.dispose()
+    finally:
+        settings.EXPORT_BATCH_SIZE = previous_batch_size
+    return metrics
+
+
+def print_metrics(metrics: Dict[str, Any]):
+    """Print the benchmark report"""
+    export = metrics["export"]
+    print(f"\n📊 Export of {export['rows']} characters as {metrics['format']} (batches of {metrics['batch_size']})")
+    print(f"  Time:         {export['seconds']:.2f}s ({export['rows_per_sec']:.0f} rows/sec)")
+    print(f"  First chunk:  {export['first_chunk_ms']:.1f}ms")
+    print(f"  Output:       {export['megabytes']:.1f} MB")
+    if export["peak_memory_mb"] is not None:
+        print(f"  Peak memory:  {export['peak_memory_mb']:.1f} MB")
+
+    paging = metrics["paging"]
+    if paging:
+        print(f"\n📊 Paging through {paging['rows']} characters, 100 per page")
+        print(f"  Time:         {paging['seconds']:.2f}s ({paging['rows_per_sec']:.0f} rows/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming export of a large table")
+    parser.add_argument("--rows", type=int, default=1000000, help="Characters seeded and exported")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--fields", help="Comma-separated columns to export, all if unset")
+    parser.add_argument("--batch-size", type=int, help="Rows per fetch, EXPORT_BATCH_SIZE if unset")
+    parser.add_argument("--paging-rows", type=int, default=0, help="Also read this many rows by OFFSET paging")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak memory, slowing the export")
+    args = parser.parse_args()
+
+    print_metrics(asyncio.run(run_benchmark(
+        rows=args.rows,
+        export_format=args.format,
+        fields=args.fields,
+        batch_size=args.batch_size,
+        paging_rows=args.paging_rows,
+        trace_memory=args.trace_memory
+    )))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Load test of the read endpoints under concurrent requests
+
+Seeds a throwaway SQLite database with characters, films, starships and
+their links, then fires concurrent requests at the list, search, detail
+and top endpoints and reports requests/sec and latency percentiles. The
+app is served in process through httpx's ASGI transport, on this
+script's event loop, so a route that blocks the loop stalls every other
+request in flight. With --url the requests go to a running server
+instead, which must already hold data.
+
+Usage:
+    python benchmarks/load_test.py --requests 1000 --concurrency 50
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+API_PREFIX = "/api/v1"
+
+
+def seed_database(url: str, characters: int, films: int, starships: int) -> None:
+    """Create the tables and fill them with generated rows"""
+    import app.models  # noqa: F401  Registers every table on Base.metadata
+    from app.database import Base
+    from app.models.character import Character
+    from app.models.character_film import character_film_association
+    from app.models.film import Film
+    from app.models.starship import Starship
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Character), [
+            {"swapi_id": i, "name": f"Person {i}", "height": "172", "votes": i % 50}
+            for i in range(1, characters + 1)
+        ])
+        connection.execute(insert(Film), [
+            {"swapi_id": i, "title": f"Film {i}", "episode_id": i, "votes": i}
+            for i in range(1, films + 1)
+        ])
+        connection.execute(insert(Starship), [
+            {"swapi_id": i, "name": f"Starship {i}", "votes": i % 20}
+            for i in range(1, starships + 1)
+        ])
+        if films:
+            connection.execute(insert(character_film_association), [
+                {"character_id": i, "film_id": film_id}
+                for i in range(1, characters + 1)
+                for film_id in {i % films + 1, (i * 5 + 3) % films + 1}
+            ])
+    engine.dispose()
+
+
+def request_paths(count: int, characters: int, films: int, starships: int) -> List[str]:
+    """A deterministic mix of read requests over the seeded rows"""
+    pages = max(1, characters // 20)
+    mix = [
+        lambda n: f"/characters/?page={n % pages + 1}&size=20",
+        lambda n: f"/characters/{n % characters + 1}",
+        lambda n: f"/characters/search?name=Person%20{n % 100 + 1}",
+        lambda n: "/characters/top/voted?limit=10",
+        lambda n: f"/films/{n % films + 1}",
+        lambda n: "/films/?size=20",
+        lambda n: f"/starships/?page={n % max(1, starships // 20) + 1}&size=20",
+        lambda n: f"/starships/{n % starships + 1}",
+    ]
+    return [API_PREFIX + mix[n % len(mix)](n) for n in range(count)]
+
+
+async def fire(client: httpx.AsyncClient, paths: List[str], concurrency: int) -> Dict[str, Any]:
+    """Send every path with at most concurrency requests in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def send(path: str):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(path) for path in paths))
+    wall_clock = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(paths),
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_clock": wall_clock,
+        "requests_per_sec": len(paths) / wall_clock if wall_clock else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def run_load_test(
+    requests: int = 1000,
+    concurrency: int = 50,
+    characters: int = 2000,
+    films: int = 6,
+    starships: int = 1000,
+    url: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the load test and return its metrics"""
+    paths = request_paths(requests, characters, films, starships)
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            return await fire(client, paths, concurrency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'load_test.db')}"
+        # The app reads its database URL when first imported
+        os.environ["DATABASE_URL"] = database_url
+        seed_database(database_url, characters, films, starships)
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+            # One request first, so connection setup isn't measured
+            await client.get(f"{API_PREFIX}/films/")
+            return await fire(client, paths, concurrency)
+
+
+def print_metrics(metrics: Dict[str, Any]):
+    """Print the load test report"""
+    print(f"\n📊 Load test ({metrics['concurrency']} concurrent)")
+    print(f"  Requests:   {metrics['requests']} ({metrics['errors']} errors)")
+    print(f"  Wall clock: {metrics['wall_clock']:.2f}s")
+    print(f"  Throughput: {metrics['requests_per_sec']:.1f} requests/sec")
+    print(f"  Latency:    p50 {metrics['p50_ms']:.1f}ms, p95 {metrics['p95_ms']:.1f}ms, max {metrics['max_ms']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the read endpoints")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--films", type=int, default=6)
+    parser.add_argument("--starships", type=int, default=1000)
+    parser.add_argument("--url", help="Load test a running server holding data instead")
+    args = parser.parse_args()
+
+    metrics = asyncio.run(run_load_test(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        characters=args.characters,
+        films=args.films,
+        starships=args.starships,
+        url=args.url
+    ))
+    print_metrics(metrics)
+    if metrics["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
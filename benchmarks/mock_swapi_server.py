@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Generated SWAPI dataset served by the tests' mock SWAPI
+
+Builds people, films and starships that link to each other and serves
+them with tests/mock_swapi.py's MockSWAPI, so the tests and benchmarks
+share one mock. Records are built on the fly from their id, so datasets
+of 100k records and more cost no memory.
+
+In process, pass mock.transport to an httpx.AsyncClient. Standalone, the
+mock is mounted as an ASGI app and served by uvicorn:
+    python benchmarks/mock_swapi_server.py --people 100000 --latency 0.05
+"""
+import argparse
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Add the parent directory to the path so we can import from app and tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from tests.mock_swapi import MockSWAPI
+
+BASE_PATH = "/api"
+MOCK_BASE_URL = f"http://mock-swapi{BASE_PATH}"
+
+
+class GeneratedRecords(Sequence):
+    """Read-only list of records, each built from its id when accessed"""
+
+    def __init__(self, count: int, build: Callable[[int], Dict[str, Any]]):
+        self.count = count
+        self.build = build
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.build(position + 1) for position in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.build(index + 1)
+
+
+class SWAPIDataset:
+    """Generated people, films and starships whose payloads link to each other"""
+
+    def __init__(
+        self,
+        people: int = 82,
+        films: int = 6,
+        starships: int = 36,
+        base_url: str = MOCK_BASE_URL
+    ):
+        self.counts = {"people": people, "films": films, "starships": starships}
+        self.base_url = base_url
+        # Each film's characters, indexed once rather than scanning the people per film
+        self.film_people: Dict[int, List[int]] = defaultdict(list)
+        for person_id in range(1, people + 1):
+            for film_id in self.film_ids(person_id):
+                self.film_people[film_id].append(person_id)
+        self.resources = {
+            "people": GeneratedRecords(people, self.person),
+            "films": GeneratedRecords(films, self.film),
+            "starships": GeneratedRecords(starships, self.starship),
+        }
+
+    def film_ids(self, person_id: int) -> List[int]:
+        """The films a person appears in, at most two"""
+        films = self.counts["films"]
+        if not films:
+            return []
+        return sorted({person_id % films + 1, (person_id * 5 + 3) % films + 1})
+
+    def person(self, swapi_id: int) -> Dict[str, Any]:
+        return {
+            "name": f"Person {swapi_id}",
+            "height": str(150 + swapi_id % 60),
+            "mass": str(50 + swapi_id % 70),
+            "hair_color": "brown",
+            "skin_color": "fair",
+            "eye_color": "blue",
+            "birth_year": f"{swapi_id % 100}BBY",
+            "gender": "female" if swapi_id % 2 else "male",
+            "homeworld": f"{self.base_url}/planets/{swapi_id % 60 + 1}/",
+            "films": [f"{self.base_url}/films/{film_id}/" for film_id in self.film_ids(swapi_id)],
+            "url": f"{self.base_url}/people/{swapi_id}/"
+        }
+
+    def film(self, swapi_id: int) -> Dict[str, Any]:
+        return {
+            "title": f"Film {swapi_id}",
+            "episode_id": swapi_id,
+            "opening_crawl": "It is a period of civil war.",
+            "director": "George Lucas",
+            "producer": "Gary Kurtz, Rick McCallum",
+            "release_date": f"{1976 + swapi_id}-05-25",
+            "characters": [f"{self.base_url}/people/{person_id}/" for person_id in self.film_people[swapi_id]],
+            "url": f"{self.base_url}/films/{swapi_id}/"
+        }
+
+    def starship(self, swapi_id: int) -> Dict[str, Any]:
+        return {
+            "name": f"Starship {swapi_id}",
+            "model": f"Model {swapi_id}",
+            "manufacturer": "Corellian Engineering Corporation",
+            "cost_in_credits": str(100000 + swapi_id),
+            "length": "34.37",
+            "crew": "4",
+            "passengers": "6",
+            "starship_class": "Light freighter",
+            "url": f"{self.base_url}/starships/{swapi_id}/"
+        }
+
+    def mock(self, **options) -> MockSWAPI:
+        """A MockSWAPI serving this dataset, with its latency, error_rate, page_size and seed options"""
+        return MockSWAPI(self.resources, base_url=self.base_url, **options)
+
+
+def asgi_app(mock: MockSWAPI) -> Starlette:
+    """Mount the mock's request handler as an ASGI app"""
+
+    async def forward(request: Request) -> Response:
+        response = await mock.handler(
+            httpx.Request(request.method, str(request.url), headers=request.headers.raw)
+        )
+        return Response(response.content, status_code=response.status_code, headers=dict(response.headers))
+
+    return Starlette(routes=[Route("/{path:path}", forward)])
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve the mock SWAPI with uvicorn"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a local mock of SWAPI")
+    parser.add_argument("--people", type=int, default=82)
+    parser.add_argument("--films", type=int, default=6)
+    parser.add_argument("--starships", type=int, default=36)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args(argv)
+
+    base_url = f"http://127.0.0.1:{args.port}{BASE_PATH}"
+    dataset = SWAPIDataset(
+        people=args.people, films=args.films, starships=args.starships, base_url=base_url
+    )
+    mock = dataset.mock(
+        page_size=args.page_size, latency=args.latency, error_rate=args.error_rate, seed=args.seed
+    )
+    print(f"Point SWAPI_BASE_URL at {base_url}")
+    uvicorn.run(asgi_app(mock), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the per-call overhead of the hot service methods
+
+Seeds a throwaway SQLite database, then calls each read and vote method
+of the character, film and starship services in a loop on one session
+and reports the mean time per call. The rows are few and small, so the
+numbers are dominated by what happens in Python: building statements,
+compiling them or fetching them from the compiled cache, and loading
+results into objects.
+
+Usage:
+    python benchmarks/service_benchmark.py --iterations 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.starship_service import StarshipService
+from benchmarks.load_test import seed_database
+
+# (service class, method name, call on the service given the iteration)
+CALLS: List[Tuple[type, str, Callable[[Any, int], Awaitable[Any]]]] = [
+    (CharacterService, "get_character", lambda s, n: s.get_character(n % 100 + 1)),
+    (CharacterService, "get_character_by_swapi_id", lambda s, n: s.get_character_by_swapi_id(n % 100 + 1)),
+    (CharacterService, "get_characters", lambda s, n: s.get_characters(skip=n % 5 * 20, limit=20)),
+    (CharacterService, "search_characters", lambda s, n: s.search_characters(f"Person {n % 100 + 1}")),
+    (CharacterService, "get_top_characters", lambda s, n: s.get_top_characters(limit=10)),
+    (CharacterService, "vote_for_character", lambda s, n: s.vote_for_character(n % 100 + 1)),
+    (FilmService, "get_film", lambda s, n: s.get_film(n % 6 + 1)),
+    (FilmService, "get_film_by_swapi_id", lambda s, n: s.get_film_by_swapi_id(n % 6 + 1)),
+    (FilmService, "get_films", lambda s, n: s.get_films(limit=20)),
+    (FilmService, "search_films", lambda s, n: s.search_films(f"Film {n % 6 + 1}")),
+    (FilmService, "get_top_films", lambda s, n: s.get_top_films(limit=10)),
+    (FilmService, "vote_for_film", lambda s, n: s.vote_for_film(n % 6 + 1)),
+    (StarshipService, "get_starship", lambda s, n: s.get_starship(n % 100 + 1)),
+    (StarshipService, "get_starship_by_swapi_id", lambda s, n: s.get_starship_by_swapi_id(n % 100 + 1)),
+    (StarshipService, "get_starships", lambda s, n: s.get_starships(skip=n % 5 * 20, limit=20)),
+    (StarshipService, "search_starships", lambda s, n: s.search_starships(f"Starship {n % 100 + 1}")),
+    (StarshipService, "get_top_starships", lambda s, n: s.get_top_starships(limit=10)),
+    (StarshipService, "vote_for_starship", lambda s, n: s.vote_for_starship(n % 100 + 1)),
+]
+
+
+async def run_benchmark(iterations: int = 2000, warmup: int = 50) -> Dict[str, float]:
+    """Time every service method and return microseconds per call, keyed Service.method"""
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'services.db')}"
+        # Few films, so a film's characters stay as small as a character's films
+        seed_database(database_url, characters=100, films=6, starships=100)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'services.db')}")
+        session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        for service_class, method, call in CALLS:
+            async with session_factory() as db:
+                service = service_class(db)
+                for n in range(warmup):
+                    await call(service, n)
+                started = time.perf_counter()
+                for n in range(iterations):
+                    await call(service, n)
+                elapsed = time.perf_counter() - started
+            results[f"{service_class.__name__}.{method}"] = elapsed / iterations * 1_000_000
+        await engine.dispose()
+    return results
+
+
+def print_metrics(results: Dict[str, float]):
+    """Print the time per call of every method"""
+    print("\n📊 Service method overhead")
+    width = max(len(name) for name in results)
+    for name, micros in results.items():
+        print(f"  {name:<{width}}  {micros:8.1f} µs/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-call overhead of the service methods")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls timed per method")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed calls first, to fill the caches")
+    args = parser.parse_args()
+
+    print_metrics(asyncio.run(run_benchmark(iterations=args.iterations, warmup=args.warmup)))
+
+
+if __name__ == "__main__":
+    main()
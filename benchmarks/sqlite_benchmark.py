@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark of SQLite reader throughput during a vote storm
+
+Seeds a throwaway SQLite database, then for a fixed time runs reader
+threads fetching characters alongside voter threads incrementing their
+votes, each on its own pooled connection, with the statements the
+services issue. Runs once with SQLite's defaults (rollback journal,
+synchronous=FULL) and once with the tuning profile from Settings (WAL
+and the other SQLITE_* pragmas), and reports reads and votes per second
+for each. Threads keep Python overhead low enough for SQLite's locking
+to be what's measured.
+
+Usage:
+    python benchmarks/sqlite_benchmark.py --duration 5 --readers 8 --voters 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+import app.models  # noqa: F401  Registers every table on Base.metadata
+from app.database import Base, configure_sqlite
+from app.models.character import Character
+
+PROFILES = ("default", "tuned")
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    if not latencies:
+        return 0.0
+    latencies = sorted(latencies)
+    return latencies[max(0, int(len(latencies) * fraction) - 1)]
+
+
+def run_benchmark(
+    profile: str = "tuned",
+    duration: float = 5.0,
+    readers: int = 8,
+    voters: int = 4,
+    characters: int = 1000
+) -> Dict[str, Any]:
+    """Run readers and voters against one SQLite profile and return their metrics"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'benchmark.db')}",
+            connect_args={"check_same_thread": False},
+            pool_size=readers + voters
+        )
+        if profile == "tuned":
+            configure_sqlite(engine)
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Character), [
+                {"swapi_id": i, "name": f"Person {i}"} for i in range(1, characters + 1)
+            ])
+
+        read_latencies: List[List[float]] = [[] for _ in range(readers)]
+        votes = [0] * voters
+        errors = [0] * (readers + voters)
+        stop_at = time.perf_counter() + duration
+
+        def read(index: int):
+            rng = random.Random(index)
+            with engine.connect() as connection:
+                while time.perf_counter() < stop_at:
+                    started = time.perf_counter()
+                    try:
+                        connection.execute(
+                            select(Character).where(Character.id == rng.randint(1, characters))
+                        ).all()
+                        connection.commit()
+                    except OperationalError:
+                        connection.rollback()
+                        errors[index] += 1
+                        continue
+                    read_latencies[index].append(time.perf_counter() - started)
+
+        def vote(index: int):
+            rng = random.Random(readers + index)
+            with engine.connect() as connection:
+                while time.perf_counter() < stop_at:
+                    try:
+                        connection.execute(
+                            update(Character)
+                            .where(Character.id == rng.randint(1, characters))
+                            .values(votes=Character.votes + 1)
+                        )
+                        connection.commit()
+                    except OperationalError:
+                        connection.rollback()
+                        errors[readers + index] += 1
+                        continue
+                    votes[index] += 1
+
+        threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+        threads += [threading.Thread(target=vote, args=(i,)) for i in range(voters)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    latencies = [latency for thread_latencies in read_latencies for latency in thread_latencies]
+    return {
+        "profile": profile,
+        "reads": len(latencies),
+        "votes": sum(votes),
+        "errors": sum(errors),
+        "reads_per_sec": len(latencies) / duration,
+        "votes_per_sec": sum(votes) / duration,
+        "read_p50_ms": percentile(latencies, 0.5) * 1000,
+        "read_p95_ms": percentile(latencies, 0.95) * 1000,
+    }
+
+
+def print_metrics(metrics: Dict[str, Any]):
+    """Print the report of one profile"""
+    print(f"\n📊 SQLite {metrics['profile']} profile")
+    print(f"  Reads:   {metrics['reads_per_sec']:.1f}/sec (p50 {metrics['read_p50_ms']:.2f}ms, p95 {metrics['read_p95_ms']:.2f}ms)")
+    print(f"  Votes:   {metrics['votes_per_sec']:.1f}/sec")
+    print(f"  Errors:  {metrics['errors']} (database is locked)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite reads during a vote storm")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds each profile runs")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--voters", type=int, default=4)
+    parser.add_argument("--characters", type=int, default=1000)
+    parser.add_argument("--profile", choices=PROFILES, help="Run only this profile")
+    args = parser.parse_args()
+
+    for profile in [args.profile] if args.profile else PROFILES:
+        print_metrics(run_benchmark(
+            profile=profile,
+            duration=args.duration,
+            readers=args.readers,
+            voters=args.voters,
+            characters=args.characters
+        ))
+
+
+if __name__ == "__main__":
+    main()
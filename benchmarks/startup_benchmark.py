@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark of app startup: import time and time to first request
+
+Each run starts a fresh interpreter, imports app.main, runs the app's
+startup and serves one list request over a throwaway SQLite database
+created beforehand, timing the import and the whole path to the first
+response. Reports the median over --runs. With --baseline the run fails
+when either median grows more than --max-regression over the saved
+baseline.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --baseline benchmarks/baselines/startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+# Add the parent directory to the path so we can import from app
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import seed_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "startup.json")
+
+# Run in a fresh interpreter, so nothing is imported or cached beforehand
+CHILD = """
+import time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+import asyncio, json, httpx
+
+async def first_request():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            return await client.get("/api/v1/characters/")
+
+response = asyncio.run(first_request())
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_request_seconds": time.perf_counter() - started,
+    "status": response.status_code,
+}))
+"""
+
+
+def measure_once(database_url: str) -> Dict[str, Any]:
+    """Start the app in a new interpreter and time its import and first request"""
+    env = {**os.environ, "DATABASE_URL": database_url, "PYTHONPATH": ROOT}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(runs: int = 5) -> Dict[str, Any]:
+    """Measure startup runs times and return the medians"""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        seed_database(database_url, characters=100, films=6, starships=50)
+        samples: List[Dict[str, Any]] = [measure_once(database_url) for _ in range(runs)]
+
+    return {
+        "runs": runs,
+        "errors": sum(1 for sample in samples if sample["status"] != 200),
+        "import_seconds": statistics.median(sample["import_seconds"] for sample in samples),
+        "first_request_seconds": statistics.median(sample["first_request_seconds"] for sample in samples),
+        "import_min_seconds": min(sample["import_seconds"] for sample in samples),
+    }
+
+
+def check_regression(metrics: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> Optional[str]:
+    """Describe the slowdown against the baseline, or None if within the threshold"""
+    for key in ("import_seconds", "first_request_seconds"):
+        ceiling = baseline[key] * (1 + max_regression)
+        if metrics[key] > ceiling:
+            return (
+                f"{key} {metrics[key]:.3f}s is above {ceiling:.3f}s "
+                f"(baseline {baseline[key]:.3f}s + {max_regression:.0%})"
+            )
+    return None
+
+
+def print_metrics(metrics: Dict[str, Any]):
+    """Print the benchmark report"""
+    print(f"\n📊 Startup benchmark (median of {metrics['runs']} runs)")
+    print(f"  Import app.main:   {metrics['import_seconds'] * 1000:.0f}ms (min {metrics['import_min_seconds'] * 1000:.0f}ms)")
+    print(f"  To first response: {metrics['first_request_seconds'] * 1000:.0f}ms")
+    print(f"  Errors:            {metrics['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and time to first request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="Fail if startup regresses against this baseline file")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed growth in startup time")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Save this run as the baseline")
+    args = parser.parse_args()
+
+    metrics = run_benchmark(runs=args.runs)
+    print_metrics(metrics)
+
+    if metrics["errors"]:
+        print("\n❌ The first request failed")
+        sys.exit(1)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regression = check_regression(metrics, json.load(f), args.max_regression)
+        if regression:
+            print(f"\n❌ Startup regression: {regression}")
+            sys.exit(1)
+        print("\n✓ Within the regression threshold")
+
+
+if __name__ == "__main__":
+    main()
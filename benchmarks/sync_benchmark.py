@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the full sync path against the local mock SWAPI
+
+Syncs characters, films and starships concurrently, as
+scripts/populate_data.py does, into a throwaway SQLite database and
+reports fetch time, write time and rows/sec. With --baseline the run
+fails when rows/sec drops more than --max-regression below the saved
+baseline.
+
+Usage:
+    python benchmarks/sync_benchmark.py --people 100000 --latency 0.01
+    python benchmarks/sync_benchmark.py --baseline benchmarks/baselines/sync.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  Registers every table on Base.metadata
+from app.database import Base
+from app.services.swapi_service import SWAPIService
+from app.services.sync_service import SYNC_ENTITIES, SyncProgress, SyncService
+from benchmarks.mock_swapi_server import MOCK_BASE_URL, SWAPIDataset
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "sync.json")
+
+
+async def run_benchmark(
+    people: int = 10000,
+    films: int = 6,
+    starships: int = 1000,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    swapi_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run one full sync against the mock SWAPI and return its metrics"""
+    mock = SWAPIDataset(people=people, films=films, starships=starships).mock(
+        latency=latency, error_rate=error_rate
+    )
+    if swapi_url:
+        client = httpx.AsyncClient()
+    else:
+        client = httpx.AsyncClient(transport=mock.transport)
+        swapi_url = MOCK_BASE_URL
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'benchmark.db')}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        progress = {entity: SyncProgress() for entity in SYNC_ENTITIES}
+
+        async def sync(entity: str):
+            async with session_factory() as db:
+                return await SyncService(db, swapi_service).sync(entity, progress[entity])
+
+        async with client:
+            swapi_service = SWAPIService(client=client)
+            swapi_service.base_url = swapi_url
+            started = time.perf_counter()
+            results = await asyncio.gather(*(sync(entity) for entity in SYNC_ENTITIES))
+            wall_clock = time.perf_counter() - started
+        await engine.dispose()
+
+    rows = sum(result.total for result in results)
+    return {
+        "rows": rows,
+        "links": sum(result.links_added for result in results),
+        "complete": all(result.complete for result in results),
+        "wall_clock": wall_clock,
+        "rows_per_sec": rows / wall_clock if wall_clock else 0.0,
+        "fetch_seconds": sum(p.http_seconds for p in progress.values()),
+        "queue_wait_seconds": sum(p.queue_wait_seconds for p in progress.values()),
+        "write_seconds": sum(p.db_seconds for p in progress.values()),
+        "requests": len(mock.requests),
+    }
+
+
+def check_regression(metrics: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> Optional[str]:
+    """Describe the regression against the baseline, or None if within the threshold"""
+    floor = baseline["rows_per_sec"] * (1 - max_regression)
+    if metrics["rows_per_sec"] < floor:
+        return (
+            f"{metrics['rows_per_sec']:.1f} rows/sec is below {floor:.1f} "
+            f"(baseline {baseline['rows_per_sec']:.1f} - {max_regression:.0%})"
+        )
+    return None
+
+
+def print_metrics(metrics: Dict[str, Any]):
+    """Print the benchmark report"""
+    print("\n📊 Sync benchmark")
+    print(f"  Rows:       {metrics['rows']} ({metrics['links']} links)")
+    print(f"  Requests:   {metrics['requests']}")
+    print(f"  Fetch time: {metrics['fetch_seconds']:.2f}s (in SWAPI requests, summed over concurrent ones)")
+    print(f"  Queue wait: {metrics['queue_wait_seconds']:.2f}s")
+    print(f"  Write time: {metrics['write_seconds']:.2f}s")
+    print(f"  Wall clock: {metrics['wall_clock']:.2f}s")
+    print(f"  Throughput: {metrics['rows_per_sec']:.1f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a full sync against the mock SWAPI")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--films", type=int, default=6)
+    parser.add_argument("--starships", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--swapi-url", help="Use a mock server already running at this URL")
+    parser.add_argument("--baseline", help="Fail if throughput regresses against this baseline file")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed drop in rows/sec")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="Save this run as the baseline")
+    args = parser.parse_args()
+
+    metrics = asyncio.run(run_benchmark(
+        people=args.people,
+        films=args.films,
+        starships=args.starships,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        swapi_url=args.swapi_url
+    ))
+    print_metrics(metrics)
+
+    if not metrics["complete"]:
+        print("\n❌ Sync was partial")
+        sys.exit(1)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump({**metrics, "people": args.people, "latency": args.latency}, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regression = check_regression(metrics, json.load(f), args.max_regression)
+        if regression:
+            print(f"\n❌ Throughput regression: {regression}")
+            sys.exit(1)
+        print("\n✓ Within the regression threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,130 @@
 #!/usr/bin/env python3
 """
 Script to populate the database with data from SWAPI
+
+Characters, films and starships are synced concurrently, each through
+its own session with pages written in batches. Progress is printed
+periodically, followed by a throughput report.
 """
+import argparse
 import asyncio
 import sys
 import os
+import time
+from typing import Dict
 
 # Add the parent directory to the path so we can import from app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SessionLocal
-from app.services.swapi_service import SWAPIService
-from app.services.character_service import CharacterService
-from app.services.film_service import FilmService
-from app.services.starship_service import StarshipService
-
-
-async def populate_characters():
-    """Populate characters from SWAPI"""
-    print("Fetching characters from SWAPI...")
-    swapi_service = SWAPIService()
-    
-    with SessionLocal() as db:
-        character_service = CharacterService(db)
-        characters_data = await swapi_service.fetch_all_characters()
-        
-        print(f"Found {len(characters_data)} characters")
-        
-        for char_data in characters_data:
-            try:
-                character = character_service.create_or_update_from_swapi(char_data)
-                print(f"✓ {character.name}")
-            except Exception as e:
-                print(f"✗ Error processing {char_data.get('name', 'Unknown')}: {e}")
-
-
-async def populate_films():
-    """Populate films from SWAPI"""
-    print("\nFetching films from SWAPI...")
-    swapi_service = SWAPIService()
-    
-    with SessionLocal() as db:
-        film_service = FilmService(db)
-        films_data = await swapi_service.fetch_all_films()
-        
-        print(f"Found {len(films_data)} films")
-        
-        for film_data in films_data:
-            try:
-                film = film_service.create_or_update_from_swapi(film_data)
-                print(f"✓ {film.title}")
-            except Exception as e:
-                print(f"✗ Error processing {film_data.get('title', 'Unknown')}: {e}")
-
-
-async def populate_starships():
-    """Populate starships from SWAPI"""
-    print("\nFetching starships from SWAPI...")
-    swapi_service = SWAPIService()
-    
-    with SessionLocal() as db:
-        starship_service = StarshipService(db)
-        starships_data = await swapi_service.fetch_all_starships()
-        
-        print(f"Found {len(starships_data)} starships")
-        
-        for starship_data in starships_data:
-            try:
-                starship = starship_service.create_or_update_from_swapi(starship_data)
-                print(f"✓ {starship.name}")
-            except Exception as e:
-                print(f"✗ Error processing {starship_data.get('name', 'Unknown')}: {e}")
+from app.database import AsyncSessionLocal
+from app.services.swapi_service import SWAPIService, create_http_client
+from app.services.swapi_cache import create_response_cache
+from app.services.sync_service import SYNC_ENTITIES, SyncProgress, SyncResult, SyncService
+
+
+def print_result(entity: str, result: SyncResult):
+    """Print a one-line summary of a sync"""
+    print(f"Found {result.total} {entity}")
+    print(
+        f"✓ {result.created} created, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {result.links_added} links added, "
+        f"{result.links_removed} links removed"
+    )
+    if not result.complete:
+        print(f"✗ Pages that failed to download: {result.failed_pages}")
+
+
+def print_progress(progress: Dict[str, SyncProgress]):
+    """Print one line summarizing every sync in flight"""
+    parts = [
+        f"{entity} {p.pages_fetched}/{p.pages_total or '?'} pages, {p.rows_written} rows"
+        for entity, p in progress.items()
+    ]
+    print("⏳ " + " | ".join(parts))
+
+
+def print_report(results: Dict[str, SyncResult], progress: Dict[str, SyncProgress], wall_clock: float):
+    """Print the ingest throughput report"""
+    rows = sum(result.total for result in results.values())
+    written = sum(result.created + result.updated for result in results.values())
+    http_seconds = sum(p.http_seconds for p in progress.values())
+    queue_wait_seconds = sum(p.queue_wait_seconds for p in progress.values())
+    db_seconds = sum(p.db_seconds for p in progress.values())
 
+    print("\n📊 Ingest report")
+    for entity, p in progress.items():
+        print(
+            f"  {entity:<10} HTTP {p.http_seconds:7.2f}s   "
+            f"queue wait {p.queue_wait_seconds:7.2f}s   DB {p.db_seconds:7.2f}s"
+        )
+    print(f"  Rows:       {rows} ({written} written)")
+    print(f"  Throughput: {rows / wall_clock if wall_clock else 0:.1f} rows/sec")
+    print(f"  HTTP time:  {http_seconds:.2f}s (in SWAPI requests, summed over concurrent ones)")
+    print(f"  Queue wait: {queue_wait_seconds:.2f}s (writers idle, waiting for pages)")
+    print(f"  DB time:    {db_seconds:.2f}s (writers busy)")
+    print(f"  Wall clock: {wall_clock:.2f}s")
 
-async def main():
+
+async def populate(entity: str, swapi_service: SWAPIService, progress: SyncProgress) -> SyncResult:
+    """Sync one entity from SWAPI in its own session"""
+    async with AsyncSessionLocal() as db:
+        return await SyncService(db, swapi_service).sync(entity, progress)
+
+
+async def report_progress(progress: Dict[str, SyncProgress], interval: float):
+    """Print a progress summary every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        print_progress(progress)
+
+
+async def main(progress_interval: float):
     """Main function to populate all data"""
     try:
         print("🌟 Starting Star Wars data population...")
-        
-        await populate_characters()
-        await populate_films()
-        await populate_starships()
-        
+        started = time.perf_counter()
+        progress = {entity: SyncProgress() for entity in SYNC_ENTITIES}
+
+        # One pooled client for the whole run
+        response_cache = create_response_cache()
+        async with create_http_client() as client:
+            swapi_service = SWAPIService(client=client, cache=response_cache)
+            reporter = asyncio.create_task(report_progress(progress, progress_interval))
+            try:
+                outcomes = await asyncio.gather(
+                    *(populate(entity, swapi_service, progress[entity]) for entity in SYNC_ENTITIES),
+                    return_exceptions=True
+                )
+            finally:
+                reporter.cancel()
+                if response_cache:
+                    response_cache.close()
+
+        wall_clock = time.perf_counter() - started
+        results = {}
+        for entity, outcome in zip(SYNC_ENTITIES, outcomes):
+            print()
+            if isinstance(outcome, Exception):
+                print(f"✗ Error processing {entity}: {outcome}")
+            else:
+                print_result(entity, outcome)
+                results[entity] = outcome
+        print_report(results, progress, wall_clock)
+
         print("\n🎉 Data population completed successfully!")
-        
+
     except Exception as e:
         print(f"\n❌ Error during data population: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Populate the database from SWAPI")
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress summaries"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.progress_interval))
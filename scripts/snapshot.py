@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script to export the database to, or import it from, an offline snapshot
+
+Usage:
+    python scripts/snapshot.py export swapi-snapshot.ndjson.gz
+    python scripts/snapshot.py import swapi-snapshot.ndjson.gz
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal
+from app.services.snapshot import export_snapshot, import_snapshot
+
+
+async def run(command: str, path: str):
+    """Export or import a snapshot in its own session"""
+    async with AsyncSessionLocal() as db:
+        if command == "export":
+            print(f"📦 Exporting snapshot to {path}...")
+            return await export_snapshot(db, path)
+        print(f"📦 Importing snapshot from {path}...")
+        return await import_snapshot(db, path)
+
+
+def main():
+    """Run the export or import command"""
+    parser = argparse.ArgumentParser(description="Export or import a SWAPI data snapshot")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot file (gzipped NDJSON)")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(run(args.command, args.path))
+    except Exception as e:
+        print(f"\n❌ Error during snapshot {args.command}: {e}")
+        sys.exit(1)
+    
+    for section, count in counts.items():
+        print(f"✓ {count} {section}")
+    print(f"\n🎉 Snapshot {args.command} completed in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
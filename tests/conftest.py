@@ -1,37 +1,60 @@
 import pytest
+import pytest_asyncio
 import asyncio
+import httpx
 import sys
 import os
+import tempfile
+import time
+from unittest.mock import MagicMock
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 # Add the parent directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Use a throwaway SQLite file, so test runs never touch a tracked database.
+# Set before the app is imported, since its engines connect on import.
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.setdefault("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+
 from app.main import app
-from app.database import get_db, Base
+from app.database import (
+    async_database_url, configure_sqlite, get_db, get_read_db, get_read_session_factory, get_session_factory, Base
+)
+from app.api.deps import get_swapi_service
 from app.config import settings
+from app.services.swapi_service import SWAPIService
+from mock_swapi import MockSWAPI, make_people
 
-# Use in-memory SQLite for tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
+# Creates and drops the tables
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The app runs on TestClient's event loop and the tests on their own, so
+# connections are not pooled across them
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+configure_sqlite(engine)
+configure_sqlite(async_engine)
 
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "mock_swapi(people, **options): configure the mock_swapi fixture")
 
 
 # Override the dependency
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
 
 
 @pytest.fixture
@@ -42,17 +65,78 @@ def client():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """Keep SWAPI retry backoff short so fault-injection tests run quickly"""
+    monkeypatch.setattr(settings, "SWAPI_RETRY_BACKOFF_BASE", 0.001)
+
+
 @pytest.fixture
-def db():
+def mock_swapi_service():
+    """Replace the shared SWAPI service used by the sync endpoints"""
+    mock_service = MagicMock()
+    app.dependency_overrides[get_swapi_service] = lambda: mock_service
+    yield mock_service
+    app.dependency_overrides.pop(get_swapi_service, None)
+
+
+@pytest.fixture
+def mock_swapi(request):
+    """Local mock SWAPI serving 25 people.
+
+    Tests can size and slow it down with
+    @pytest.mark.mock_swapi(people=82, latency=0.05).
+    """
+    marker = request.node.get_closest_marker("mock_swapi")
+    options = dict(marker.kwargs) if marker else {}
+    people = options.pop("people", 25)
+    return MockSWAPI({"people": make_people(people)}, **options)
+
+
+@pytest.fixture
+def swapi_service(mock_swapi):
+    """A SWAPIService talking to the mock SWAPI"""
+    return SWAPIService(client=httpx.AsyncClient(transport=mock_swapi.transport))
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Poll a background sync job until it finishes and return its final state"""
+    def wait(job_id, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = client.get(f"/api/v1/sync/jobs/{job_id}").json()
+            if job["status"] not in ("pending", "running"):
+                return job
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Sync job {job_id} did not finish")
+            time.sleep(0.01)
+    return wait
+
+
+@pytest_asyncio.fixture
+async def db():
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
     try:
-        yield db
+        async with TestingSessionLocal() as db:
+            yield db
     finally:
-        db.close()
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def statements():
+    """SQL statements executed through the test sessions, in order"""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -0,0 +1,178 @@
+"""
+Local fault-injecting mock of the SWAPI endpoints, shared by the tests and benchmarks
+"""
+import asyncio
+import hashlib
+import json
+import random
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+import httpx
+
+from app.services.swapi_service import FetchStatus, Page
+
+BASE_URL = "https://swapi.dev/api"
+PAGE_SIZE = 10
+
+
+def make_people(count: int) -> List[Dict]:
+    """Build a list of fake SWAPI people payloads"""
+    return [
+        {
+            "name": f"Person {i}",
+            "height": "172",
+            "url": f"{BASE_URL}/people/{i}/"
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+class PageStream:
+    """Stand-in for SWAPIService.iter_* that yields fixed items in pages"""
+
+    def __init__(
+        self,
+        items: Optional[List[Dict]] = None,
+        page_size: int = PAGE_SIZE,
+        failed_pages: Sequence[int] = (),
+        error: Optional[Exception] = None
+    ):
+        self.items = items or []
+        self.page_size = page_size
+        self.failed_pages = list(failed_pages)
+        self.error = error
+
+    async def __call__(self, status: Optional[FetchStatus] = None, on_page=None, deadline=None):
+        if self.error:
+            raise self.error
+        status = FetchStatus() if status is None else status
+        chunks = [
+            self.items[start:start + self.page_size]
+            for start in range(0, len(self.items), self.page_size)
+        ]
+        status.pages_total = len(chunks)
+        for number, chunk in enumerate(chunks, start=1):
+            status.pages_fetched = number
+            if on_page:
+                on_page(number, status.pages_total)
+            yield Page(number, chunk)
+        status.failed_pages.extend(self.failed_pages)
+
+
+class MockSWAPI:
+    """Serves paginated SWAPI-like responses through an httpx.MockTransport"""
+
+    def __init__(
+        self,
+        resources: Dict[str, Sequence[Dict]],
+        latency: float = 0.0,
+        failing_pages: Optional[Set[int]] = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        page_size: int = PAGE_SIZE,
+        base_url: str = BASE_URL
+    ):
+        self.resources = resources
+        self.page_size = page_size
+        self.base_url = base_url
+        self.latency = latency
+        self.failing_pages = failing_pages or set()
+        # Fraction of requests answered with a 503, drawn from a seeded RNG
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.faults: List[Union[int, Exception]] = []
+        self.retry_after: Optional[str] = None
+        self.unavailable = False
+        self.requests: List[str] = []
+        self.errors = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Position of each record by swapi id, per endpoint, built on the first detail request
+        self._positions: Dict[str, Dict[int, int]] = {}
+
+    def inject_faults(self, *faults: Union[int, Exception]) -> None:
+        """Fail the next requests in order, each with a status code or by raising"""
+        self.faults.extend(faults)
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(str(request.url))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.faults:
+                fault = self.faults.pop(0)
+                if isinstance(fault, Exception):
+                    raise fault
+                return self._error_response(fault)
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self._error_response(503)
+            return self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    def _error_response(self, status_code: int) -> httpx.Response:
+        self.errors += 1
+        headers = {"Retry-After": self.retry_after} if self.retry_after else {}
+        return httpx.Response(status_code, headers=headers, json={"detail": "Injected fault"})
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        if self.unavailable:
+            return httpx.Response(503, json={"detail": "Service unavailable"})
+
+        parts = request.url.path.strip("/").split("/")
+        if parts[-1].isdigit():
+            return self._respond_detail(request, parts[-2], int(parts[-1]))
+
+        endpoint = parts[-1]
+        items = self.resources.get(endpoint)
+        if items is None:
+            return httpx.Response(404, json={"detail": "Not found"})
+
+        page = int(request.url.params.get("page", 1))
+        if page in self.failing_pages:
+            return httpx.Response(500, json={"detail": "Server error"})
+
+        start = (page - 1) * self.page_size
+        results = items[start:start + self.page_size]
+        if not results:
+            return httpx.Response(404, json={"detail": "Not found"})
+
+        has_next = start + self.page_size < len(items)
+        return self._json_response(request, {
+            "count": len(items),
+            "next": f"{self.base_url}/{endpoint}/?page={page + 1}" if has_next else None,
+            "previous": f"{self.base_url}/{endpoint}/?page={page - 1}" if page > 1 else None,
+            "results": results
+        })
+
+    def _respond_detail(self, request: httpx.Request, endpoint: str, swapi_id: int) -> httpx.Response:
+        items = self.resources.get(endpoint, [])
+        if endpoint not in self._positions:
+            self._positions[endpoint] = {
+                int(item["url"].rstrip("/").rsplit("/", 1)[1]): position
+                for position, item in enumerate(items)
+            }
+        position = self._positions[endpoint].get(swapi_id)
+        if position is None:
+            return httpx.Response(404, json={"detail": "Not found"})
+        return self._json_response(request, items[position])
+
+    def _json_response(self, request: httpx.Request, payload: Dict) -> httpx.Response:
+        """Return a JSON response with an ETag, honouring If-None-Match"""
+        body = json.dumps(payload).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"ETag": etag, "Content-Type": "application/json"}
+        )
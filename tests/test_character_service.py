@@ -3,12 +3,16 @@ from app.models.character import Character
 from app.services.character_service import CharacterService
 from app.schemas.character import CharacterCreate, CharacterUpdate
 from app.models.film import Film
+from app.schemas.film import FilmCreate
+from app.services.film_service import FilmService
+from app.services.relations import sync_character_films
 
 
 class TestCharacterService:
     """Test cases for character service"""
 
-    def test_create_character(self, db):
+    @pytest.mark.asyncio
+    async def test_create_character(self, db):
         """Test creating a character"""
         service = CharacterService(db)
         char_data = CharacterCreate(
@@ -24,7 +28,7 @@ class TestCharacterService:
             homeworld="Tatooine"
         )
         
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
         
         assert character.id is not None
         assert character.name == "Luke Skywalker"
@@ -32,49 +36,53 @@ class TestCharacterService:
         assert character.height == "172"
         assert character.votes == 0
 
-    def test_get_character_by_id(self, db):
+    @pytest.mark.asyncio
+    async def test_get_character_by_id(self, db):
         """Test getting character by ID"""
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=1, name="Luke Skywalker")
-        created_character = service.create_character(char_data)
+        created_character = await service.create_character(char_data)
         
-        retrieved_character = service.get_character(created_character.id)
+        retrieved_character = await service.get_character(created_character.id)
         
         assert retrieved_character is not None
         assert retrieved_character.id == created_character.id
         assert retrieved_character.name == "Luke Skywalker"
 
-    def test_get_character_by_swapi_id(self, db):
+    @pytest.mark.asyncio
+    async def test_get_character_by_swapi_id(self, db):
         """Test getting character by SWAPI ID"""
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=42, name="Test Character")
-        service.create_character(char_data)
+        await service.create_character(char_data)
         
-        character = service.get_character_by_swapi_id(42)
+        character = await service.get_character_by_swapi_id(42)
         
         assert character is not None
         assert character.swapi_id == 42
         assert character.name == "Test Character"
 
-    def test_get_characters_with_pagination(self, db):
+    @pytest.mark.asyncio
+    async def test_get_characters_with_pagination(self, db):
         """Test getting characters with pagination"""
         service = CharacterService(db)
         
         # Create multiple characters
         for i in range(15):
             char_data = CharacterCreate(swapi_id=i+1, name=f"Character {i+1}")
-            service.create_character(char_data)
+            await service.create_character(char_data)
         
         # Test pagination
-        characters, total = service.get_characters(skip=0, limit=10)
+        characters, total = await service.get_characters(skip=0, limit=10)
         assert len(characters) == 10
         assert total == 15
         
-        characters, total = service.get_characters(skip=10, limit=10)
+        characters, total = await service.get_characters(skip=10, limit=10)
         assert len(characters) == 5
         assert total == 15
 
-    def test_search_characters(self, db):
+    @pytest.mark.asyncio
+    async def test_search_characters(self, db):
         """Test searching characters by name"""
         service = CharacterService(db)
         
@@ -87,77 +95,94 @@ class TestCharacterService:
         ]
         
         for char_data in chars:
-            service.create_character(char_data)
+            await service.create_character(char_data)
         
         # Search for "luke"
-        characters, total = service.search_characters("luke")
+        characters, total = await service.search_characters("luke")
         assert total == 1
         assert characters[0].name == "Luke Skywalker"
         
         # Search for "a" (should match all since all names contain 'a': Vader, Leia, Han, Skywalker)
-        characters, total = service.search_characters("a")
+        characters, total = await service.search_characters("a")
         assert total == 4
         
         # Search for non-existent
-        characters, total = service.search_characters("nonexistent")
+        characters, total = await service.search_characters("nonexistent")
         assert total == 0
 
-    def test_update_character(self, db):
+    @pytest.mark.asyncio
+    async def test_update_character(self, db):
         """Test updating a character"""
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=1, name="Luke Skywalker", height="172")
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
         
         # Update character
         update_data = CharacterUpdate(height="175", mass="80")
-        updated_character = service.update_character(character.id, update_data)
+        updated_character = await service.update_character(character.id, update_data)
         
         assert updated_character is not None
         assert updated_character.height == "175"
         assert updated_character.mass == "80"
         assert updated_character.name == "Luke Skywalker"  # Unchanged
 
-    def test_delete_character(self, db):
+    @pytest.mark.asyncio
+    async def test_delete_character(self, db):
         """Test deleting a character"""
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=1, name="Luke Skywalker")
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
         
         # Delete character
-        result = service.delete_character(character.id)
+        result = await service.delete_character(character.id)
         assert result is True
         
         # Verify deletion
-        deleted_character = service.get_character(character.id)
+        deleted_character = await service.get_character(character.id)
         assert deleted_character is None
         
         # Try to delete non-existent character
-        result = service.delete_character(999)
+        result = await service.delete_character(999)
         assert result is False
 
-    def test_vote_for_character(self, db):
+    @pytest.mark.asyncio
+    async def test_delete_character_updates_film_counts(self, db):
+        """Test deleting a character takes it out of its films' character counts"""
+        service = CharacterService(db)
+        character = await service.create_character(CharacterCreate(swapi_id=1, name="Luke Skywalker"))
+        film = await FilmService(db).create_film(FilmCreate(swapi_id=1, title="A New Hope"))
+        await db.run_sync(sync_character_films, "character", {character.id: {film.id}})
+        await db.commit()
+        assert (await FilmService(db).get_film(film.id, reload=True)).character_count == 1
+
+        assert await service.delete_character(character.id) is True
+        assert (await FilmService(db).get_film(film.id, reload=True)).character_count == 0
+
+    @pytest.mark.asyncio
+    async def test_vote_for_character(self, db):
         """Test voting for a character"""
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=1, name="Luke Skywalker")
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
         
         # Initial votes should be 0
         assert character.votes == 0
         
         # Vote for character
-        voted_character = service.vote_for_character(character.id)
+        voted_character = await service.vote_for_character(character.id)
         assert voted_character is not None
         assert voted_character.votes == 1
         
         # Vote again
-        voted_character = service.vote_for_character(character.id)
+        voted_character = await service.vote_for_character(character.id)
         assert voted_character.votes == 2
         
         # Try to vote for non-existent character
-        result = service.vote_for_character(999)
+        result = await service.vote_for_character(999)
         assert result is None
 
-    def test_get_top_characters(self, db):
+    @pytest.mark.asyncio
+    async def test_get_top_characters(self, db):
         """Test getting top voted characters"""
         service = CharacterService(db)
         
@@ -170,24 +195,25 @@ class TestCharacterService:
         
         characters = []
         for char_data in chars:
-            characters.append(service.create_character(char_data))
+            characters.append(await service.create_character(char_data))
         
         # Vote for characters (different amounts)
         for _ in range(5):
-            service.vote_for_character(characters[0].id)  # Luke: 5 votes
+            await service.vote_for_character(characters[0].id)  # Luke: 5 votes
         for _ in range(3):
-            service.vote_for_character(characters[1].id)  # Vader: 3 votes
-        service.vote_for_character(characters[2].id)     # Leia: 1 vote
+            await service.vote_for_character(characters[1].id)  # Vader: 3 votes
+        await service.vote_for_character(characters[2].id)     # Leia: 1 vote
         
         # Get top characters
-        top_characters = service.get_top_characters(limit=2)
+        top_characters = await service.get_top_characters(limit=2)
         assert len(top_characters) == 2
         assert top_characters[0].name == "Luke Skywalker"
         assert top_characters[0].votes == 5
         assert top_characters[1].name == "Darth Vader"
         assert top_characters[1].votes == 3
 
-    def test_create_or_update_from_swapi(self, db):
+    @pytest.mark.asyncio
+    async def test_create_or_update_from_swapi(self, db):
         """Test creating or updating character from SWAPI data"""
         service = CharacterService(db)
         
@@ -201,7 +227,7 @@ class TestCharacterService:
             "url": "https://swapi.dev/api/people/1/"
         }
         
-        character = service.create_or_update_from_swapi(swapi_data)
+        character = await service.create_or_update_from_swapi(swapi_data)
         assert character.name == "Luke Skywalker"
         assert character.swapi_id == 1
         
@@ -215,12 +241,13 @@ class TestCharacterService:
             "url": "https://swapi.dev/api/people/1/"
         }
         
-        updated_character = service.create_or_update_from_swapi(updated_swapi_data)
+        updated_character = await service.create_or_update_from_swapi(updated_swapi_data)
         assert updated_character.id == character.id  # Same character
         assert updated_character.height == "175"     # Updated
         assert updated_character.mass == "80"        # Updated
 
-    def test_search_characters_case_insensitive(self, db):
+    @pytest.mark.asyncio
+    async def test_search_characters_case_insensitive(self, db):
         """Test case insensitive character search"""
         service = CharacterService(db)
         
@@ -231,19 +258,120 @@ class TestCharacterService:
             height="202",
             mass="136"
         )
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
         
         # Search with different cases
-        result, total = service.search_characters("darth")
+        result, total = await service.search_characters("darth")
         assert len(result) == 1
         assert total == 1
         
-        result, total = service.search_characters("VADER")
+        result, total = await service.search_characters("VADER")
         assert len(result) == 1
         assert total == 1
 
-    def test_get_character_by_swapi_id_not_found(self, db):
+    @pytest.mark.asyncio
+    async def test_get_character_by_swapi_id_not_found(self, db):
         """Test getting character by SWAPI ID when not found"""
         service = CharacterService(db)
-        character = service.get_character_by_swapi_id(999)
+        character = await service.get_character_by_swapi_id(999)
         assert character is None
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_from_swapi(self, db):
+        """Test bulk upserting characters from SWAPI data"""
+        service = CharacterService(db)
+        items = [
+            {"swapi_id": i, "name": f"Character {i}", "url": f"https://swapi.dev/api/people/{i}/"}
+            for i in range(1, 6)
+        ]
+
+        result = await service.bulk_upsert_from_swapi(items)
+        assert result == (5, 0, 0)
+
+        luke = await service.get_character_by_swapi_id(1)
+        await service.vote_for_character(luke.id)
+
+        items[0]["name"] = "Luke Skywalker"
+        items.append({"swapi_id": 6, "name": "Character 6"})
+        result = await service.bulk_upsert_from_swapi(items)
+        assert (result.created, result.updated, result.unchanged) == (1, 1, 4)
+
+        luke = await service.get_character_by_swapi_id(1)
+        assert luke.name == "Luke Skywalker"
+        assert luke.votes == 1  # Votes survive the upsert
+        assert (await service.get_characters())[1] == 6
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_skips_unchanged_rows(self, db):
+        """Test identical SWAPI data issues no writes and keeps updated_at"""
+        from sqlalchemy import event
+
+        service = CharacterService(db)
+        items = [{"swapi_id": i, "name": f"Character {i}"} for i in range(1, 51)]
+        await service.bulk_upsert_from_swapi(items)
+        updated_at = (await service.get_character_by_swapi_id(1)).updated_at
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            result = await service.bulk_upsert_from_swapi(items)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+
+        assert result == (0, 0, 50)
+        assert len(statements) == 1  # Only the bulk hash lookup
+        assert statements[0].startswith("SELECT")
+        assert (await service.get_character_by_swapi_id(1)).updated_at == updated_at
+
+    @pytest.mark.asyncio
+    async def test_sync_repairs_rows_written_by_other_paths(self, db):
+        """Test local edits and single-row upserts don't leave a stale hash behind"""
+        service = CharacterService(db)
+        luke = {"swapi_id": 1, "name": "Luke Skywalker", "height": "172"}
+        await service.bulk_upsert_from_swapi([luke])
+
+        character = await service.get_character_by_swapi_id(1)
+        await service.update_character(character.id, CharacterUpdate(name="Renamed"))
+        assert await service.bulk_upsert_from_swapi([luke]) == (0, 1, 0)
+        assert (await service.get_character_by_swapi_id(1)).name == "Luke Skywalker"
+
+        await service.create_or_update_from_swapi(dict(luke, height="175"))
+        assert await service.bulk_upsert_from_swapi([luke]) == (0, 1, 0)
+        assert (await service.get_character_by_swapi_id(1)).height == "172"
+        assert await service.bulk_upsert_from_swapi([luke]) == (0, 0, 1)
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_single_statement(self, db):
+        """Test a batch is written with one statement and no per-row selects"""
+        from sqlalchemy import event
+
+        service = CharacterService(db)
+        items = [{"swapi_id": i, "name": f"Character {i}"} for i in range(1, 51)]
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            await service.bulk_upsert_from_swapi(items)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+
+        assert len(statements) == 2
+        assert "characters.swapi_id IN" in statements[0]
+        assert "ON CONFLICT (swapi_id) DO UPDATE" in statements[1]
+
+    def test_bulk_upsert_postgresql_statement(self):
+        """Test the upsert also compiles for PostgreSQL"""
+        from sqlalchemy.dialects import postgresql
+        from app.services.bulk import build_upsert_statement
+
+        stmt = build_upsert_statement("postgresql", Character, [{"swapi_id": 1, "name": "Luke"}])
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert "ON CONFLICT (swapi_id) DO UPDATE" in sql
+        assert "RETURNING characters.created_at" in sql
@@ -1,7 +1,13 @@
 import pytest
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
+from mock_swapi import PageStream
+from app.config import settings
+from app.services.film_service import FilmService
+from app.services.swapi_resilience import SWAPIError
 from app.models.character import Character
 from app.services.character_service import CharacterService
+from app.services.relations import sync_character_films
 from app.schemas.character import CharacterCreate
 
 
@@ -18,7 +24,8 @@ class TestCharacterAPI:
         assert data["page"] == 1
         assert data["size"] == 20
 
-    def test_get_characters_with_pagination(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_characters_with_pagination(self, client: TestClient, db):
         """Test getting characters with pagination"""
         # Create test characters
         service = CharacterService(db)
@@ -29,7 +36,7 @@ class TestCharacterAPI:
                 height="180",
                 mass="80"
             )
-            service.create_character(char_data)
+            await service.create_character(char_data)
 
         # Test first page
         response = client.get("/api/v1/characters/?page=1&size=10")
@@ -48,7 +55,43 @@ class TestCharacterAPI:
         assert len(data["items"]) == 10
         assert data["page"] == 2
 
-    def test_search_characters(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_characters_sorted_by_film_count(self, client: TestClient, db):
+        """Test list pages show each character's film count and can be ordered by it"""
+        await FilmService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "title": f"Film {i}", "url": f"https://swapi.dev/api/films/{i}/"} for i in (1, 2)
+        ])
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": 1, "name": "Anakin Skywalker"},
+            {"swapi_id": 2, "name": "Biggs Darklighter"},
+            {"swapi_id": 3, "name": "Chewbacca"},
+        ])
+        films = {film.swapi_id: film.id for film in (await FilmService(db).get_films())[0]}
+        characters = {character.swapi_id: character.id for character in (await CharacterService(db).get_characters())[0]}
+        await db.run_sync(sync_character_films, "character", {
+            characters[1]: {films[1]},
+            characters[3]: {films[1], films[2]},
+        })
+        await db.commit()
+
+        response = client.get("/api/v1/characters/?sort=film_count")
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [(item["name"], item["film_count"]) for item in items] == [
+            ("Chewbacca", 2), ("Anakin Skywalker", 1), ("Biggs Darklighter", 0)
+        ]
+        # Films are only loaded when included
+        assert items[0]["films"] is None
+
+        response = client.get("/api/v1/characters/search?name=a&sort=name")
+        assert [item["name"] for item in response.json()["items"]] == [
+            "Anakin Skywalker", "Biggs Darklighter", "Chewbacca"
+        ]
+
+        assert client.get("/api/v1/characters/?sort=height").status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_search_characters(self, client: TestClient, db):
         """Test searching characters by name"""
         # Create test characters
         service = CharacterService(db)
@@ -58,7 +101,7 @@ class TestCharacterAPI:
             CharacterCreate(swapi_id=3, name="Princess Leia"),
         ]
         for char_data in chars:
-            service.create_character(char_data)
+            await service.create_character(char_data)
 
         # Search for "Luke"
         response = client.get("/api/v1/characters/search?name=Luke")
@@ -73,7 +116,8 @@ class TestCharacterAPI:
         data = response.json()
         assert data["total"] == 3
 
-    def test_get_character_by_id(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_character_by_id(self, client: TestClient, db):
         """Test getting character by ID"""
         # Create test character
         service = CharacterService(db)
@@ -82,7 +126,7 @@ class TestCharacterAPI:
             name="Luke Skywalker",
             height="172"
         )
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
 
         # Get character by ID
         response = client.get(f"/api/v1/characters/{character.id}")
@@ -91,18 +135,40 @@ class TestCharacterAPI:
         assert data["name"] == "Luke Skywalker"
         assert data["height"] == "172"
 
+    @pytest.mark.asyncio
+    async def test_get_character_films_by_keyset(self, client: TestClient, db):
+        """Test a character's films come in pages continued from the last id, and the detail can embed fewer"""
+        character = await CharacterService(db).create_character(CharacterCreate(swapi_id=1, name="Obi-Wan Kenobi"))
+        character_id = character.id
+        await FilmService(db).bulk_upsert_from_swapi([{"swapi_id": i, "title": f"Film {i}"} for i in range(1, 4)])
+        film_ids = sorted(film.id for film in (await FilmService(db).get_films())[0])
+        await db.run_sync(sync_character_films, "character", {character_id: set(film_ids)})
+        await db.commit()
+
+        data = client.get(f"/api/v1/characters/{character_id}/films?size=2").json()
+        assert [item["title"] for item in data["items"]] == ["Film 1", "Film 2"]
+        data = client.get(f"/api/v1/characters/{character_id}/films?size=2&after={data['next_after']}").json()
+        assert [item["title"] for item in data["items"]] == ["Film 3"]
+        assert data["next_after"] is None
+
+        data = client.get(f"/api/v1/characters/{character_id}?films_limit=1").json()
+        assert [film["title"] for film in data["films"]] == ["Film 1"]
+        assert data["film_count"] == 3
+        assert client.get("/api/v1/characters/999/films").status_code == 404
+
     def test_get_character_not_found(self, client: TestClient):
         """Test getting non-existent character"""
         response = client.get("/api/v1/characters/999")
         assert response.status_code == 404
         assert "Character not found" in response.json()["detail"]
 
-    def test_vote_for_character(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_vote_for_character(self, client: TestClient, db):
         """Test voting for a character"""
         # Create test character
         service = CharacterService(db)
         char_data = CharacterCreate(swapi_id=1, name="Luke Skywalker")
-        character = service.create_character(char_data)
+        character = await service.create_character(char_data)
 
         # Vote for character
         response = client.post(f"/api/v1/characters/{character.id}/vote")
@@ -123,7 +189,8 @@ class TestCharacterAPI:
         response = client.post("/api/v1/characters/999/vote")
         assert response.status_code == 404
 
-    def test_get_top_voted_characters(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_top_voted_characters(self, client: TestClient, db):
         """Test getting top voted characters"""
         # Create test characters with different vote counts
         service = CharacterService(db)
@@ -135,14 +202,14 @@ class TestCharacterAPI:
         
         characters = []
         for char_data in chars:
-            characters.append(service.create_character(char_data))
+            characters.append(await service.create_character(char_data))
 
         # Vote for characters (different amounts)
         for _ in range(5):
-            service.vote_for_character(characters[0].id)  # Luke: 5 votes
+            await service.vote_for_character(characters[0].id)  # Luke: 5 votes
         for _ in range(3):
-            service.vote_for_character(characters[1].id)  # Vader: 3 votes
-        service.vote_for_character(characters[2].id)     # Leia: 1 vote
+            await service.vote_for_character(characters[1].id)  # Vader: 3 votes
+        await service.vote_for_character(characters[2].id)     # Leia: 1 vote
 
         # Get top voted
         response = client.get("/api/v1/characters/top/voted?limit=2")
@@ -154,38 +221,99 @@ class TestCharacterAPI:
         assert data[1]["name"] == "Darth Vader"
         assert data[1]["votes"] == 3
 
-    def test_sync_characters_from_swapi(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_get_character_by_swapi_id_hydrates_on_miss(self, client: TestClient, db, mock_swapi_service):
+        """Test an unknown SWAPI ID is fetched, stored with its film links and returned"""
+        await FilmService(db).bulk_upsert_from_swapi([
+            {"swapi_id": 1, "title": "A New Hope", "url": "https://swapi.dev/api/films/1/"}
+        ])
+        mock_swapi_service.fetch_character_by_id = AsyncMock(return_value={
+            "swapi_id": 1,
+            "name": "Luke Skywalker",
+            "url": "https://swapi.dev/api/people/1/",
+            "films": ["https://swapi.dev/api/films/1/"]
+        })
+
+        response = client.get("/api/v1/characters/swapi/1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == "Luke Skywalker"
+        assert [film["title"] for film in data["films"]] == ["A New Hope"]
+
+        # Now served from the database
+        assert client.get("/api/v1/characters/swapi/1").status_code == 200
+        mock_swapi_service.fetch_character_by_id.assert_awaited_once_with(1)
+
+    def test_get_character_by_swapi_id_unknown_to_swapi(self, client: TestClient, mock_swapi_service):
+        """Test an ID SWAPI doesn't have either returns 404"""
+        mock_swapi_service.fetch_character_by_id = AsyncMock(return_value=None)
+
+        response = client.get("/api/v1/characters/swapi/999")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Character not found"
+
+    def test_get_character_by_swapi_id_swapi_down(self, client: TestClient, mock_swapi_service):
+        """Test an upstream failure is reported as a bad gateway, not a missing character"""
+        mock_swapi_service.fetch_character_by_id = AsyncMock(side_effect=SWAPIError("unavailable"))
+
+        response = client.get("/api/v1/characters/swapi/1")
+        assert response.status_code == 502
+
+    def test_get_character_by_swapi_id_without_hydration(self, client: TestClient, mock_swapi_service):
+        """Test lookups stay local when hydration is disabled"""
+        mock_swapi_service.fetch_character_by_id = AsyncMock()
+
+        with patch.object(settings, "SWAPI_HYDRATE_ON_MISS", False):
+            response = client.get("/api/v1/characters/swapi/1")
+
+        assert response.status_code == 404
+        mock_swapi_service.fetch_character_by_id.assert_not_awaited()
+
+    def test_sync_characters_from_swapi(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing characters from SWAPI"""
         # Mock the SWAPI service
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.characters.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_characters = AsyncMock(return_value=[
-                {
-                    "swapi_id": 1,
-                    "name": "Luke Skywalker",
-                    "height": "172",
-                    "url": "https://swapi.dev/api/people/1/"
-                }
-            ])
-
-            response = client.post("/api/v1/characters/sync")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is True
-            assert data["total"] >= 0
+        mock_swapi_service.iter_characters = PageStream([
+            {
+                "swapi_id": 1,
+                "name": "Luke Skywalker",
+                "height": "172",
+                "url": "https://swapi.dev/api/people/1/"
+            }
+        ])
+
+        response = client.post("/api/v1/characters/sync")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["entity"] == "characters"
+        assert job["status"] in ("pending", "running")
+
+        job = wait_for_job(job["id"])
+        assert job["status"] == "completed"
+        data = job["result"]
+        assert data["total"] == 1
+        assert data["status"] == "complete"
+        assert "complete" not in data
+        assert data["created"] == 1
+        assert data["updated"] == 0
+
+        response = client.post("/api/v1/characters/sync")
+        data = wait_for_job(response.json()["id"])["result"]
+        assert data["created"] == 0
+        assert data["updated"] == 0
+        assert data["unchanged"] == 1
 
     @pytest.mark.asyncio
-    async def test_sync_characters_from_swapi_with_errors(self, client: TestClient):
+    async def test_sync_characters_from_swapi_with_errors(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing characters from SWAPI with service errors"""
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.characters.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_characters = AsyncMock(side_effect=Exception("SWAPI error"))
-
-            response = client.post("/api/v1/characters/sync")
-            assert response.status_code == 500
-            assert "Failed to sync characters" in response.json()["detail"]
+        mock_swapi_service.iter_characters = PageStream(error=Exception("SWAPI error"))
+
+        response = client.post("/api/v1/characters/sync")
+        assert response.status_code == 202
+
+        job = wait_for_job(response.json()["id"])
+        assert job["status"] == "failed"
+        assert job["error"] == "SWAPI error"
+        assert job["result"] is None
 
     def test_get_characters_with_pagination_parameters(self, client: TestClient):
         """Test getting characters with additional pagination parameters"""
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.config import settings
+from app.database import (
+    Base, async_database_url, checkpoint_wal, configure_sqlite, create_tables, engine, run_wal_checkpoints
+)
+
+
+class TestDatabase:
+    """Test cases for engine setup and SQLite tuning"""
+
+    def test_async_database_url(self):
+        """Test sync URLs are rewritten to their dialect's async driver"""
+        assert async_database_url("sqlite:///./starwars.db") == "sqlite+aiosqlite:///./starwars.db"
+        assert async_database_url("postgresql://u:p@db/swapi") == "postgresql+asyncpg://u:p@db/swapi"
+        assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied_to_new_connections(self, tmp_path):
+        """Test every connection gets the configured SQLite profile"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+        configure_sqlite(engine)
+        try:
+            async with engine.connect() as connection:
+                async def pragma(name):
+                    return (await connection.execute(text(f"PRAGMA {name}"))).scalar()
+
+                assert await pragma("journal_mode") == settings.SQLITE_JOURNAL_MODE.lower()
+                assert await pragma("synchronous") == 1  # NORMAL
+                assert await pragma("busy_timeout") == settings.SQLITE_BUSY_TIMEOUT
+                assert await pragma("cache_size") == settings.SQLITE_CACHE_SIZE
+                assert await pragma("temp_store") == 2  # MEMORY
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_wal(self, tmp_path):
+        """Test a checkpoint copies committed WAL pages into the database"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'wal.db'}")
+        configure_sqlite(engine, {"journal_mode": "WAL", "wal_autocheckpoint": 0})
+        try:
+            # SQLite checkpoints by itself when the last connection closes
+            async with engine.connect() as reader:
+                await reader.execute(text("PRAGMA user_version"))
+                async with engine.begin() as connection:
+                    await connection.execute(text("CREATE TABLE votes (id INTEGER PRIMARY KEY)"))
+                    for _ in range(50):
+                        await connection.execute(text("INSERT INTO votes DEFAULT VALUES"))
+
+                busy, log_pages, checkpointed = await checkpoint_wal(engine)
+
+            assert busy == 0
+            assert log_pages > 0
+            assert checkpointed == log_pages
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_survive_failures(self):
+        """Test a failed checkpoint is logged and the loop keeps running"""
+        checkpoint = AsyncMock(side_effect=[Exception("database is locked"), (0, 4, 4), (0, 0, 0)])
+
+        with patch("app.database.checkpoint_wal", checkpoint):
+            task = asyncio.create_task(run_wal_checkpoints(0.001))
+            while checkpoint.await_count < 3:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_create_tables(self):
+        """Test missing tables are created on the primary on request"""
+        Base.metadata.drop_all(bind=engine)
+        try:
+            await create_tables()
+
+            assert {"characters", "films", "starships"} <= set(inspect(engine).get_table_names())
+        finally:
+            Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.config import settings
+from app.models.character import Character
+from app.services.character_service import CharacterService
+from app.services.export import export_columns
+
+
+class TestExport:
+    """Test cases for the streaming export endpoints"""
+
+    async def seed(self, db, count=5):
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "name": f"Character {i}", "height": str(150 + i)} for i in range(1, count + 1)
+        ])
+
+    @pytest.mark.asyncio
+    async def test_export_ndjson(self, client: TestClient, db, monkeypatch):
+        """Test every row is streamed as one JSON line, in id order, across batches"""
+        monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+        await self.seed(db)
+
+        response = client.get("/api/v1/export/characters")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["name"] for row in rows] == [f"Character {i}" for i in range(1, 6)]
+        assert set(rows[0]) == set(export_columns("characters"))
+        assert "content_hash" not in rows[0]
+
+    @pytest.mark.asyncio
+    async def test_export_csv_fields(self, client: TestClient, db):
+        """Test CSV has a header row and only the selected fields, in the order asked"""
+        await self.seed(db, count=3)
+
+        response = client.get("/api/v1/export/characters?format=csv&fields=name,swapi_id")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="characters.csv"' in response.headers["content-disposition"]
+        assert list(csv.reader(io.StringIO(response.text))) == [
+            ["name", "swapi_id"],
+            ["Character 1", "1"],
+            ["Character 2", "2"],
+            ["Character 3", "3"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_export_updated_since(self, client: TestClient, db):
+        """Test updated_since leaves out rows last updated before it"""
+        await self.seed(db, count=3)
+        now = datetime.utcnow().replace(microsecond=0)
+        await db.execute(
+            update(Character).where(Character.swapi_id != 2).values(updated_at=now - timedelta(days=2))
+        )
+        await db.commit()
+
+        since = (now - timedelta(days=1)).isoformat()
+        response = client.get(f"/api/v1/export/characters?fields=swapi_id&updated_since={since}")
+        assert [json.loads(line) for line in response.text.splitlines()] == [{"swapi_id": 2}]
+
+    def test_export_rejects_unknown_fields(self, client: TestClient):
+        """Test unknown fields and entities are refused before anything is streamed"""
+        response = client.get("/api/v1/export/characters?fields=name,password")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown characters fields: password"
+        assert client.get("/api/v1/export/content_hash").status_code == 422
+        assert client.get("/api/v1/export/films?format=xml").status_code == 422
+
+    def test_export_empty(self, client: TestClient):
+        """Test an empty table exports nothing, or just the header as CSV"""
+        assert client.get("/api/v1/export/starships").text == ""
+        assert client.get("/api/v1/export/starships?format=csv&fields=id,name").text == "id,name\n"
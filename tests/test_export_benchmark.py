@@ -0,0 +1,18 @@
+import pytest
+from app.config import settings
+from benchmarks.export_benchmark import run_benchmark
+
+
+class TestExportBenchmark:
+    """Test cases for the export benchmark"""
+
+    @pytest.mark.asyncio
+    async def test_exports_every_row(self):
+        """Test the export reads every seeded row and paging the ones asked for"""
+        metrics = await run_benchmark(rows=250, export_format="csv", batch_size=100, paging_rows=150, trace_memory=True)
+
+        assert metrics["export"]["rows"] == 250
+        assert metrics["export"]["peak_memory_mb"] > 0
+        assert metrics["paging"]["rows"] == 150
+        # The batch size is restored afterwards
+        assert settings.EXPORT_BATCH_SIZE == 1000
@@ -1,8 +1,13 @@
 import pytest
+from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
+from mock_swapi import PageStream
 from app.models.film import Film
 from app.services.film_service import FilmService
 from app.schemas.film import FilmCreate
+from app.services.character_service import CharacterService
+from app.services.relations import sync_character_films
+from app.services.swapi_resilience import SWAPIError
 
 
 class TestFilmAPI:
@@ -18,7 +23,8 @@ class TestFilmAPI:
         assert data["page"] == 1
         assert data["size"] == 20
 
-    def test_get_films_with_pagination(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_films_with_pagination(self, client: TestClient, db):
         """Test getting films with pagination"""
         # Create test films
         service = FilmService(db)
@@ -29,7 +35,7 @@ class TestFilmAPI:
                 episode_id=i+1,
                 director="Test Director"
             )
-            service.create_film(film_data)
+            await service.create_film(film_data)
 
         # Test first page
         response = client.get("/api/v1/films/?page=1&size=3")
@@ -39,7 +45,8 @@ class TestFilmAPI:
         assert data["page"] == 1
         assert data["size"] == 3
 
-    def test_search_films(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_search_films(self, client: TestClient, db):
         """Test searching films by title"""
         # Create test films
         service = FilmService(db)
@@ -49,7 +56,7 @@ class TestFilmAPI:
             FilmCreate(swapi_id=103, title="Return of the Jedi", episode_id=6),
         ]
         for film_data in films:
-            service.create_film(film_data)
+            await service.create_film(film_data)
 
         # Search for "Hope"
         response = client.get("/api/v1/films/search?title=Hope")
@@ -57,12 +64,13 @@ class TestFilmAPI:
         data = response.json()
         assert data["total"] >= 1
 
-    def test_vote_for_film(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_vote_for_film(self, client: TestClient, db):
         """Test voting for a film"""
         # Create test film
         service = FilmService(db)
         film_data = FilmCreate(swapi_id=104, title="Test Film", episode_id=1)
-        film = service.create_film(film_data)
+        film = await service.create_film(film_data)
 
         # Vote for film
         response = client.post(f"/api/v1/films/{film.id}/vote")
@@ -71,7 +79,8 @@ class TestFilmAPI:
         assert data["success"] is True
         assert data["votes"] == 1
 
-    def test_get_top_voted_films(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_top_voted_films(self, client: TestClient, db):
         """Test getting top voted films"""
         response = client.get("/api/v1/films/top/voted?limit=5")
         assert response.status_code == 200
@@ -79,11 +88,12 @@ class TestFilmAPI:
         assert isinstance(data, list)
         assert len(data) <= 5
 
-    def test_get_film_by_id(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_film_by_id(self, client: TestClient, db):
         """Test getting film by ID"""
         service = FilmService(db)
         film_data = FilmCreate(swapi_id=1, title="A New Hope", episode_id=4)
-        film = service.create_film(film_data)
+        film = await service.create_film(film_data)
 
         response = client.get(f"/api/v1/films/{film.id}")
         assert response.status_code == 200
@@ -91,6 +101,46 @@ class TestFilmAPI:
         assert data["title"] == "A New Hope"
         assert data["episode_id"] == 4
 
+    @pytest.mark.asyncio
+    async def test_get_film_characters_by_keyset(self, client: TestClient, db):
+        """Test a film's characters come in pages continued from the last id, and the detail can embed fewer"""
+        film_id = (await FilmService(db).create_film(FilmCreate(swapi_id=1, title="A New Hope"))).id
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "name": f"Character {i}"} for i in range(1, 6)
+        ])
+        characters, _ = await CharacterService(db).get_characters()
+        character_ids = sorted(character.id for character in characters)
+        await db.run_sync(sync_character_films, "film", {film_id: set(character_ids)})
+        await db.commit()
+
+        response = client.get(f"/api/v1/films/{film_id}/characters?size=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data["items"]] == character_ids[:2]
+        assert data["next_after"] == character_ids[1]
+
+        data = client.get(f"/api/v1/films/{film_id}/characters?size=2&after={character_ids[3]}").json()
+        assert [item["id"] for item in data["items"]] == character_ids[4:]
+        assert data["next_after"] is None
+
+        data = client.get(f"/api/v1/films/{film_id}?characters_limit=2").json()
+        assert [character["id"] for character in data["characters"]] == character_ids[:2]
+        assert data["character_count"] == 5
+        assert client.get(f"/api/v1/films/{film_id}?characters_limit=0").json()["characters"] == []
+        assert len(client.get(f"/api/v1/films/{film_id}").json()["characters"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_get_film_characters_not_found(self, client: TestClient, db):
+        """Test the characters of a missing film return 404, and of a film without any an empty page"""
+        response = client.get("/api/v1/films/999/characters")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Film not found"
+
+        film = await FilmService(db).create_film(FilmCreate(swapi_id=1, title="A New Hope"))
+        response = client.get(f"/api/v1/films/{film.id}/characters")
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "size": 20, "next_after": None}
+
     def test_get_film_not_found(self, client: TestClient):
         """Test getting non-existent film"""
         response = client.get("/api/v1/films/999")
@@ -98,38 +148,81 @@ class TestFilmAPI:
         assert "Film not found" in response.json()["detail"]
 
     @pytest.mark.asyncio
-    async def test_sync_films_from_swapi(self, client: TestClient):
+    async def test_get_film_by_swapi_id_hydrates_on_miss(self, client: TestClient, db, mock_swapi_service):
+        """Test an unknown SWAPI ID is fetched, stored with its character links and both sides' counts"""
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": 1, "name": "Luke Skywalker", "url": "https://swapi.dev/api/people/1/"}
+        ])
+        characters, _ = await CharacterService(db).get_characters()
+        character_id = characters[0].id
+        mock_swapi_service.fetch_film_by_id = AsyncMock(return_value={
+            "swapi_id": 1,
+            "title": "A New Hope",
+            "episode_id": 4,
+            "url": "https://swapi.dev/api/films/1/",
+            "characters": ["https://swapi.dev/api/people/1/"]
+        })
+
+        response = client.get("/api/v1/films/swapi/1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "A New Hope"
+        assert data["episode_id"] == 4
+        assert [character["id"] for character in data["characters"]] == [character_id]
+        assert data["character_count"] == 1
+
+        character = client.get(f"/api/v1/characters/{character_id}").json()
+        assert [film["id"] for film in character["films"]] == [data["id"]]
+        assert character["film_count"] == 1
+
+        # Now served from the database
+        assert client.get("/api/v1/films/swapi/1").status_code == 200
+        mock_swapi_service.fetch_film_by_id.assert_awaited_once_with(1)
+
+    def test_get_film_by_swapi_id_swapi_down(self, client: TestClient, mock_swapi_service):
+        """Test an upstream failure is reported as a bad gateway, not a missing film"""
+        mock_swapi_service.fetch_film_by_id = AsyncMock(side_effect=SWAPIError("unavailable"))
+
+        response = client.get("/api/v1/films/swapi/1")
+        assert response.status_code == 502
+
+    @pytest.mark.asyncio
+    async def test_sync_films_from_swapi(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing films from SWAPI"""
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.films.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_films = AsyncMock(return_value=[
-                {
-                    "swapi_id": 1,
-                    "title": "A New Hope",
-                    "episode_id": 4,
-                    "director": "George Lucas",
-                    "url": "https://swapi.dev/api/films/1/"
-                }
-            ])
-
-            response = client.post("/api/v1/films/sync")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is True
-            assert data["total"] >= 0
+        mock_swapi_service.iter_films = PageStream([
+            {
+                "swapi_id": 1,
+                "title": "A New Hope",
+                "episode_id": 4,
+                "director": "George Lucas",
+                "url": "https://swapi.dev/api/films/1/"
+            }
+        ])
+
+        response = client.post("/api/v1/films/sync")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["entity"] == "films"
+        assert job["status"] in ("pending", "running")
+
+        job = wait_for_job(job["id"])
+        assert job["status"] == "completed"
+        data = job["result"]
+        assert data["total"] == 1
+        assert data["status"] == "complete"
 
     @pytest.mark.asyncio
-    async def test_sync_films_from_swapi_with_errors(self, client: TestClient):
+    async def test_sync_films_from_swapi_with_errors(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing films from SWAPI with service errors"""
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.films.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_films = AsyncMock(side_effect=Exception("SWAPI error"))
-
-            response = client.post("/api/v1/films/sync")
-            assert response.status_code == 500
-            assert "Failed to sync films" in response.json()["detail"]
+        mock_swapi_service.iter_films = PageStream(error=Exception("SWAPI error"))
+
+        response = client.post("/api/v1/films/sync")
+        assert response.status_code == 202
+
+        job = wait_for_job(response.json()["id"])
+        assert job["status"] == "failed"
+        assert job["error"] == "SWAPI error"
+        assert job["result"] is None
 
     def test_get_films_with_pagination_parameters(self, client: TestClient):
         """Test getting films with pagination parameters"""
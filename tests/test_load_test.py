@@ -0,0 +1,41 @@
+import httpx
+import pytest
+from app.main import app
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.starship_service import StarshipService
+from benchmarks.load_test import fire, request_paths
+
+
+class TestLoadTest:
+    """Test cases for the read endpoint load test"""
+
+    def test_request_paths_stay_within_seeded_rows(self):
+        """Test the request mix only asks for rows that were seeded"""
+        paths = request_paths(80, characters=40, films=2, starships=20)
+
+        assert len(paths) == 80
+        assert all(path.startswith("/api/v1/") for path in paths)
+        assert "/api/v1/characters/41" not in paths
+        assert "/api/v1/films/3" not in paths
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_succeed(self, db):
+        """Test many requests in flight at once on one event loop all succeed"""
+        await CharacterService(db).bulk_upsert_from_swapi(
+            [{"swapi_id": i, "name": f"Person {i}"} for i in range(1, 41)]
+        )
+        await FilmService(db).bulk_upsert_from_swapi(
+            [{"swapi_id": i, "title": f"Film {i}"} for i in (1, 2)]
+        )
+        await StarshipService(db).bulk_upsert_from_swapi(
+            [{"swapi_id": i, "name": f"Starship {i}"} for i in range(1, 21)]
+        )
+        paths = request_paths(80, characters=40, films=2, starships=20)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            metrics = await fire(client, paths, concurrency=40)
+
+        assert metrics["requests"] == 80
+        assert metrics["errors"] == 0
+        assert metrics["p50_ms"] <= metrics["p95_ms"] <= metrics["max_ms"]
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import insert
+from app.models.character import Character
+from app.models.character_film import character_film_association
+from app.models.film import Film
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.loaders import RelationLoader
+
+
+class TestRelationLoader:
+    """Test cases for batch loading relationships over character_films"""
+
+    async def seed(self, db):
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "name": f"Character {i}"} for i in (1, 2, 3)
+        ])
+        await FilmService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "title": f"Film {i}"} for i in (1, 2)
+        ])
+        await db.execute(insert(character_film_association), [
+            {"character_id": 1, "film_id": 1},
+            {"character_id": 1, "film_id": 2},
+            {"character_id": 2, "film_id": 2},
+        ])
+        await db.commit()
+        characters, _ = await CharacterService(db).get_characters(sort="name")
+        return characters
+
+    @pytest.mark.asyncio
+    async def test_load_fills_relationships(self, db, statements):
+        """Test every queued parent gets its children from one query, an empty list if it has none"""
+        characters = await self.seed(db)
+        statements.clear()
+
+        loader = RelationLoader(db, Character, "films")
+        loader.add(characters[:2])
+        loader.add(characters[2:])
+        loaded = await loader.load()
+
+        assert len(statements) == 1
+        assert {character_id: [film.title for film in films] for character_id, films in loaded.items()} == {
+            1: ["Film 1", "Film 2"], 2: ["Film 2"], 3: []
+        }
+        # The relationship is loaded, so reading it runs no query
+        assert [film.title for film in characters[0].films] == ["Film 1", "Film 2"]
+        assert characters[2].films == []
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_children_are_one_object(self, db):
+        """Test a film linked to several characters is loaded once and shared"""
+        characters = await self.seed(db)
+
+        await CharacterService(db).include_films(characters)
+
+        assert characters[0].films[1] is characters[1].films[0]
+
+    @pytest.mark.asyncio
+    async def test_nothing_queued(self, db, statements):
+        """Test loading without parents runs no query"""
+        assert await RelationLoader(db, Film, "characters").load() == {}
+        assert statements == []
+
+    def test_unknown_relationship(self, db):
+        """Test only the character_films relationships can be loaded"""
+        with pytest.raises(ValueError, match="Unknown relationship"):
+            RelationLoader(db, Character, "starships")
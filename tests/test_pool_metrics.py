@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from app.config import settings
+from app.database import pool_options
+from app.pool_metrics import PoolMetrics
+
+
+class TestPoolMetrics:
+    """Test cases for connection pool settings and instrumentation"""
+
+    def test_pool_options_per_dialect(self, monkeypatch):
+        """Test each dialect gets its defaults and settings override them"""
+        assert pool_options("sqlite://")["poolclass"] is StaticPool
+
+        sqlite_file = pool_options("sqlite:///./swapi.db")
+        assert sqlite_file["poolclass"] is AsyncAdaptedQueuePool
+        assert sqlite_file["pool_pre_ping"] is False
+
+        postgres = pool_options("postgresql://u:p@db/swapi")
+        assert postgres["pool_size"] == 10
+        assert postgres["pool_pre_ping"] is True
+        assert postgres["pool_recycle"] == 1800
+
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 32)
+        monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+        postgres = pool_options("postgresql://u:p@db/swapi")
+        assert postgres["pool_size"] == 32
+        assert postgres["pool_pre_ping"] is False
+        assert postgres["max_overflow"] == 20
+
+    @pytest.mark.asyncio
+    async def test_checkouts_and_timeouts_recorded(self, tmp_path):
+        """Test checkouts, connections in use and pool timeouts are counted"""
+        metrics = PoolMetrics("test")
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=metrics.pool_class(AsyncAdaptedQueuePool),
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05
+        )
+        metrics.instrument(engine)
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                assert metrics.snapshot().in_use == 1
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+
+            stats = metrics.snapshot()
+            assert stats.pool_class == "InstrumentedAsyncAdaptedQueuePool"
+            assert stats.size == 1
+            assert stats.in_use == 0
+            assert stats.checkouts == 2
+            assert stats.timeouts == 1
+            assert stats.connects == 1
+            assert 0 < stats.wait_avg_ms <= stats.wait_max_ms
+        finally:
+            await engine.dispose()
+
+    def test_pool_stats_endpoint(self, client: TestClient):
+        """Test the stats endpoint reports the application's pool"""
+        client.get("/api/v1/characters/")
+
+        response = client.get("/api/v1/stats/db-pool")
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert [pool["name"] for pool in stats] == ["primary"]
+        assert stats[0]["pool_class"].startswith("Instrumented")
+        assert {"in_use", "overflow", "timeouts", "wait_p95_ms"} <= stats[0].keys()
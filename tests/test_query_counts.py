@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from app.models.character_film import character_film_association
+from app.schemas.character import CharacterCreate, CharacterUpdate
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.starship_service import StarshipService
+
+# Statements each endpoint may run, with one character in one film and
+# one starship stored. Relationships load with one extra SELECT each.
+ENDPOINT_STATEMENTS = [
+    ("GET", "/api/v1/characters/", 2),
+    ("GET", "/api/v1/characters/search?name=Luke", 2),
+    ("GET", "/api/v1/characters/1", 2),
+    ("GET", "/api/v1/characters/1?films_limit=5", 2),
+    ("GET", "/api/v1/characters/1?films_limit=0", 1),
+    ("GET", "/api/v1/characters/1/films", 1),
+    ("GET", "/api/v1/characters/swapi/1", 2),
+    ("GET", "/api/v1/characters/top/voted", 1),
+    ("POST", "/api/v1/characters/1/vote", 1),
+    ("GET", "/api/v1/films/", 2),
+    ("GET", "/api/v1/films/search?title=Hope", 2),
+    ("GET", "/api/v1/films/1", 2),
+    ("GET", "/api/v1/films/1?characters_limit=5", 2),
+    ("GET", "/api/v1/films/1?characters_limit=0", 1),
+    ("GET", "/api/v1/films/1/characters", 1),
+    ("GET", "/api/v1/films/swapi/1", 2),
+    ("GET", "/api/v1/films/top/voted", 1),
+    ("POST", "/api/v1/films/1/vote", 1),
+    ("GET", "/api/v1/starships/", 2),
+    ("GET", "/api/v1/starships/search?name=Falcon", 2),
+    ("GET", "/api/v1/starships/1", 1),
+    ("GET", "/api/v1/starships/swapi/1", 1),
+    ("GET", "/api/v1/starships/top/voted", 1),
+    ("POST", "/api/v1/starships/1/vote", 1),
+]
+
+
+class TestQueryCounts:
+    """Test cases for the number of SQL statements per endpoint and write"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method, path, expected", ENDPOINT_STATEMENTS)
+    async def test_endpoint_statements(self, client: TestClient, db, statements, method, path, expected):
+        """Test each endpoint runs a fixed number of statements"""
+        await CharacterService(db).bulk_upsert_from_swapi([{"swapi_id": 1, "name": "Luke Skywalker"}])
+        await FilmService(db).bulk_upsert_from_swapi([{"swapi_id": 1, "title": "A New Hope"}])
+        await StarshipService(db).bulk_upsert_from_swapi([{"swapi_id": 1, "name": "Millennium Falcon"}])
+        await db.execute(insert(character_film_association).values(character_id=1, film_id=1))
+        await db.commit()
+        statements.clear()
+
+        response = client.request(method, path)
+
+        assert response.status_code == 200
+        assert len(statements) == expected, statements
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path, relation", [
+        ("/api/v1/characters/?size=100&include=films", "films"),
+        ("/api/v1/characters/search?name=Character&size=100&include=films", "films"),
+        ("/api/v1/characters/top/voted?limit=50&include=films", "films"),
+        ("/api/v1/films/?size=100&include=characters", "characters"),
+        ("/api/v1/films/top/voted?limit=50&include=characters", "characters"),
+    ])
+    async def test_include_is_one_statement(self, client: TestClient, db, statements, path, relation):
+        """Test including a relationship on a full page adds one statement, however many rows it links"""
+        await CharacterService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "name": f"Character {i}"} for i in range(1, 101)
+        ])
+        await FilmService(db).bulk_upsert_from_swapi([
+            {"swapi_id": i, "title": f"Film {i}"} for i in range(1, 101)
+        ])
+        # Every character in 6 films, so films are shared by many characters
+        await db.execute(insert(character_film_association), [
+            {"character_id": character_id, "film_id": (character_id + offset) % 100 + 1}
+            for character_id in range(1, 101)
+            for offset in range(6)
+        ])
+        await db.commit()
+        statements.clear()
+
+        response = client.get(path)
+
+        assert response.status_code == 200
+        body = response.json()
+        items = body["items"] if isinstance(body, dict) else body
+        assert all(len(item[relation]) == 6 for item in items)
+        # The page's own statements, plus one for the relationship
+        assert len(statements) == (2 if "top" in path else 3), statements
+
+    @pytest.mark.asyncio
+    async def test_writes_are_one_statement(self, db, statements):
+        """Test creating, updating, upserting and voting each run one statement, with no read-back"""
+        service = CharacterService(db)
+
+        character = await service.create_character(CharacterCreate(swapi_id=1, name="Luke Skywalker"))
+        assert character.created_at is not None
+        assert character.films == []
+        updated = await service.update_character(character.id, CharacterUpdate(height="172"))
+        assert updated.height == "172"
+        upserted = await service.create_or_update_from_swapi({"swapi_id": 1, "name": "Luke Skywalker", "mass": "77"})
+        assert upserted.mass == "77"
+        voted = await service.vote_for_character(character.id)
+        assert voted.votes == 1
+
+        assert [statement.split()[0] for statement in statements] == ["INSERT", "UPDATE", "INSERT", "UPDATE"]
+        assert all("RETURNING" in statement for statement in statements)
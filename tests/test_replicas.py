@@ -0,0 +1,108 @@
+import sqlite3
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from unittest.mock import AsyncMock
+from sqlalchemy.pool import NullPool
+from app.database import (
+    Base, SessionRouter, async_database_url, configure_sqlite, get_db, get_read_db, get_session_factory,
+    refresh_sqlite_replica
+)
+from app.main import app
+from app.models.character import Character
+
+
+def sessionmaker_for(url, **pragmas):
+    engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    if pragmas:
+        configure_sqlite(engine, pragmas)
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """A primary SQLite file holding one character, its replica and a router between them"""
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(primary_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Character), [{"swapi_id": 1, "name": "Luke Skywalker"}])
+    engine.dispose()
+    refresh_sqlite_replica(primary_url, replica_url)
+
+    router = SessionRouter(
+        sessionmaker_for(primary_url),
+        [sessionmaker_for(replica_url, query_only="ON")],
+        sticky_seconds=60
+    )
+    monkeypatch.setattr("app.database.session_router", router)
+    overrides = {dependency: app.dependency_overrides.pop(dependency) for dependency in (get_db, get_read_db)}
+    overrides[get_session_factory] = app.dependency_overrides[get_session_factory]
+    app.dependency_overrides[get_session_factory] = lambda: router.primary
+    yield primary_url, replica_url
+    app.dependency_overrides.update(overrides)
+
+
+class TestReplicas:
+    """Test cases for read replica routing"""
+
+    def test_refresh_copies_primary(self, tmp_path):
+        """Test the backup API copies committed rows onto the replica"""
+        primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+        with sqlite3.connect(primary) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE votes (id INTEGER PRIMARY KEY)")
+            connection.executemany("INSERT INTO votes VALUES (?)", [(i,) for i in range(10)])
+
+        refresh_sqlite_replica(f"sqlite:///{primary}", f"sqlite:///{replica}")
+
+        with sqlite3.connect(replica) as connection:
+            assert connection.execute("SELECT count(*) FROM votes").fetchone() == (10,)
+
+    def test_reads_rotate_over_replicas(self):
+        """Test reads take the replicas in turn and fall back to the primary without any"""
+        primary, first, second = object(), object(), object()
+
+        router = SessionRouter(primary, [first, second])
+
+        assert [router.for_read() for _ in range(3)] == [first, second, first]
+        assert router.for_write() is primary
+        assert SessionRouter(primary).for_read() is primary
+
+    def test_reads_follow_own_writes(self, replicated):
+        """Test a client reads from the primary after voting, others from the replica"""
+        primary_url, replica_url = replicated
+        with TestClient(app) as voter, TestClient(app) as other:
+            assert voter.get("/api/v1/characters/1").json()["votes"] == 0
+
+            response = voter.post("/api/v1/characters/1/vote")
+            assert response.status_code == 200
+            assert "db_primary_until" in response.cookies
+
+            # The voter reads its vote, the replica hasn't caught up yet
+            assert voter.get("/api/v1/characters/1").json()["votes"] == 1
+            assert other.get("/api/v1/characters/1").json()["votes"] == 0
+
+            refresh_sqlite_replica(primary_url, replica_url)
+            assert other.get("/api/v1/characters/1").json()["votes"] == 1
+
+    def test_swapi_lookup_sticks_only_after_hydrating(self, replicated, mock_swapi_service):
+        """Test a lookup by SWAPI ID reads the replica, and only a row fetched from SWAPI pins the client"""
+        mock_swapi_service.fetch_character_by_id = AsyncMock(side_effect=lambda swapi_id: {
+            "swapi_id": 2, "name": "Leia Organa", "url": "https://swapi.dev/api/people/2/"
+        } if swapi_id == 2 else None)
+        with TestClient(app) as client:
+            response = client.get("/api/v1/characters/swapi/1")
+            assert response.status_code == 200
+            assert "db_primary_until" not in response.cookies
+
+            response = client.get("/api/v1/characters/swapi/999")
+            assert response.status_code == 404
+            assert "db_primary_until" not in response.cookies
+
+            response = client.get("/api/v1/characters/swapi/2")
+            assert response.status_code == 200
+            assert response.json()["name"] == "Leia Organa"
+            assert "db_primary_until" in response.cookies
@@ -0,0 +1,14 @@
+import pytest
+from benchmarks.service_benchmark import CALLS, run_benchmark
+
+
+class TestServiceBenchmark:
+    """Test cases for the service method micro-benchmark"""
+
+    @pytest.mark.asyncio
+    async def test_times_every_method(self):
+        """Test every listed method runs against the seeded data and gets a time per call"""
+        results = await run_benchmark(iterations=3, warmup=1)
+
+        assert list(results) == [f"{service.__name__}.{method}" for service, method, _ in CALLS]
+        assert all(micros > 0 for micros in results.values())
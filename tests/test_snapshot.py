@@ -0,0 +1,142 @@
+import gzip
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from sqlalchemy import func, inspect, select
+from app.config import settings
+from app.database import Base
+from app.models.character import Character
+from app.models.film import Film
+from app.models.starship import Starship
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.relations import load_url_map, resolve_links, sync_character_films
+from app.services.snapshot import export_snapshot, import_snapshot
+from app.services.starship_service import StarshipService
+
+PEOPLE_URL = "https://swapi.dev/api/people/{}/"
+FILMS_URL = "https://swapi.dev/api/films/{}/"
+
+
+def make_characters(count):
+    return [
+        {"swapi_id": i, "name": f"Character {i}", "height": "172", "url": PEOPLE_URL.format(i)}
+        for i in range(1, count + 1)
+    ]
+
+
+def make_films(count):
+    return [
+        {"swapi_id": i, "title": f"Film {i}", "episode_id": i, "url": FILMS_URL.format(i)}
+        for i in range(1, count + 1)
+    ]
+
+
+class TestSnapshot:
+    """Test cases for offline snapshot export and import"""
+
+    @pytest_asyncio.fixture
+    async def populated_db(self, db):
+        # Film n appears in every character whose swapi_id is a multiple of n
+        films = [
+            dict(film, characters=[PEOPLE_URL.format(i) for i in range(1, 31) if i % film["swapi_id"] == 0])
+            for film in make_films(3)
+        ]
+        await CharacterService(db).bulk_upsert_from_swapi(make_characters(30))
+        await FilmService(db).bulk_upsert_from_swapi(films)
+        await StarshipService(db).bulk_upsert_from_swapi([{"swapi_id": 10, "name": "Millennium Falcon"}])
+
+        def link(session):
+            links = resolve_links(films, "characters", load_url_map(session, Film), load_url_map(session, Character))
+            sync_character_films(session, "film", links)
+
+        await db.run_sync(link)
+        return db
+
+    async def reset_tables(self, db):
+        await db.close()
+        async with db.bind.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+
+    async def index_names(self, db, table):
+        async with db.bind.connect() as connection:
+            indexes = await connection.run_sync(lambda conn: inspect(conn).get_indexes(table))
+        return {index["name"] for index in indexes}
+
+    async def count(self, db, model):
+        return await db.scalar(select(func.count()).select_from(model))
+
+    async def film_titles(self, db, swapi_id):
+        db.expire_all()
+        character = await CharacterService(db).get_character_by_swapi_id(swapi_id)
+        return sorted(film.title for film in character.films)
+
+    @pytest.mark.asyncio
+    async def test_export_format(self, populated_db, tmp_path):
+        """Test the snapshot is gzipped NDJSON with a header and one line per row"""
+        path = tmp_path / "snapshot.ndjson.gz"
+
+        counts = await export_snapshot(populated_db, str(path))
+
+        assert counts == {"characters": 30, "films": 3, "starships": 1, "character_films": 30}
+        with gzip.open(path, "rt") as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0]["format"] == "swapi-snapshot"
+        assert lines[1]["type"] == "characters"
+        assert "votes" not in lines[1] and "id" not in lines[1]
+        assert lines[-1] == {"type": "character_films", "character": 30, "films": [1, 2, 3]}
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, populated_db, tmp_path):
+        """Test an import into an empty database restores rows and links"""
+        path = str(tmp_path / "snapshot.ndjson.gz")
+        await export_snapshot(populated_db, path)
+        await self.reset_tables(populated_db)
+
+        with patch.object(settings, "SNAPSHOT_BATCH_SIZE", 7):
+            counts = await import_snapshot(populated_db, path)
+
+        db = populated_db
+        assert counts["characters"] == 30
+        assert await self.count(db, Character) == 30
+        assert await self.count(db, Film) == 3
+        assert (await db.scalars(select(Starship))).one().name == "Millennium Falcon"
+        assert await self.film_titles(db, 6) == ["Film 1", "Film 2", "Film 3"]
+        assert await self.film_titles(db, 7) == ["Film 1"]
+
+    @pytest.mark.asyncio
+    async def test_import_matches_sync_hashes(self, populated_db, tmp_path):
+        """Test a sync after an import sees every row as unchanged"""
+        path = str(tmp_path / "snapshot.ndjson.gz")
+        await export_snapshot(populated_db, path)
+        await self.reset_tables(populated_db)
+        await import_snapshot(populated_db, path)
+
+        result = await CharacterService(populated_db).bulk_upsert_from_swapi(make_characters(30))
+
+        assert (result.created, result.updated, result.unchanged) == (0, 0, 30)
+
+    @pytest.mark.asyncio
+    async def test_indexes_rebuilt_after_import(self, populated_db, tmp_path):
+        """Test secondary indexes deferred during the load exist afterwards"""
+        path = str(tmp_path / "snapshot.ndjson.gz")
+        await export_snapshot(populated_db, path)
+        await self.reset_tables(populated_db)
+        expected = await self.index_names(populated_db, "characters")
+
+        await import_snapshot(populated_db, path)
+
+        assert await self.index_names(populated_db, "characters") == expected
+        assert "ix_characters_name" in expected
+
+    @pytest.mark.asyncio
+    async def test_rejects_other_files(self, db, tmp_path):
+        """Test a file without the snapshot header is refused"""
+        path = tmp_path / "other.ndjson.gz"
+        with gzip.open(path, "wt") as f:
+            f.write('{"hello": "world"}\n')
+
+        with pytest.raises(ValueError, match="not a SWAPI snapshot"):
+            await import_snapshot(db, str(path))
@@ -0,0 +1,21 @@
+import pytest
+from benchmarks.sqlite_benchmark import run_benchmark
+
+
+class TestSQLiteBenchmark:
+    """Test cases for the SQLite read/write benchmark"""
+
+    @pytest.mark.parametrize("profile", ["default", "tuned"])
+    def test_reads_and_votes(self, profile):
+        """Test readers and voters both make progress under each profile"""
+        metrics = run_benchmark(profile=profile, duration=0.2, readers=2, voters=1, characters=20)
+
+        assert metrics["reads"] > 0
+        assert metrics["votes"] > 0
+        assert metrics["errors"] == 0
+        assert metrics["read_p50_ms"] <= metrics["read_p95_ms"]
+
+    def test_unknown_profile(self):
+        """Test an unknown profile is refused"""
+        with pytest.raises(ValueError, match="Unknown profile"):
+            run_benchmark(profile="fast")
@@ -1,5 +1,7 @@
 import pytest
+from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
+from mock_swapi import PageStream
 from app.models.starship import Starship
 from app.services.starship_service import StarshipService
 from app.schemas.starship import StarshipCreate
@@ -18,7 +20,8 @@ class TestStarshipAPI:
         assert data["page"] == 1
         assert data["size"] == 20
 
-    def test_search_starships(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_search_starships(self, client: TestClient, db):
         """Test searching starships by name"""
         # Create test starships
         service = StarshipService(db)
@@ -28,7 +31,7 @@ class TestStarshipAPI:
             StarshipCreate(swapi_id=203, name="TIE Fighter", model="Twin Ion Engine"),
         ]
         for starship_data in starships:
-            service.create_starship(starship_data)
+            await service.create_starship(starship_data)
 
         # Search for "Falcon"
         response = client.get("/api/v1/starships/search?name=Falcon")
@@ -36,12 +39,13 @@ class TestStarshipAPI:
         data = response.json()
         assert data["total"] >= 1
 
-    def test_vote_for_starship(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_vote_for_starship(self, client: TestClient, db):
         """Test voting for a starship"""
         # Create test starship
         service = StarshipService(db)
         starship_data = StarshipCreate(swapi_id=204, name="Test Starship", model="Test Model")
-        starship = service.create_starship(starship_data)
+        starship = await service.create_starship(starship_data)
 
         # Vote for starship
         response = client.post(f"/api/v1/starships/{starship.id}/vote")
@@ -50,7 +54,8 @@ class TestStarshipAPI:
         assert data["success"] is True
         assert data["votes"] == 1
 
-    def test_get_starship_by_id(self, client: TestClient, db):
+    @pytest.mark.asyncio
+    async def test_get_starship_by_id(self, client: TestClient, db):
         """Test getting starship by ID"""
         # Create test starship
         service = StarshipService(db)
@@ -60,7 +65,7 @@ class TestStarshipAPI:
             model="Test Model",
             manufacturer="Test Corp"
         )
-        starship = service.create_starship(starship_data)
+        starship = await service.create_starship(starship_data)
 
         # Get starship by ID
         response = client.get(f"/api/v1/starships/{starship.id}")
@@ -75,7 +80,23 @@ class TestStarshipAPI:
         assert response.status_code == 404
         assert "Starship not found" in response.json()["detail"]
 
-    def test_get_top_voted_starships(self, client: TestClient, db):
+    def test_get_starship_by_swapi_id_hydrates_on_miss(self, client: TestClient, mock_swapi_service):
+        """Test an unknown SWAPI ID is fetched from SWAPI and stored"""
+        mock_swapi_service.fetch_starship_by_id = AsyncMock(return_value={
+            "swapi_id": 10,
+            "name": "Millennium Falcon",
+            "url": "https://swapi.dev/api/starships/10/"
+        })
+
+        response = client.get("/api/v1/starships/swapi/10")
+        assert response.status_code == 200
+        assert response.json()["name"] == "Millennium Falcon"
+
+        response = client.get(f"/api/v1/starships/{response.json()['id']}")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_get_top_voted_starships(self, client: TestClient, db):
         """Test getting top voted starships"""
         service = StarshipService(db)
 
@@ -88,14 +109,14 @@ class TestStarshipAPI:
 
         created_starships = []
         for starship_data in starships:
-            created_starships.append(service.create_starship(starship_data))
+            created_starships.append(await service.create_starship(starship_data))
 
         # Vote for starships (different amounts)
         for _ in range(5):
-            service.vote_for_starship(created_starships[0].id)  # Falcon: 5 votes
+            await service.vote_for_starship(created_starships[0].id)  # Falcon: 5 votes
         for _ in range(3):
-            service.vote_for_starship(created_starships[1].id)  # X-wing: 3 votes
-        service.vote_for_starship(created_starships[2].id)     # TIE: 1 vote
+            await service.vote_for_starship(created_starships[1].id)  # X-wing: 3 votes
+        await service.vote_for_starship(created_starships[2].id)     # TIE: 1 vote
 
         # Get top voted
         response = client.get("/api/v1/starships/top/voted?limit=2")
@@ -108,37 +129,41 @@ class TestStarshipAPI:
         assert data[1]["votes"] == 3
 
     @pytest.mark.asyncio
-    async def test_sync_starships_from_swapi(self, client: TestClient):
+    async def test_sync_starships_from_swapi(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing starships from SWAPI"""
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.starships.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_starships = AsyncMock(return_value=[
-                {
-                    "swapi_id": 1,
-                    "name": "Millennium Falcon",
-                    "model": "YT-1300 light freighter",
-                    "url": "https://swapi.dev/api/starships/10/"
-                }
-            ])
-
-            response = client.post("/api/v1/starships/sync")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["success"] is True
-            assert data["total"] >= 0
+        mock_swapi_service.iter_starships = PageStream([
+            {
+                "swapi_id": 1,
+                "name": "Millennium Falcon",
+                "model": "YT-1300 light freighter",
+                "url": "https://swapi.dev/api/starships/10/"
+            }
+        ])
+
+        response = client.post("/api/v1/starships/sync")
+        assert response.status_code == 202
+        job = response.json()
+        assert job["entity"] == "starships"
+        assert job["status"] in ("pending", "running")
+
+        job = wait_for_job(job["id"])
+        assert job["status"] == "completed"
+        data = job["result"]
+        assert data["total"] == 1
+        assert data["status"] == "complete"
 
     @pytest.mark.asyncio
-    async def test_sync_starships_from_swapi_with_errors(self, client: TestClient):
+    async def test_sync_starships_from_swapi_with_errors(self, client: TestClient, mock_swapi_service, wait_for_job):
         """Test syncing starships from SWAPI with service errors"""
-        from unittest.mock import patch, AsyncMock
-        with patch('app.api.starships.SWAPIService') as mock_swapi:
-            mock_instance = mock_swapi.return_value
-            mock_instance.fetch_all_starships = AsyncMock(side_effect=Exception("SWAPI error"))
-
-            response = client.post("/api/v1/starships/sync")
-            assert response.status_code == 500
-            assert "Failed to sync starships" in response.json()["detail"]
+        mock_swapi_service.iter_starships = PageStream(error=Exception("SWAPI error"))
+
+        response = client.post("/api/v1/starships/sync")
+        assert response.status_code == 202
+
+        job = wait_for_job(response.json()["id"])
+        assert job["status"] == "failed"
+        assert job["error"] == "SWAPI error"
+        assert job["result"] is None
 
     def test_get_starships_with_pagination_parameters(self, client: TestClient):
         """Test getting starships with pagination parameters"""
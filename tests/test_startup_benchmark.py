@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from benchmarks.startup_benchmark import ROOT, check_regression, run_benchmark
+
+
+class TestStartupBenchmark:
+    """Test cases for the startup benchmark and import-time laziness"""
+
+    def test_import_is_lazy(self, tmp_path):
+        """Test importing the app neither loads the SWAPI client nor touches the database"""
+        database = tmp_path / "untouched.db"
+        code = (
+            "import sys, app.main; "
+            "print(sorted(m for m in ('httpx', 'app.services.sync_service') if m in sys.modules))"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env={"DATABASE_URL": f"sqlite:///{database}", "PYTHONPATH": ROOT},
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip() == "[]"
+        assert not database.exists()
+
+    def test_run_benchmark(self):
+        """Test one run serves its first request and reports both timings"""
+        metrics = run_benchmark(runs=1)
+
+        assert metrics["errors"] == 0
+        assert 0 < metrics["import_seconds"] < metrics["first_request_seconds"]
+
+    def test_check_regression(self):
+        """Test startup slower than the threshold is reported"""
+        baseline = {"import_seconds": 1.0, "first_request_seconds": 2.0}
+
+        assert check_regression({"import_seconds": 1.1, "first_request_seconds": 2.3}, baseline, 0.2) is None
+        assert "first_request_seconds" in check_regression(
+            {"import_seconds": 1.1, "first_request_seconds": 2.5}, baseline, 0.2
+        )
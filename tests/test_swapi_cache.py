@@ -0,0 +1,148 @@
+import pytest
+import time
+from unittest.mock import patch
+from app.config import settings
+from app.services.swapi_cache import SWAPIResponseCache, create_response_cache
+
+
+class TestSWAPIResponseCache:
+    """Test cases for the on-disk SWAPI response cache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = SWAPIResponseCache(str(tmp_path / "cache.db"), max_age=60, max_bytes=1000)
+        yield cache
+        cache.close()
+
+    def test_set_and_get(self, cache):
+        """Test storing and reading a response with its validators"""
+        cache.set("https://swapi.dev/api/people/", b'{"count": 1}', etag='"abc"')
+
+        cached = cache.get("https://swapi.dev/api/people/")
+        assert cached.body == b'{"count": 1}'
+        assert cached.etag == '"abc"'
+        assert cached.last_modified is None
+        assert cache.is_fresh(cached)
+
+    def test_get_missing(self, cache):
+        """Test a missing URL returns None"""
+        assert cache.get("https://swapi.dev/api/films/") is None
+
+    def test_persists_across_instances(self, cache, tmp_path):
+        """Test cached responses survive reopening the cache file"""
+        cache.set("https://swapi.dev/api/people/", b"{}")
+        cache.close()
+
+        reopened = SWAPIResponseCache(str(tmp_path / "cache.db"), max_age=60, max_bytes=1000)
+        assert reopened.get("https://swapi.dev/api/people/").body == b"{}"
+        assert reopened.total_bytes == 2
+        reopened.close()
+
+    def test_stale_after_max_age(self, cache):
+        """Test entries older than max_age are not fresh until touched"""
+        cache.set("https://swapi.dev/api/people/", b"{}")
+        with patch("app.services.swapi_cache.time.time", return_value=time.time() + 120):
+            assert not cache.is_fresh(cache.get("https://swapi.dev/api/people/"))
+
+        cache.max_age = 0
+        assert not cache.is_fresh(cache.get("https://swapi.dev/api/people/"))
+        cache.max_age = 60
+        cache.touch("https://swapi.dev/api/people/")
+        assert cache.is_fresh(cache.get("https://swapi.dev/api/people/"))
+
+    def test_size_cap_evicts_oldest(self, cache):
+        """Test the oldest responses are evicted past max_bytes"""
+        for i in range(5):
+            cache.set(f"https://swapi.dev/api/people/{i}/", b"x" * 300)
+
+        assert cache.total_bytes <= 1000
+        assert cache.get("https://swapi.dev/api/people/0/") is None
+        assert cache.get("https://swapi.dev/api/people/4/") is not None
+
+    def test_disabled_by_default(self):
+        """Test no cache is created unless enabled in settings"""
+        assert create_response_cache() is None
+
+
+class TestCachedSWAPIService:
+    """Test cases for SWAPIService going through the response cache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = SWAPIResponseCache(str(tmp_path / "cache.db"), max_age=60, max_bytes=10**6)
+        yield cache
+        cache.close()
+
+    @pytest.fixture
+    def swapi_service(self, swapi_service, cache):
+        swapi_service.cache = cache
+        return swapi_service
+
+    @pytest.mark.asyncio
+    async def test_fresh_responses_skip_upstream(self, swapi_service, mock_swapi):
+        """Test a repeated sync is served entirely from the cache"""
+        first = await swapi_service.fetch_all_characters()
+        requests_after_first = len(mock_swapi.requests)
+
+        second = await swapi_service.fetch_all_characters()
+
+        assert second == first
+        assert len(mock_swapi.requests) == requests_after_first == 3
+
+    @pytest.mark.asyncio
+    async def test_stale_responses_are_revalidated(self, swapi_service, mock_swapi, cache):
+        """Test stale entries are revalidated with If-None-Match"""
+        first = await swapi_service.fetch_all_characters()
+        cache.max_age = 0
+
+        second = await swapi_service.fetch_all_characters()
+
+        assert second == first
+        assert mock_swapi.not_modified == 3
+
+    @pytest.mark.asyncio
+    async def test_changed_responses_replace_cache(self, swapi_service, mock_swapi, cache):
+        """Test a changed upstream body replaces the cached one"""
+        await swapi_service.fetch_all_characters()
+        cache.max_age = 0
+        mock_swapi.resources["people"][0]["name"] = "Renamed"
+
+        result = await swapi_service.fetch_all_characters()
+
+        assert result[0]["name"] == "Renamed"
+        assert mock_swapi.not_modified == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_served_when_upstream_down(self, swapi_service, mock_swapi, cache):
+        """Test stale entries are served when upstream fails"""
+        first = await swapi_service.fetch_all_characters()
+        cache.max_age = 0
+        mock_swapi.unavailable = True
+
+        second = await swapi_service.fetch_all_characters()
+
+        assert second == first
+        assert second.complete is True
+
+    @pytest.mark.asyncio
+    async def test_stale_served_when_upstream_slow(self, swapi_service, mock_swapi, cache):
+        """Test stale entries are served when revalidation times out"""
+        first = await swapi_service.fetch_all_characters()
+        cache.max_age = 0
+        mock_swapi.latency = 0.5
+
+        with patch.object(settings, "SWAPI_CACHE_REVALIDATE_TIMEOUT", 0.05):
+            second = await swapi_service.fetch_all_characters()
+
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_not_cached(self, swapi_service, mock_swapi):
+        """Test a 404 for a single item is not served from the cache"""
+        with patch.object(settings, "SWAPI_NOT_FOUND_TTL", 0):
+            assert await swapi_service.fetch_character_by_id(999) is None
+            assert await swapi_service.fetch_character_by_id(999) is None
+
+        luke = await swapi_service.fetch_character_by_id(1)
+        assert luke["swapi_id"] == 1
+        assert len(mock_swapi.requests) == 3
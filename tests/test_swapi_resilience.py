@@ -0,0 +1,234 @@
+import asyncio
+import pytest
+import httpx
+import time
+from email.utils import formatdate
+from unittest.mock import patch
+from app.config import settings
+from app.services.swapi_resilience import (
+    CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceededError, SWAPIError,
+    backoff_delay, retry_after_seconds
+)
+from app.services.swapi_service import SWAPIService
+
+
+class TestResiliencePrimitives:
+    """Test cases for backoff, Retry-After parsing, deadlines and the breaker"""
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test delays stay within the exponential envelope and the cap"""
+        for attempt in range(6):
+            delay = backoff_delay(attempt, base=0.5, cap=4.0)
+            assert 0 <= delay <= min(4.0, 0.5 * 2 ** attempt)
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After given in seconds or as an HTTP date"""
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "2"})) == 2
+        assert retry_after_seconds(httpx.Response(429)) is None
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+
+        date = formatdate(time.time() + 30, usegmt=True)
+        delay = retry_after_seconds(httpx.Response(503, headers={"Retry-After": date}))
+        assert 25 < delay <= 30
+
+    def test_deadline(self):
+        """Test a deadline expires, and no budget never does"""
+        assert Deadline(None).remaining() is None
+        Deadline(0).check()
+
+        deadline = Deadline(60)
+        assert 59 < deadline.remaining() <= 60
+        with patch("app.services.swapi_resilience.time.monotonic", return_value=time.monotonic() + 61):
+            with pytest.raises(DeadlineExceededError):
+                deadline.check()
+
+    def test_circuit_breaker_opens_and_recovers(self):
+        """Test the breaker opens on failures, then half-opens for one trial"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        later = time.monotonic() + 31
+        with patch("app.services.swapi_resilience.time.monotonic", return_value=later):
+            breaker.before_request()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                breaker.before_request()
+
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+        with patch("app.services.swapi_resilience.time.monotonic", return_value=later + 31):
+            breaker.before_request()
+            breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_request()
+
+
+class TestResilientSWAPIService:
+    """Test cases for SWAPIService against a fault-injecting mock"""
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried(self, swapi_service, mock_swapi):
+        """Test 5xx responses and connection errors are retried"""
+        mock_swapi.inject_faults(503, httpx.ConnectError("connection refused"))
+
+        result = await swapi_service.fetch_all_characters()
+
+        assert len(result) == 25
+        assert result.complete is True
+        assert len(mock_swapi.requests) == 3 + 2
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_honoured(self, swapi_service, mock_swapi):
+        """Test a 429 waits for Retry-After instead of the backoff"""
+        mock_swapi.retry_after = "0.2"
+        mock_swapi.inject_faults(429)
+
+        started = time.perf_counter()
+        result = await swapi_service.fetch_all_characters()
+
+        assert time.perf_counter() - started >= 0.2
+        assert result.complete is True
+        assert swapi_service.breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_exhausted_retries_mark_sync_partial(self, swapi_service, mock_swapi):
+        """Test a page that keeps failing is reported, not silently dropped"""
+        mock_swapi.failing_pages = {2}
+
+        result = await swapi_service.fetch_all_characters()
+
+        assert len(result) == 15
+        assert result.complete is False
+        assert result.failed_pages == [2]
+        page_two = [url for url in mock_swapi.requests if url.endswith("page=2")]
+        assert len(page_two) == settings.SWAPI_RETRY_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_fails_fast(self, mock_swapi):
+        """Test an unhealthy upstream trips the breaker and stops requests"""
+        with patch.object(settings, "SWAPI_BREAKER_THRESHOLD", 2):
+            swapi_service = SWAPIService(client=httpx.AsyncClient(transport=mock_swapi.transport))
+        mock_swapi.unavailable = True
+
+        first = await swapi_service.fetch_all_characters()
+        requests_before = len(mock_swapi.requests)
+        second = await swapi_service.fetch_all_characters()
+
+        assert first.failed_pages == second.failed_pages == [1]
+        assert requests_before == 2
+        assert len(mock_swapi.requests) == requests_before
+        with pytest.raises(CircuitOpenError):
+            await swapi_service.fetch_character_by_id(1)
+
+    @pytest.mark.asyncio
+    async def test_deadline_cuts_sync_short(self, swapi_service, mock_swapi):
+        """Test pages beyond the deadline are reported as failed"""
+        mock_swapi.latency = 0.1
+        swapi_service.max_concurrency = 1
+
+        with patch.object(settings, "SWAPI_SYNC_DEADLINE", 0.25):
+            result = await swapi_service.fetch_all_characters()
+
+        assert result.complete is False
+        assert 3 in result.failed_pages
+        assert len(result) < 25
+
+    @pytest.mark.asyncio
+    async def test_random_faults_are_absorbed(self, mock_swapi):
+        """Test a flaky upstream still yields a complete sync"""
+        mock_swapi.error_rate = 0.3
+        mock_swapi.random.seed(7)
+        with patch.object(settings, "SWAPI_RETRY_ATTEMPTS", 6), \
+                patch.object(settings, "SWAPI_BREAKER_THRESHOLD", 0):
+            swapi_service = SWAPIService(client=httpx.AsyncClient(transport=mock_swapi.transport))
+            result = await swapi_service.fetch_all_characters()
+
+        assert len(result) == 25
+        assert result.complete is True
+
+    @pytest.mark.asyncio
+    async def test_fetch_by_id_distinguishes_outage(self, swapi_service, mock_swapi):
+        """Test a missing item is None but an outage raises"""
+        assert await swapi_service.fetch_character_by_id(999) is None
+
+        mock_swapi.unavailable = True
+        with pytest.raises(SWAPIError):
+            await swapi_service.fetch_character_by_id(1)
+
+
+@pytest.mark.mock_swapi(latency=0.05)
+class TestFetchByIdCoalescing:
+    """Test cases for shared fetch-by-id requests and the 404 cache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_request(self, swapi_service, mock_swapi):
+        """Test callers asking for the same item at once await one request"""
+        results = await asyncio.gather(*(swapi_service.fetch_character_by_id(1) for _ in range(10)))
+
+        assert len(mock_swapi.requests) == 1
+        assert all(result["swapi_id"] == 1 for result in results)
+        results[0]["name"] = "changed"
+        assert results[1]["name"] != "changed"
+        assert swapi_service._in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, swapi_service, mock_swapi):
+        """Test one caller giving up leaves the shared request running"""
+        impatient = asyncio.create_task(swapi_service.fetch_character_by_id(1))
+        patient = asyncio.create_task(swapi_service.fetch_character_by_id(1))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+
+        assert (await patient)["swapi_id"] == 1
+        assert len(mock_swapi.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_remembered_briefly(self, swapi_service, mock_swapi):
+        """Test a 404 is answered locally until its TTL runs out"""
+        assert await swapi_service.fetch_character_by_id(999) is None
+        assert await swapi_service.fetch_character_by_id(999) is None
+        assert len(mock_swapi.requests) == 1
+
+        swapi_service._not_found[("people", 999)] = time.monotonic() - 1
+        assert await swapi_service.fetch_character_by_id(999) is None
+        assert len(mock_swapi.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_by_ids(self, swapi_service, mock_swapi):
+        """Test a batch fans out under the concurrency limit"""
+        swapi_service.max_concurrency = 3
+
+        items = await swapi_service.fetch_many_by_ids("people", [1, 2, 3, 4, 5, 6, 2, 999])
+
+        assert sorted(items) == [1, 2, 3, 4, 5, 6, 999]
+        assert items[4]["swapi_id"] == 4
+        assert items[999] is None
+        assert len(mock_swapi.requests) == 7
+        assert mock_swapi.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_fetch_many_leaves_out_failures(self, swapi_service, mock_swapi):
+        """Test items that could not be fetched are left out of the batch"""
+        mock_swapi.unavailable = True
+
+        assert await swapi_service.fetch_many_by_ids("people", [1, 2]) == {}
+
+    @pytest.mark.asyncio
+    async def test_failure_seen_by_no_caller_is_retrieved(self, swapi_service, mock_swapi):
+        """Test a shared request failing after its callers gave up is not left unretrieved"""
+        mock_swapi.unavailable = True
+        caller = asyncio.create_task(swapi_service.fetch_character_by_id(1))
+        await asyncio.sleep(0.01)
+        task = swapi_service._in_flight[("people", 1)]
+        caller.cancel()
+
+        with pytest.raises(SWAPIError):
+            await task
+        assert task._log_traceback is False
@@ -1,7 +1,12 @@
 import pytest
 import httpx
+import ssl
+import sys
+import time
 from unittest.mock import patch, AsyncMock, MagicMock
-from app.services.swapi_service import SWAPIService
+from app.config import settings
+from app.services.swapi_service import SWAPIService, http_client_options
+from mock_swapi import MockSWAPI, make_people
 
 
 class TestSWAPIService:
@@ -143,11 +148,7 @@ class TestSWAPIService:
             import httpx
             
             mock_request = httpx.Request("GET", "https://swapi.dev/api/people/999/")
-            mock_response = AsyncMock()
-            mock_response.status_code = 404
-            mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-                "Not found", request=mock_request, response=mock_response
-            )
+            mock_response = httpx.Response(404, request=mock_request)
             
             mock_client_instance = AsyncMock()
             mock_client_instance.get.return_value = mock_response
@@ -166,4 +167,116 @@ class TestSWAPIService:
             
             result = await swapi_service.fetch_all_characters()
             assert result == []
-            mock_fetch.assert_called_once_with("people")
+            mock_fetch.assert_called_once_with("people", on_page=None)
+
+
+@pytest.mark.mock_swapi(people=82, latency=0.05)
+class TestConcurrentPageFetching:
+    """Test cases for concurrent page fetching against a local mock SWAPI"""
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_pages_in_order(self, swapi_service, mock_swapi):
+        """Test all pages are fetched and reassembled in page order"""
+        result = await swapi_service.fetch_all_characters()
+
+        assert result.complete is True
+        assert result.expected_count == 82
+        assert [item["swapi_id"] for item in result] == list(range(1, 83))
+        assert len(mock_swapi.requests) == 9
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, swapi_service, mock_swapi):
+        """Test no more pages are in flight than the configured limit"""
+        swapi_service.max_concurrency = 3
+
+        await swapi_service.fetch_all_characters()
+
+        assert mock_swapi.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_is_reported(self, swapi_service, mock_swapi):
+        """Test failed pages are reported instead of silently truncating"""
+        mock_swapi.failing_pages = {3, 7}
+
+        result = await swapi_service.fetch_all_characters()
+
+        assert result.complete is False
+        assert result.failed_pages == [3, 7]
+        assert len(result) == 62
+        assert result[-1]["swapi_id"] == 82
+
+    @pytest.mark.asyncio
+    async def test_first_page_failure(self, swapi_service, mock_swapi):
+        """Test a failing first page returns an empty, incomplete result"""
+        mock_swapi.failing_pages = {1}
+
+        result = await swapi_service.fetch_all_characters()
+
+        assert result == []
+        assert result.failed_pages == [1]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_faster_than_sequential(self, swapi_service):
+        """Test concurrent fetching beats the sequential path on wall time"""
+        swapi_service.max_concurrency = 1
+        start = time.perf_counter()
+        sequential = await swapi_service.fetch_all_characters()
+        sequential_time = time.perf_counter() - start
+
+        swapi_service.max_concurrency = 8
+        start = time.perf_counter()
+        concurrent = await swapi_service.fetch_all_characters()
+        concurrent_time = time.perf_counter() - start
+
+        assert concurrent == sequential
+        assert concurrent_time < sequential_time / 2
+
+
+class TestSharedHTTPClient:
+    """Test cases for the pooled HTTP client"""
+
+    def test_client_options_from_settings(self):
+        """Test pool limits and timeouts are taken from settings"""
+        with patch.multiple(
+            settings,
+            SWAPI_MAX_CONNECTIONS=7,
+            SWAPI_MAX_KEEPALIVE_CONNECTIONS=3,
+            SWAPI_TIMEOUT=12.0
+        ):
+            options = http_client_options()
+
+        assert options["limits"].max_connections == 7
+        assert options["limits"].max_keepalive_connections == 3
+        assert options["timeout"].read == 12.0
+        assert isinstance(options["verify"], ssl.SSLContext)
+
+    def test_http2_falls_back_without_h2(self):
+        """Test HTTP/2 is disabled when the h2 package is missing"""
+        with patch.object(settings, "SWAPI_HTTP2", True), \
+                patch.dict(sys.modules, {"h2": None}):
+            options = http_client_options()
+
+        assert options["http2"] is False
+
+    @pytest.mark.asyncio
+    async def test_injected_client_is_reused(self):
+        """Test every request goes through the injected client"""
+        mock_swapi = MockSWAPI({"people": make_people(25)})
+        async with httpx.AsyncClient(transport=mock_swapi.transport) as client:
+            service = SWAPIService(client=client)
+            with patch('httpx.AsyncClient') as mock_client:
+                await service.fetch_all_characters()
+                await service.fetch_all_characters()
+
+            mock_client.assert_not_called()
+            assert not client.is_closed
+
+        assert len(mock_swapi.requests) == 6
+
+    def test_lifespan_provides_shared_service(self, client):
+        """Test the app lifespan creates the shared SWAPI service"""
+        from app.main import app
+
+        service = app.state.swapi_service
+        assert isinstance(service, SWAPIService)
+        assert service.client is not None
@@ -0,0 +1,82 @@
+import httpx
+import pytest
+from app.services.swapi_service import SWAPIService
+from benchmarks.mock_swapi_server import MOCK_BASE_URL, SWAPIDataset, asgi_app
+from benchmarks.sync_benchmark import check_regression, run_benchmark
+
+
+class TestSWAPIDataset:
+    """Test cases for the generated SWAPI dataset used by the benchmarks"""
+
+    def swapi_service(self, transport):
+        service = SWAPIService(client=httpx.AsyncClient(transport=transport))
+        service.base_url = MOCK_BASE_URL
+        return service
+
+    @pytest.mark.asyncio
+    async def test_paginates_generated_records(self):
+        """Test every record is served once, across pages"""
+        mock = SWAPIDataset(people=95).mock(page_size=10)
+
+        result = await self.swapi_service(mock.transport).fetch_all_characters()
+
+        assert result.complete is True
+        assert [item["swapi_id"] for item in result] == list(range(1, 96))
+        assert len(mock.requests) == 10
+
+    @pytest.mark.asyncio
+    async def test_films_list_their_characters(self):
+        """Test film payloads list the people whose payloads list them"""
+        dataset = SWAPIDataset(people=30, films=3)
+        service = self.swapi_service(dataset.mock().transport)
+
+        film = await service.fetch_film_by_id(2)
+
+        listed = {int(url.rstrip("/").rsplit("/", 1)[1]) for url in film["characters"]}
+        assert listed == {person for person in range(1, 31) if 2 in dataset.film_ids(person)}
+        assert await service.fetch_film_by_id(4) is None
+
+    @pytest.mark.asyncio
+    async def test_error_rate_is_retried(self):
+        """Test injected 503s are absorbed by the client's retries"""
+        mock = SWAPIDataset(people=200).mock(error_rate=0.2, seed=3)
+
+        result = await self.swapi_service(mock.transport).fetch_all_characters()
+
+        assert mock.errors > 0
+        assert len(result) == 200
+
+    @pytest.mark.asyncio
+    async def test_served_as_asgi_app(self):
+        """Test the mock mounted as an ASGI app serves the same pages"""
+        mock = SWAPIDataset(people=15).mock()
+        transport = httpx.ASGITransport(app=asgi_app(mock))
+
+        result = await self.swapi_service(transport).fetch_all_characters()
+
+        assert [item["swapi_id"] for item in result] == list(range(1, 16))
+        assert len(mock.requests) == 2
+
+
+class TestSyncBenchmark:
+    """Test cases for the sync benchmark harness"""
+
+    @pytest.mark.asyncio
+    async def test_run_benchmark(self):
+        """Test a small run syncs everything and reports its timings"""
+        metrics = await run_benchmark(people=40, films=3, starships=5)
+        dataset = SWAPIDataset(people=40, films=3)
+
+        assert metrics["complete"] is True
+        assert metrics["rows"] == 48
+        assert metrics["links"] == sum(len(dataset.film_ids(person)) for person in range(1, 41))
+        assert metrics["fetch_seconds"] > 0
+        assert metrics["write_seconds"] > 0
+        assert metrics["rows_per_sec"] > 0
+
+    def test_check_regression(self):
+        """Test throughput below the threshold is reported"""
+        baseline = {"rows_per_sec": 1000.0}
+
+        assert check_regression({"rows_per_sec": 850.0}, baseline, 0.2) is None
+        assert "below 800.0" in check_regression({"rows_per_sec": 700.0}, baseline, 0.2)
@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.services.bulk import UpsertResult
+from app.services.starship_service import StarshipService
+from app.services.swapi_service import Page
+from app.services.sync_jobs import SyncJob, SyncJobManager
+from mock_swapi import PageStream
+
+
+class TestSyncJobManager:
+    """Test cases for running syncs as background jobs"""
+
+    @pytest.fixture
+    def session_factory(self, db):
+        return async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @pytest.fixture
+    def swapi_service(self):
+        return MagicMock()
+
+    def slow_stream(self, release: asyncio.Event, items):
+        """Yield items as page 1, then hold page 2 back until released"""
+        async def stream(status=None, on_page=None, deadline=None):
+            on_page(1, 2)
+            yield Page(1, items)
+            await release.wait()
+            on_page(2, 2)
+            yield Page(2, [])
+        return stream
+
+    async def wait_until(self, predicate, timeout=2.0):
+        """Yield to the job until predicate holds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not predicate():
+            assert loop.time() < deadline, "Timed out waiting for the sync job"
+            await asyncio.sleep(0.001)
+
+    @pytest.mark.asyncio
+    async def test_job_reports_progress_and_result(self, session_factory, swapi_service):
+        """Test a job exposes page progress while running and the result after"""
+        release = asyncio.Event()
+        swapi_service.iter_starships = self.slow_stream(
+            release, [{"swapi_id": 1, "name": "X-wing"}, {"swapi_id": 2, "name": "TIE"}]
+        )
+        manager = SyncJobManager()
+
+        job = manager.start("starships", session_factory, swapi_service)
+        await self.wait_until(lambda: job.rows_written == 2)
+
+        assert job.status == SyncJob.RUNNING
+        assert (job.pages_fetched, job.pages_total) == (1, 2)
+        assert job.rate > 0
+        assert job.eta_seconds is not None
+
+        release.set()
+        await job.task
+
+        assert job.status == SyncJob.COMPLETED
+        assert job.rows_written == 2
+        assert job.result.created == 2
+        assert job.eta_seconds is None
+        assert job.finished_at is not None
+        assert manager.get(job.id) is job
+
+    @pytest.mark.asyncio
+    async def test_single_flight_per_entity(self, session_factory, swapi_service):
+        """Test a second sync of the same entity attaches to the running job"""
+        release = asyncio.Event()
+        swapi_service.iter_starships = self.slow_stream(release, [])
+        swapi_service.iter_films = PageStream()
+        manager = SyncJobManager()
+
+        first = manager.start("starships", session_factory, swapi_service)
+        second = manager.start("starships", session_factory, swapi_service)
+        films = manager.start("films", session_factory, swapi_service)
+
+        assert second is first
+        assert films is not first
+
+        release.set()
+        await asyncio.gather(first.task, films.task)
+        third = manager.start("starships", session_factory, swapi_service)
+        assert third is not first
+        await third.task
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self, session_factory, swapi_service):
+        """Test a failing sync marks the job failed with the error message"""
+        swapi_service.iter_characters = PageStream(error=Exception("SWAPI error"))
+        manager = SyncJobManager()
+
+        job = manager.start("characters", session_factory, swapi_service)
+        await job.task
+
+        assert job.status == SyncJob.FAILED
+        assert job.error == "SWAPI error"
+        assert job.result is None
+
+    @pytest.mark.asyncio
+    async def test_partial_job(self, session_factory, swapi_service):
+        """Test a sync with failed pages finishes as partial"""
+        swapi_service.iter_films = PageStream([{"swapi_id": 1, "title": "A New Hope"}], failed_pages=[2])
+        manager = SyncJobManager()
+
+        job = manager.start("films", session_factory, swapi_service)
+        await job.task
+
+        assert job.status == SyncJob.PARTIAL
+        assert job.result.status == "partial"
+        assert job.result.failed_pages == [2]
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded(self, session_factory, swapi_service):
+        """Test only the most recent finished jobs are kept"""
+        swapi_service.iter_films = PageStream()
+        manager = SyncJobManager(history_size=2)
+
+        jobs = []
+        for _ in range(3):
+            job = manager.start("films", session_factory, swapi_service)
+            await job.task
+            jobs.append(job)
+
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[2].id) is jobs[2]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_running_jobs(self, session_factory, swapi_service):
+        """Test shutdown cancels jobs that are still running"""
+        swapi_service.iter_films = self.slow_stream(asyncio.Event(), [])
+        manager = SyncJobManager()
+
+        job = manager.start("films", session_factory, swapi_service)
+        await self.wait_until(lambda: job.pages_fetched == 1)
+        await manager.shutdown()
+
+        assert job.status == SyncJob.FAILED
+        assert job.error == "Cancelled"
+
+    @pytest.mark.asyncio
+    async def test_shutdown_waits_for_page_being_written(self, db, swapi_service):
+        """Test cancelling a job doesn't close its session under a running write"""
+        events = []
+
+        class RecordingSession(AsyncSession):
+            async def close(self):
+                events.append("closed")
+                await super().close()
+
+        writing, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_upsert(self, items, commit=True):
+            writing.set()
+            await release.wait()
+            events.append("written")
+            return UpsertResult(0, 0, len(items))
+
+        swapi_service.iter_starships = PageStream([{"swapi_id": 1, "name": "X-wing"}])
+        session_factory = async_sessionmaker(db.bind, class_=RecordingSession, expire_on_commit=False)
+        manager = SyncJobManager()
+
+        with patch.object(StarshipService, "bulk_upsert_from_swapi", slow_upsert):
+            job = manager.start("starships", session_factory, swapi_service)
+            await self.wait_until(writing.is_set)
+            shutdown = asyncio.create_task(manager.shutdown())
+            await asyncio.sleep(0.05)
+            assert not shutdown.done()
+
+            release.set()
+            await shutdown
+
+        assert events == ["written", "closed"]
+        assert job.status == SyncJob.FAILED
+        assert job.error == "Cancelled"
+
+
+def test_get_unknown_job(client):
+    """Test polling an unknown job returns 404"""
+    response = client.get("/api/v1/sync/jobs/unknown")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Sync job not found"
@@ -0,0 +1,311 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.models.character import Character
+from app.models.film import Film
+from app.services.character_service import CharacterService
+from app.services.film_service import FilmService
+from app.services.relations import load_url_map
+from app.services.swapi_service import Page, SWAPIService
+from app.services.sync_service import SyncProgress, SyncService
+from mock_swapi import MockSWAPI, PageStream, make_people
+
+PEOPLE_URL = "https://swapi.dev/api/people/{}/"
+FILMS_URL = "https://swapi.dev/api/films/{}/"
+
+
+def make_character(swapi_id, film_ids):
+    return {
+        "swapi_id": swapi_id,
+        "name": f"Character {swapi_id}",
+        "url": PEOPLE_URL.format(swapi_id),
+        "films": [FILMS_URL.format(film_id) for film_id in film_ids]
+    }
+
+
+def make_film(swapi_id, character_ids):
+    return {
+        "swapi_id": swapi_id,
+        "title": f"Film {swapi_id}",
+        "url": FILMS_URL.format(swapi_id),
+        "characters": [PEOPLE_URL.format(character_id) for character_id in character_ids]
+    }
+
+
+class TestSyncService:
+    """Test cases for syncing SWAPI resources and their relations"""
+
+    @pytest.fixture
+    def swapi_service(self):
+        return MagicMock()
+
+    async def link_counts(self, db):
+        characters = await db.execute(select(Character.swapi_id, Character.film_count))
+        films = await db.execute(select(Film.swapi_id, Film.character_count))
+        return dict(characters.all()), dict(films.all())
+
+    async def film_titles(self, db, swapi_id):
+        db.expire_all()
+        character = await CharacterService(db).get_character_by_swapi_id(swapi_id)
+        return sorted(film.title for film in character.films)
+
+    @pytest.mark.asyncio
+    async def test_films_sync_links_characters(self, db, swapi_service):
+        """Test a film sync fills character_films from its character URLs"""
+        swapi_service.iter_characters = PageStream(
+            [make_character(i, []) for i in (1, 2, 3)]
+        )
+        swapi_service.iter_films = PageStream(
+            [make_film(1, [1, 2]), make_film(2, [1, 3, 99])]
+        )
+        service = SyncService(db, swapi_service)
+
+        await service.sync_characters()
+        result = await service.sync_films()
+
+        assert result.created == 2
+        assert result.links_added == 4
+        assert await self.film_titles(db, 1) == ["Film 1", "Film 2"]
+        assert await self.film_titles(db, 3) == ["Film 2"]
+        film = await FilmService(db).get_film_by_swapi_id(1)
+        assert sorted(c.name for c in film.characters) == ["Character 1", "Character 2"]
+
+    @pytest.mark.asyncio
+    async def test_characters_sync_links_films(self, db, swapi_service):
+        """Test a character sync fills character_films from its film URLs"""
+        swapi_service.iter_films = PageStream(
+            [make_film(1, []), make_film(2, [])]
+        )
+        swapi_service.iter_characters = PageStream(
+            [make_character(1, [1, 2]), make_character(2, [2])]
+        )
+        service = SyncService(db, swapi_service)
+
+        await service.sync_films()
+        result = await service.sync_characters()
+
+        assert result.links_added == 3
+        assert await self.film_titles(db, 1) == ["Film 1", "Film 2"]
+        assert await self.film_titles(db, 2) == ["Film 2"]
+
+    @pytest.mark.asyncio
+    async def test_links_are_diffed(self, db, swapi_service):
+        """Test a resync only adds new pairs and removes dropped ones"""
+        swapi_service.iter_characters = PageStream(
+            [make_character(i, []) for i in (1, 2, 3)]
+        )
+        swapi_service.iter_films = PageStream(
+            [make_film(1, [1, 2])]
+        )
+        service = SyncService(db, swapi_service)
+        await service.sync_characters()
+        await service.sync_films()
+
+        swapi_service.iter_films.items = [make_film(1, [2, 3])]
+        result = await service.sync_films()
+
+        assert (result.links_added, result.links_removed) == (1, 1)
+        assert await self.film_titles(db, 1) == []
+        assert await self.film_titles(db, 3) == ["Film 1"]
+
+        result = await service.sync_films()
+        assert (result.links_added, result.links_removed) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_link_writes_are_bulk(self, db, swapi_service):
+        """Test relation sync issues no per-link queries"""
+        swapi_service.iter_characters = PageStream(
+            [make_character(i, []) for i in range(1, 41)]
+        )
+        swapi_service.iter_films = PageStream(
+            [make_film(i, range(1, 41)) for i in range(1, 7)]
+        )
+        service = SyncService(db, swapi_service)
+        await service.sync_characters()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            result = await service.sync_films()
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+
+        assert result.links_added == 240
+        inserts = [s for s in statements if s.startswith("INSERT INTO character_films")]
+        assert len(inserts) == 1
+        # One recount per side of the links
+        assert len([s for s in statements if s.startswith(("UPDATE characters", "UPDATE films"))]) == 2
+        assert len(statements) <= 8
+
+    @pytest.mark.asyncio
+    async def test_links_keep_counts(self, db, swapi_service):
+        """Test film_count and character_count follow the links as they are added and removed"""
+        swapi_service.iter_films = PageStream([make_film(1, []), make_film(2, [])])
+        swapi_service.iter_characters = PageStream([
+            make_character(1, [1, 2]),
+            make_character(2, [2])
+        ])
+        service = SyncService(db, swapi_service)
+        await service.sync_films()
+        await service.sync_characters()
+        assert await self.link_counts(db) == ({1: 2, 2: 1}, {1: 1, 2: 2})
+
+        swapi_service.iter_characters = PageStream([make_character(1, [1])])
+        await service.sync_characters()
+        assert await self.link_counts(db) == ({1: 1, 2: 1}, {1: 1, 2: 1})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_syncs_link_both_ways(self, db, swapi_service):
+        """Test characters and films synced at the same time still get linked"""
+        swapi_service.iter_characters = PageStream(
+            [make_character(i, [1, 2]) for i in range(1, 31)], page_size=3
+        )
+        swapi_service.iter_films = PageStream(
+            [make_film(1, range(1, 31)), make_film(2, range(1, 31))], page_size=1
+        )
+        session_factory = async_sessionmaker(db.bind, expire_on_commit=False)
+
+        async def run(entity):
+            async with session_factory() as session:
+                return await SyncService(session, swapi_service).sync(entity)
+
+        await asyncio.gather(run("characters"), run("films"))
+
+        assert await self.film_titles(db, 1) == ["Film 1", "Film 2"]
+        assert await self.film_titles(db, 30) == ["Film 1", "Film 2"]
+
+    @pytest.mark.asyncio
+    async def test_links_to_rows_written_meanwhile_are_kept(self, db, swapi_service):
+        """Test a link the other side wrote after this side missed its target survives"""
+        swapi_service.iter_characters = PageStream([make_character(1, [1])])
+        swapi_service.iter_films = PageStream([make_film(1, [1])])
+        service = SyncService(db, swapi_service)
+        await service.sync_characters()
+        await service.sync_films()
+
+        # The film lookup runs before the concurrent film sync commits
+        def load_url_map_missing_films(db, model, urls=None):
+            return {} if model.__name__ == "Film" else load_url_map(db, model, urls)
+
+        with patch("app.services.sync_service.load_url_map", side_effect=load_url_map_missing_films):
+            result = await service.sync_characters()
+
+        assert result.links_removed == 0
+        assert await self.film_titles(db, 1) == ["Film 1"]
+
+    @pytest.mark.asyncio
+    async def test_items_without_urls_keep_links(self, db, swapi_service):
+        """Test payloads without a relation list leave existing links alone"""
+        swapi_service.iter_characters = PageStream(
+            [make_character(1, [])]
+        )
+        swapi_service.iter_films = PageStream(
+            [make_film(1, [1])]
+        )
+        service = SyncService(db, swapi_service)
+        await service.sync_characters()
+        await service.sync_films()
+
+        swapi_service.iter_characters.items = [
+            {"swapi_id": 1, "name": "Character 1", "url": PEOPLE_URL.format(1)}
+        ]
+        result = await service.sync_characters()
+
+        assert result.links_removed == 0
+        assert await self.film_titles(db, 1) == ["Film 1"]
+
+    @pytest.mark.asyncio
+    async def test_starships_sync(self, db, swapi_service):
+        """Test starships sync reports fetch status"""
+        swapi_service.iter_starships = PageStream(
+            [{"swapi_id": 10, "name": "Millennium Falcon"}], failed_pages=[2]
+        )
+
+        result = await SyncService(db, swapi_service).sync_starships()
+
+        assert result.created == 1
+        assert result.status == "partial"
+        assert result.complete is False
+        assert result.failed_pages == [2]
+
+
+class TestSyncPipeline:
+    """Test cases for streaming pages from SWAPI into the database"""
+
+    @pytest.mark.asyncio
+    async def test_streams_from_swapi(self, db):
+        """Test a sync through the real fetcher writes every page"""
+        mock_swapi = MockSWAPI({"people": make_people(25)}, latency=0.02, failing_pages={2})
+        swapi_service = SWAPIService(client=httpx.AsyncClient(transport=mock_swapi.transport))
+        progress = SyncProgress()
+
+        result = await SyncService(db, swapi_service).sync_characters(progress)
+
+        assert (result.total, result.created) == (15, 15)
+        assert result.complete is False
+        assert result.failed_pages == [2]
+        assert progress.rows_written == 15
+        # Every attempt at page 2, plus pages 1 and 3
+        assert progress.http_seconds >= 0.02 * (settings.SWAPI_RETRY_ATTEMPTS + 2)
+        assert progress.queue_wait_seconds > 0
+        assert progress.db_seconds > 0
+        assert await db.scalar(select(func.count()).select_from(Character)) == 15
+
+    @pytest.mark.asyncio
+    async def test_committed_pages_survive_failure(self, db):
+        """Test pages written before a fetch error stay committed"""
+        async def failing_stream(status=None, on_page=None, deadline=None):
+            yield Page(1, [{"swapi_id": 1, "name": "Luke"}])
+            yield Page(2, [{"swapi_id": 2, "name": "Leia"}])
+            raise RuntimeError("connection reset")
+
+        swapi_service = MagicMock()
+        swapi_service.iter_characters = failing_stream
+
+        with pytest.raises(RuntimeError):
+            await SyncService(db, swapi_service).sync_characters()
+
+        await db.rollback()
+        assert await db.scalar(select(func.count()).select_from(Character)) == 2
+
+    @pytest.mark.asyncio
+    async def test_page_rows_and_links_commit_together(self, db, swapi_service):
+        """Test a page whose links fail to write leaves none of its rows behind"""
+        swapi_service.iter_films = PageStream([make_film(1, [])])
+        swapi_service.iter_characters = PageStream([make_character(1, [1])])
+        service = SyncService(db, swapi_service)
+        await service.sync_films()
+
+        with patch("app.services.sync_service.sync_character_films", side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError):
+                await service.sync_characters()
+
+        assert await db.scalar(select(func.count()).select_from(Character)) == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_bounds_pages_in_memory(self, db):
+        """Test the fetcher never runs more than the queue size ahead of the writer"""
+        progress = SyncProgress()
+        lead = []
+
+        async def stream(status=None, on_page=None, deadline=None):
+            for number in range(1, 21):
+                lead.append(number - 1 - progress.rows_written)
+                yield Page(number, [{"swapi_id": number, "name": f"Ship {number}"}])
+
+        swapi_service = MagicMock()
+        swapi_service.iter_starships = stream
+
+        with patch.object(settings, "SYNC_QUEUE_SIZE", 2):
+            result = await SyncService(db, swapi_service).sync_starships(progress)
+
+        assert result.created == 20
+        # Queued pages, plus the one being written and the one being put
+        assert max(lead) <= 4